@@ -5,6 +5,14 @@
 //   u v cap cost  （m 行，0-based）
 //   s t
 // 输出：`flow cost`
+// 用法：mcmf [-a spfa|dijkstra|scaling] [-l csr|list] [-v] [input]（默认 spfa、csr，input 缺省为标准输入）
+// scaling 为容量缩放版本，增广次数随 log(最大容量) 而不是总流量增长
+// 输入可以是上述文本格式，也可以是以 "MCMF" 开头的二进制图格式（见 main 之前的说明），自动识别
+// C 接口见 mcmf.h；定义 MCMF_NO_MAIN 编译时不包含 main，可构建共享库
+
+#define _POSIX_C_SOURCE 200809L
+
+#include "mcmf.h"
 
 #include <limits.h>
 #include <stdio.h>
@@ -15,58 +23,198 @@ typedef long long ll;
 const ll INF = (ll)9e18;
 
 // Graph storage (adjacency list using parallel arrays)
-// N: number of vertices
-int N; // number of vertices
-int head_alloc = 0; // reserved for future dynamic alloc (unused)
-int *head;           // head[u] = index of first edge from u, -1 if none
-
-// Edge arrays: for each edge index e
-//   to_[e]   - destination vertex
-//   next_[e] - next edge index from the same source
-//   cap_[e]  - remaining capacity on this directed edge
-//   cost_[e] - per-unit cost (reverse edge stores -original_cost)
-int edge_cnt = 0;
-int *to_, *next_, *cap_;
-ll *cost_;
-
-// 为边数组分配一次性空间（2*m2 条记录）
-void ensure_edge_alloc(int m2) {
-  if (edge_cnt == 0) {
-    int sz = (m2 * 2 + 5);
-    to_ = malloc(sizeof(int) * sz);
-    next_ = malloc(sizeof(int) * sz);
-    cap_ = malloc(sizeof(int) * sz);
-    cost_ = malloc(sizeof(ll) * sz);
-  }
-}
-
-// 添加有向边 u->v（cap c，cost w）及反向边（cap 0，cost -w）。
-void add_edge(int u, int v, int c, ll w) {
+// 所有状态都在 mcmf_graph 中，不同的图互不影响
+struct mcmf_graph {
+  int N;     // number of vertices
+  int *head; // head[u] = index of first edge from u, -1 if none
+
+  // Edge arrays: for each edge index e
+  //   to_[e]   - destination vertex
+  //   next_[e] - next edge index from the same source
+  //   cap_[e]  - remaining capacity on this directed edge
+  //   cost_[e] - per-unit cost (reverse edge stores -original_cost)
+  int edge_cnt;
+  int edge_alloc; // 已分配的边记录数
+  int *to_, *next_, *cap_;
+  ll *cost_;
+
+  // CSR 布局（build_csr 之后有效）：顶点 v 的出边为 offset[v] .. offset[v+1]-1，
+  // to_/cap_/cost_ 已按起点重排为连续存储，rev[e] 为边 e 的反向边（取代 e ^ 1）
+  int *offset; // NULL 表示仍是链表布局
+  int *rev;
+
+  // 最近一次求解的统计：增广次数，以及容量缩放算法的 Δ 阶段数（其他算法为 0）
+  ll augments;
+  int phases;
+  int solved; // 已求解过（残量图不再是原图）
+};
+
+// 边 e 的反向边：链表布局中成对存储，CSR 布局中查 rev[]
+static inline int rev_edge(const mcmf_graph *g, int e) {
+  return g->rev ? g->rev[e] : e ^ 1;
+}
+
+// 确保边数组还能容纳 extra 条边记录，不足时按倍增扩容；失败返回 -1
+static int ensure_edge_alloc(mcmf_graph *g, int extra) {
+  if (extra > INT_MAX - g->edge_cnt)
+    return -1;
+  int need = g->edge_cnt + extra;
+  if (need <= g->edge_alloc)
+    return 0;
+  int sz = g->edge_alloc > 0 ? g->edge_alloc : 16;
+  while (sz < need)
+    sz = sz > INT_MAX / 2 ? need : sz * 2;
+
+  int *to = realloc(g->to_, sizeof(int) * sz);
+  if (to) g->to_ = to;
+  int *nx = realloc(g->next_, sizeof(int) * sz);
+  if (nx) g->next_ = nx;
+  int *cap = realloc(g->cap_, sizeof(int) * sz);
+  if (cap) g->cap_ = cap;
+  ll *cost = realloc(g->cost_, sizeof(ll) * sz);
+  if (cost) g->cost_ = cost;
+  if (!to || !nx || !cap || !cost)
+    return -1;
+  g->edge_alloc = sz;
+  return 0;
+}
+
+// 添加有向边 u->v（cap c，cost w）及反向边（cap 0，cost -w）。调用前需保证空间足够
+static void add_edge(mcmf_graph *g, int u, int v, int c, ll w) {
+  int e = g->edge_cnt;
   // forward edge
-  to_[edge_cnt] = v;
-  cap_[edge_cnt] = c;
-  cost_[edge_cnt] = w;
-  next_[edge_cnt] = head[u];
-  head[u] = edge_cnt++;
+  g->to_[e] = v;
+  g->cap_[e] = c;
+  g->cost_[e] = w;
+  g->next_[e] = g->head[u];
+  g->head[u] = e++;
   // reverse edge (initially zero capacity)
-  to_[edge_cnt] = u;
-  cap_[edge_cnt] = 0;
-  cost_[edge_cnt] = -w;
-  next_[edge_cnt] = head[v];
-  head[v] = edge_cnt++;
+  g->to_[e] = u;
+  g->cap_[e] = 0;
+  g->cost_[e] = -w;
+  g->next_[e] = g->head[v];
+  g->head[v] = e++;
+  g->edge_cnt = e;
+}
+
+mcmf_graph *mcmf_create(int n, int m_hint) {
+  if (n < 0)
+    return NULL;
+  mcmf_graph *g = calloc(1, sizeof(mcmf_graph));
+  if (!g)
+    return NULL;
+  g->N = n;
+  g->head = malloc(sizeof(int) * (n > 0 ? n : 1));
+  int records = m_hint > 0 && m_hint <= INT_MAX / 2 ? m_hint * 2 : 0;
+  if (!g->head || ensure_edge_alloc(g, records) != 0) {
+    mcmf_free(g);
+    return NULL;
+  }
+  for (int i = 0; i < n; i++)
+    g->head[i] = -1;
+  return g;
+}
+
+int mcmf_add_edges(mcmf_graph *g, int count, const int *u, const int *v,
+                   const int *cap, const long long *cost) {
+  if (count < 0 || g->offset)
+    return -1;
+  // 先整体校验，保证失败时图不被修改
+  for (int i = 0; i < count; i++) {
+    if (u[i] < 0 || u[i] >= g->N || v[i] < 0 || v[i] >= g->N || cap[i] < 0)
+      return -1;
+  }
+  if (count > INT_MAX / 2 || ensure_edge_alloc(g, count * 2) != 0)
+    return -1;
+  for (int i = 0; i < count; i++)
+    add_edge(g, u[i], v[i], cap[i], cost[i]);
+  return 0;
+}
+
+void mcmf_free(mcmf_graph *g) {
+  if (!g)
+    return;
+  free(g->head);
+  free(g->to_);
+  free(g->next_);
+  free(g->cap_);
+  free(g->cost_);
+  free(g->offset);
+  free(g->rev);
+  free(g);
 }
 
-// 二叉堆（保留供 Dijkstra 使用）。不支持 decrease-key，采用重复入堆并在弹出时跳过过时条目。
+// 构建 CSR 布局：按起点对所有边记录（含反向边）做稳定的计数排序，
+// 使每个顶点的出边在 to_/cap_/cost_ 中连续存放，松弛时顺序访问内存，不再沿 next_ 随机跳转
+// 边 e 的起点即其反向边的终点 to_[e ^ 1]；排序后原来的成对关系记录在 rev[] 中
+// 成功返回 0，分配失败返回 -1（此时保持链表布局，仍可正常求解）
+static int build_csr(mcmf_graph *g) {
+  int N = g->N, E = g->edge_cnt;
+  int *offset = calloc(N + 1, sizeof(int));
+  int *pos = malloc(sizeof(int) * (E > 0 ? E : 1)); // 原下标 -> CSR 下标
+  int *to = malloc(sizeof(int) * (E > 0 ? E : 1));
+  int *cap = malloc(sizeof(int) * (E > 0 ? E : 1));
+  ll *cost = malloc(sizeof(ll) * (E > 0 ? E : 1));
+  int *rev = malloc(sizeof(int) * (E > 0 ? E : 1));
+  if (!offset || !pos || !to || !cap || !cost || !rev) {
+    free(offset);
+    free(pos);
+    free(to);
+    free(cap);
+    free(cost);
+    free(rev);
+    return -1;
+  }
+
+  // 统计每个起点的出边数，前缀和得到各段起始位置
+  for (int e = 0; e < E; e++)
+    offset[g->to_[e ^ 1] + 1]++;
+  for (int v = 0; v < N; v++)
+    offset[v + 1] += offset[v];
+
+  // 按原下标顺序放置（稳定）；CSR 布局不再使用 head，借用它作为各段的写入游标
+  int *cursor = g->head;
+  for (int v = 0; v < N; v++)
+    cursor[v] = offset[v];
+  for (int e = 0; e < E; e++) {
+    int p = cursor[g->to_[e ^ 1]]++;
+    pos[e] = p;
+    to[p] = g->to_[e];
+    cap[p] = g->cap_[e];
+    cost[p] = g->cost_[e];
+  }
+  for (int e = 0; e < E; e++)
+    rev[pos[e]] = pos[e ^ 1];
+  free(pos);
+
+  free(g->to_);
+  free(g->cap_);
+  free(g->cost_);
+  free(g->next_);
+  g->to_ = to;
+  g->cap_ = cap;
+  g->cost_ = cost;
+  g->next_ = NULL;
+  g->offset = offset;
+  g->rev = rev;
+  g->edge_alloc = E;
+  return 0;
+}
+
+// 二叉堆（供 Dijkstra 使用）。不支持 decrease-key，采用重复入堆并在弹出时跳过过时条目。
 typedef struct {
   ll d; // distance
   int v; // vertex
 } Pair;
-Pair *heap_arr;
-int heap_sz = 0;
+typedef struct {
+  Pair *arr; // 下标从 1 开始
+  int sz;
+} Heap;
 
 // 将 (d, v) 插入堆中
-void heap_push(ll d, int v) {
-  int i = ++heap_sz;
+static void heap_push(Heap *h, ll d, int v) {
+  Pair *heap_arr = h->arr;
+  int i = ++h->sz;
   heap_arr[i].d = d;
   heap_arr[i].v = v;
   while (i > 1) {
@@ -81,15 +229,16 @@ void heap_push(ll d, int v) {
 }
 
 // 弹出最小的 (d, v)。调用方需通过与最新的 dist[v] 比较来判断条目是否过时。
-Pair heap_pop() {
+static Pair heap_pop(Heap *h) {
+  Pair *heap_arr = h->arr;
   Pair ret = heap_arr[1];
-  heap_arr[1] = heap_arr[heap_sz--];
+  heap_arr[1] = heap_arr[h->sz--];
   int i = 1;
   while (1) {
     int l = i << 1, r = l + 1, smallest = i;
-    if (l <= heap_sz && heap_arr[l].d < heap_arr[smallest].d)
+    if (l <= h->sz && heap_arr[l].d < heap_arr[smallest].d)
       smallest = l;
-    if (r <= heap_sz && heap_arr[r].d < heap_arr[smallest].d)
+    if (r <= h->sz && heap_arr[r].d < heap_arr[smallest].d)
       smallest = r;
     if (smallest == i)
       break;
@@ -101,108 +250,723 @@ Pair heap_pop() {
   return ret;
 }
 
+// 单源最短路（SPFA，允许负费用）：只沿剩余容量为正的边松弛
+// 结果写入 dist（不可达为 INF）以及前驱 prevv/preve（不可达为 -1）
+static void spfa(const mcmf_graph *g, int s, ll *dist, int *prevv, int *preve) {
+  int N = g->N;
+  const int *head = g->head, *to_ = g->to_, *next_ = g->next_, *cap_ = g->cap_;
+  const int *offset = g->offset;
+  const ll *cost_ = g->cost_;
+  int *inqueue = malloc(sizeof(int) * N); // 队列内标记
+  for (int i = 0; i < N; ++i) {
+    dist[i] = INF;
+    prevv[i] = -1;
+    preve[i] = -1;
+    inqueue[i] = 0;
+  }
+
+  // 环形缓冲区实现 SPFA 队列，容量设为 N*5+5（足够避免频繁溢出）
+  int capq = N * 5 + 5;
+  int *queue = malloc(sizeof(int) * capq);
+  int qhead = 0, qtail = 0;
+  dist[s] = 0;
+  queue[qtail++] = s;
+  if (qtail == capq) qtail = 0;
+  inqueue[s] = 1;
+
+  while (qhead != qtail) {
+    int v = queue[qhead++];
+    if (qhead == capq) qhead = 0;
+    inqueue[v] = 0;
+#define SPFA_RELAX(e)                                                          \
+  do {                                                                         \
+    if (cap_[e] <= 0) break;                                                   \
+    int to = to_[e];                                                           \
+    if (dist[to] > dist[v] + cost_[e]) {                                       \
+      dist[to] = dist[v] + cost_[e];                                           \
+      prevv[to] = v;                                                           \
+      preve[to] = e;                                                           \
+      if (!inqueue[to]) {                                                      \
+        inqueue[to] = 1;                                                       \
+        queue[qtail++] = to;                                                   \
+        if (qtail == capq) qtail = 0;                                          \
+      }                                                                        \
+    }                                                                          \
+  } while (0)
+    // 布局只在顶点粒度上判断一次，内层循环各自保持最简形式
+    if (offset) {
+      for (int e = offset[v]; e < offset[v + 1]; e++)
+        SPFA_RELAX(e);
+    } else {
+      for (int e = head[v]; e != -1; e = next_[e])
+        SPFA_RELAX(e);
+    }
+#undef SPFA_RELAX
+  }
+  free(queue);
+  free(inqueue);
+}
+
+// 堆优化 Dijkstra：在约化费用 cost_[e] + h[u] - h[v]（要求非负）上求最短路
+// dist 为约化距离；每个顶点只扫描一次出边，入堆次数不超过 edge_cnt + 1
+static void dijkstra(const mcmf_graph *g, Heap *heap, int s, const ll *h,
+                     ll *dist, int *prevv, int *preve) {
+  int N = g->N;
+  const int *head = g->head, *to_ = g->to_, *next_ = g->next_, *cap_ = g->cap_;
+  const int *offset = g->offset;
+  const ll *cost_ = g->cost_;
+  for (int i = 0; i < N; ++i) {
+    dist[i] = INF;
+    prevv[i] = -1;
+    preve[i] = -1;
+  }
+  heap->sz = 0;
+  dist[s] = 0;
+  heap_push(heap, 0, s);
+
+  while (heap->sz > 0) {
+    Pair p = heap_pop(heap);
+    int v = p.v;
+    if (p.d > dist[v]) continue; // 过时条目
+#define DIJKSTRA_RELAX(e)                                                      \
+  do {                                                                         \
+    if (cap_[e] <= 0) break;                                                   \
+    int to = to_[e];                                                           \
+    ll nd = dist[v] + cost_[e] + h[v] - h[to];                                 \
+    if (nd < dist[to]) {                                                       \
+      dist[to] = nd;                                                           \
+      prevv[to] = v;                                                           \
+      preve[to] = e;                                                           \
+      heap_push(heap, nd, to);                                                 \
+    }                                                                          \
+  } while (0)
+    if (offset) {
+      for (int e = offset[v]; e < offset[v + 1]; e++)
+        DIJKSTRA_RELAX(e);
+    } else {
+      for (int e = head[v]; e != -1; e = next_[e])
+        DIJKSTRA_RELAX(e);
+    }
+#undef DIJKSTRA_RELAX
+  }
+}
+
+// 沿 prevv/preve 记录的 s->t 路径推送瓶颈流量，累加费用；返回推送的流量（0 表示无法增广）
+static int augment(mcmf_graph *g, int s, int t, const int *prevv,
+                   const int *preve, ll *cost) {
+  int *cap_ = g->cap_;
+  // 计算路径的最小残量
+  int d = INT_MAX;
+  for (int v = t; v != s; v = prevv[v]) {
+    int e = preve[v];
+    if (e == -1) return 0;
+    if (cap_[e] < d) d = cap_[e];
+  }
+
+  // 沿路径增广并累加费用
+  for (int v = t; v != s; v = prevv[v]) {
+    int e = preve[v];
+    cap_[e] -= d;
+    cap_[rev_edge(g, e)] += d;
+    *cost += (ll)d * g->cost_[e];
+  }
+  return d;
+}
+
 // 主算法（每轮用 SPFA 找最小费用增广路径并增广）
 // 参数：s 源点，t 汇点，out_flow/out_cost 为输出指针
-void min_cost_max_flow(int s, int t, long long *out_flow, long long *out_cost) {
-  // 使用队列（SPFA）在残量图中寻找每轮的最小费用路径并增广
+static void min_cost_max_flow(mcmf_graph *g, int s, int t, long long *out_flow,
+                              long long *out_cost) {
+  int N = g->N;
   ll flow = 0, cost = 0;
   ll *dist = malloc(sizeof(ll) * N);     // 最短费用距离
   int *prevv = malloc(sizeof(int) * N);  // 前驱顶点
   int *preve = malloc(sizeof(int) * N);  // 前驱边索引
-  int *inqueue = malloc(sizeof(int) * N); // 队列内标记
 
   // 每次找到一条最小费用路径并增广
   while (1) {
-    for (int i = 0; i < N; ++i) {
-      dist[i] = INF;
-      prevv[i] = -1;
-      preve[i] = -1;
-      inqueue[i] = 0;
+    spfa(g, s, dist, prevv, preve);
+
+    // 若汇点不可达则结束
+    if (prevv[t] == -1) break;
+
+    int d = augment(g, s, t, prevv, preve, &cost);
+    if (d == 0) break;
+    flow += d;
+    g->augments++;
+  }
+
+  *out_flow = flow;
+  *out_cost = cost;
+
+  free(dist);
+  free(prevv);
+  free(preve);
+}
+
+// 原始-对偶版本（Dijkstra + Johnson 势能）
+// 先用一次 SPFA 求初始势能 h（允许负费用边），此后每轮在约化费用上跑堆优化 Dijkstra，
+// 并令 h[v] += dist[v]：最短路上的边约化费用为 0，增广产生的反向边约化费用也为 0，
+// 因此下一轮所有剩余边的约化费用仍然非负。单轮 O(m log m)，不再受 SPFA 最坏 O(nm) 影响
+static void min_cost_max_flow_dijkstra(mcmf_graph *g, int s, int t,
+                                       long long *out_flow, long long *out_cost) {
+  int N = g->N;
+  ll flow = 0, cost = 0;
+  ll *h = malloc(sizeof(ll) * N);        // 势能
+  ll *dist = malloc(sizeof(ll) * N);     // 约化费用下的最短距离
+  int *prevv = malloc(sizeof(int) * N);  // 前驱顶点
+  int *preve = malloc(sizeof(int) * N);  // 前驱边索引
+  Heap heap = {malloc(sizeof(Pair) * (g->edge_cnt + 2)), 0}; // 下标从 1 开始
+
+  // 初始势能；第一条增广路径直接使用这次 SPFA 的结果
+  spfa(g, s, h, prevv, preve);
+  for (int i = 0; i < N; ++i)
+    if (h[i] == INF) h[i] = 0; // 从 s 不可达的顶点以后也不会可达
+
+  while (prevv[t] != -1) {
+    int d = augment(g, s, t, prevv, preve, &cost);
+    if (d == 0) break;
+    flow += d;
+    g->augments++;
+
+    dijkstra(g, &heap, s, h, dist, prevv, preve);
+    for (int i = 0; i < N; ++i)
+      if (dist[i] != INF) h[i] += dist[i];
+  }
+
+  *out_flow = flow;
+  *out_cost = cost;
+
+  free(h);
+  free(dist);
+  free(prevv);
+  free(preve);
+  free(heap.arr);
+}
+
+// 容量缩放版本的一次多源 Dijkstra：以所有盈余 >= delta 的顶点为起点（距离 0），只沿残量 >= delta 的边
+// 在约化费用上松弛，弹出第一个亏空 <= -delta 的顶点时停止，返回该顶点并把它的距离写入 *reach；
+// 找不到时返回 -1。路径只记录前驱边 preve，前驱顶点即 to_[rev_edge(g, e)]
+static int scaling_dijkstra(const mcmf_graph *g, Heap *heap, ll delta,
+                            const ll *excess, const ll *h, ll *dist, int *preve,
+                            ll *reach) {
+  int N = g->N;
+  const int *head = g->head, *to_ = g->to_, *next_ = g->next_, *cap_ = g->cap_;
+  const int *offset = g->offset;
+  const ll *cost_ = g->cost_;
+  heap->sz = 0;
+  for (int i = 0; i < N; ++i) {
+    preve[i] = -1;
+    dist[i] = INF;
+    if (excess[i] >= delta) {
+      dist[i] = 0;
+      heap_push(heap, 0, i);
     }
+  }
 
-    // 环形缓冲区实现 SPFA 队列，容量设为 N*5+5（足够避免频繁溢出）
-    int capq = N * 5 + 5;
-    int *queue = malloc(sizeof(int) * capq);
-    int qhead = 0, qtail = 0;
-    dist[s] = 0;
-    queue[qtail++] = s;
-    if (qtail == capq) qtail = 0;
-    inqueue[s] = 1;
-
-    while (qhead != qtail) {
-      int v = queue[qhead++];
-      if (qhead == capq) qhead = 0;
-      inqueue[v] = 0;
-      for (int e = head[v]; e != -1; e = next_[e]) {
-        if (cap_[e] <= 0) continue;
-        int to = to_[e];
-        if (dist[to] > dist[v] + cost_[e]) {
-          dist[to] = dist[v] + cost_[e];
-          prevv[to] = v;
-          preve[to] = e;
-          if (!inqueue[to]) {
-            inqueue[to] = 1;
-            queue[qtail++] = to;
-            if (qtail == capq) qtail = 0;
-          }
-        }
-      }
+  while (heap->sz > 0) {
+    Pair p = heap_pop(heap);
+    int v = p.v;
+    if (p.d > dist[v]) continue; // 过时条目
+    if (excess[v] <= -delta) {
+      *reach = p.d;
+      return v;
+    }
+#define SCALING_RELAX(e)                                                       \
+  do {                                                                         \
+    if (cap_[e] < delta) break;                                                \
+    int to = to_[e];                                                           \
+    ll nd = dist[v] + cost_[e] + h[v] - h[to];                                 \
+    if (nd < dist[to]) {                                                       \
+      dist[to] = nd;                                                           \
+      preve[to] = e;                                                           \
+      heap_push(heap, nd, to);                                                 \
+    }                                                                          \
+  } while (0)
+    if (offset) {
+      for (int e = offset[v]; e < offset[v + 1]; e++)
+        SCALING_RELAX(e);
+    } else {
+      for (int e = head[v]; e != -1; e = next_[e])
+        SCALING_RELAX(e);
     }
-    free(queue);
+#undef SCALING_RELAX
+  }
+  return -1;
+}
 
-    // 若汇点不可达则结束
-    if (prevv[t] == -1) break;
+// 在容许边（残量 >= delta 且约化费用为 0）上从盈余顶点 src 深度优先寻找亏空 <= -delta 的顶点
+// 找到时 path[0..len-1] 为路径上的边并返回 len，找不到返回 -1
+// cur 为各顶点的当前弧；state 为 0 未访问、1 在当前路径上、2 已证明走不通
+static int admissible_path(const mcmf_graph *g, int src, ll delta, const ll *h,
+                           const ll *excess, int *cur, char *state, int *path) {
+  const int *to_ = g->to_, *next_ = g->next_, *cap_ = g->cap_;
+  const int *offset = g->offset;
+  const ll *cost_ = g->cost_;
+  int len = 0, v = src;
+  state[src] = 1;
+  while (1) {
+    if (excess[v] <= -delta)
+      return len;
+    int end = offset ? offset[v + 1] : -1, e = cur[v];
+    for (; e != end; e = offset ? e + 1 : next_[e]) {
+      int to = to_[e];
+      if (cap_[e] >= delta && state[to] == 0 && cost_[e] + h[v] - h[to] == 0)
+        break;
+    }
+    cur[v] = e;
+    if (e != end) {
+      path[len++] = e;
+      v = to_[e];
+      state[v] = 1;
+      continue;
+    }
+    // v 的出边都走不通：回退一步，并跳过通向 v 的那条边
+    state[v] = 2;
+    if (len == 0)
+      return -1;
+    e = path[--len];
+    v = to_[rev_edge(g, e)];
+    cur[v] = offset ? e + 1 : next_[e];
+  }
+}
+
+// 容量缩放版本（Δ-scaling + 势能），按最小费用循环流求解
+// 求解前加入 t->s 的回流边（见 add_return_arcs），费用为 -weight，比任何简单 s-t 路径都小，
+// 因此最小费用循环流先使回流边上的流量最大、再使费用最小，回流边上的流量就是最大流；
+// 原图中没有费用绝对值等于 weight 的边，回流边及其反向边由费用即可识别
+// Δ 从不超过最大容量的 2 的幂开始逐次减半，每个阶段：
+//   1. 残量 >= Δ 且约化费用为负的边直接推满，在两端留下盈余/亏空，之后这类边的约化费用都非负
+//   2. 反复跑 scaling_dijkstra，按 h[v] += min(dist[v], reach) 更新势能（约化费用保持非负），
+//      此时最短路上的边约化费用都为 0；在这些容许边上用 admissible_path 反复找路径，
+//      从盈余顶点向亏空顶点推送 min(盈余, 亏空, 瓶颈) >= Δ 单位，走不通时再重新跑 Dijkstra
+// 每条增广路至少推送 Δ 单位，阶段数为 O(log U)，增广次数不再随总流量增长
+static void min_cost_max_flow_scaling(mcmf_graph *g, int s, ll weight,
+                                      long long *out_flow, long long *out_cost) {
+  int N = g->N, E = g->edge_cnt;
+  int *cap_ = g->cap_;
+  const int *to_ = g->to_;
+  const ll *cost_ = g->cost_;
+  ll flow = 0, cost = 0;
+  ll *h = malloc(sizeof(ll) * N);         // 势能
+  ll *dist = malloc(sizeof(ll) * N);      // 约化费用下的最短距离
+  ll *excess = calloc(N, sizeof(ll));     // 盈余（负数为亏空）
+  int *prevv = malloc(sizeof(int) * N);   // 仅供初始 SPFA 使用
+  int *preve = malloc(sizeof(int) * N);   // 前驱边索引
+  int *cur = malloc(sizeof(int) * N);     // 当前弧
+  int *path = malloc(sizeof(int) * N);    // 容许路径上的边
+  char *state = malloc(N);
+  int *saved = malloc(sizeof(int) * (E > 0 ? E : 1));
+  Heap heap = {malloc(sizeof(Pair) * (N + E + 2)), 0}; // 多源入堆，下标从 1 开始
+
+  // 初始势能：暂时关闭回流边（否则 SPFA 会沿 t->s 陷入负环），从 s 不可达的顶点取 0
+  // 原图边的最大容量决定起始的 Δ
+  int max_cap = 0;
+  for (int e = 0; e < E; e++) {
+    saved[e] = cap_[e];
+    if (cost_[e] == -weight)
+      cap_[e] = 0;
+    else if (cost_[e] != weight && cap_[e] > max_cap)
+      max_cap = cap_[e];
+  }
+  spfa(g, s, h, prevv, preve);
+  memcpy(cap_, saved, sizeof(int) * E);
+  free(saved);
+  for (int i = 0; i < N; ++i)
+    if (h[i] == INF) h[i] = 0;
 
-    // 计算路径的最小残量
-    int d = INT_MAX;
-    for (int v = t; v != s; v = prevv[v]) {
-      int e = preve[v];
-      if (e == -1) { d = 0; break; }
-      if (cap_[e] < d) d = cap_[e];
+  ll delta = 1;
+  while (delta * 2 <= max_cap)
+    delta *= 2;
+
+  for (; max_cap > 0 && delta >= 1; delta >>= 1) {
+    g->phases++;
+    for (int e = 0; e < E; e++) {
+      if (cap_[e] < delta) continue;
+      int r = rev_edge(g, e), u = to_[r], v = to_[e];
+      if (cost_[e] + h[u] - h[v] >= 0) continue;
+      int d = cap_[e];
+      cap_[e] = 0;
+      cap_[r] += d;
+      excess[u] -= d;
+      excess[v] += d;
+      if (llabs(cost_[e]) != weight) cost += (ll)d * cost_[e];
     }
-    if (d == 0) break;
 
-    // 沿路径增广并累加费用
-    for (int v = t; v != s; v = prevv[v]) {
-      int e = preve[v];
-      cap_[e] -= d;
-      cap_[e ^ 1] += d;
-      cost += (ll)d * cost_[e];
+    ll reach;
+    while (scaling_dijkstra(g, &heap, delta, excess, h, dist, preve, &reach) != -1) {
+      for (int i = 0; i < N; ++i) {
+        h[i] += dist[i] < reach ? dist[i] : reach;
+        cur[i] = g->offset ? g->offset[i] : g->head[i];
+        state[i] = 0;
+      }
+
+      for (int u = 0; u < N; u++) {
+        while (excess[u] >= delta) {
+          int len = admissible_path(g, u, delta, h, excess, cur, state, path);
+          if (len < 0) break;
+          // 推送量受起点盈余、终点亏空与路径瓶颈限制
+          int v = to_[path[len - 1]];
+          ll d = excess[u] < -excess[v] ? excess[u] : -excess[v];
+          for (int k = 0; k < len; k++)
+            if (cap_[path[k]] < d) d = cap_[path[k]];
+          for (int k = 0; k < len; k++) {
+            int e = path[k], r = rev_edge(g, e);
+            cap_[e] -= (int)d;
+            cap_[r] += (int)d;
+            if (llabs(cost_[e]) != weight) cost += d * cost_[e];
+            state[to_[r]] = 0;
+          }
+          state[v] = 0;
+          excess[u] -= d;
+          excess[v] += d;
+          g->augments++;
+        }
+      }
     }
-    flow += d;
   }
 
+  // 回流边上的流量即各条回流边的反向边（费用 +weight）的残量
+  for (int e = 0; e < E; e++)
+    if (cost_[e] == weight) flow += cap_[e];
   *out_flow = flow;
   *out_cost = cost;
 
+  free(h);
   free(dist);
+  free(excess);
   free(prevv);
   free(preve);
-  free(inqueue);
+  free(cur);
+  free(path);
+  free(state);
+  free(heap.arr);
+}
+
+// 为容量缩放算法加入回流边 t->s：总容量取 s 出边与 t 入边容量之和中较小者（最大流的上界），
+// 超过 INT_MAX 时拆成多条平行边；费用为 -weight，weight = 所有边费用绝对值之和 + 1
+// 必须在构建 CSR 之前调用；成功返回 weight，分配失败返回 -1
+static ll add_return_arcs(mcmf_graph *g, int s, int t) {
+  ll out_s = 0, in_t = 0, weight = 1;
+  for (int e = 0; e < g->edge_cnt; e += 2) { // 偶数下标为正向边，起点是 to_[e ^ 1]
+    if (g->to_[e ^ 1] == s) out_s += g->cap_[e];
+    if (g->to_[e] == t) in_t += g->cap_[e];
+    weight += llabs(g->cost_[e]);
+  }
+  ll cap = out_s < in_t ? out_s : in_t;
+  ll arcs = cap / INT_MAX + 1;
+  if (arcs > INT_MAX / 2 || ensure_edge_alloc(g, (int)arcs * 2) != 0)
+    return -1;
+  for (; cap > INT_MAX; cap -= INT_MAX)
+    add_edge(g, t, s, INT_MAX, -weight);
+  add_edge(g, t, s, (int)cap, -weight);
+  return weight;
+}
+
+int mcmf_solve(mcmf_graph *g, int s, int t, int algo, long long *flow,
+               long long *cost) {
+  if (s < 0 || s >= g->N || t < 0 || t >= g->N)
+    return MCMF_EINVAL;
+  *flow = 0;
+  *cost = 0;
+  g->augments = 0;
+  g->phases = 0;
+  int layout = algo & MCMF_LIST_LAYOUT;
+  algo &= ~MCMF_LIST_LAYOUT;
+  if (algo != MCMF_SPFA && algo != MCMF_DIJKSTRA && algo != MCMF_SCALING)
+    return MCMF_EINVAL;
+  // 容量缩放的回流边要在构建 CSR 之前加入原图，因此这种算法不能用于已求解过的图
+  ll weight = 0;
+  if (algo == MCMF_SCALING && s != t) {
+    if (g->solved || g->offset)
+      return MCMF_ESOLVED;
+    if ((weight = add_return_arcs(g, s, t)) < 0)
+      return MCMF_ENOMEM;
+  }
+  g->solved = 1;
+  if (!layout && !g->offset)
+    build_csr(g); // 失败时退回链表布局
+  if (s == t)
+    return MCMF_OK;
+  if (algo == MCMF_SCALING) {
+    min_cost_max_flow_scaling(g, s, weight, flow, cost);
+  } else if (algo == MCMF_DIJKSTRA)
+    min_cost_max_flow_dijkstra(g, s, t, flow, cost);
+  else
+    min_cost_max_flow(g, s, t, flow, cost);
+  return MCMF_OK;
+}
+
+#ifndef MCMF_NO_MAIN
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <time.h>
+#include <unistd.h>
+
+// 整个输入一次性放入内存：普通文件直接 mmap，管道等其他输入分块 read 到缓冲区
+typedef struct {
+  const char *data;
+  size_t len;
+  int mapped; // 1 表示 data 来自 mmap
+} Input;
+
+static int load_input(int fd, Input *in) {
+  struct stat st;
+  in->data = NULL;
+  in->len = 0;
+  in->mapped = 0;
+  if (fstat(fd, &st) == 0 && S_ISREG(st.st_mode) && st.st_size > 0) {
+    void *p = mmap(NULL, (size_t)st.st_size, PROT_READ, MAP_PRIVATE, fd, 0);
+    if (p != MAP_FAILED) {
+      in->data = p;
+      in->len = (size_t)st.st_size;
+      in->mapped = 1;
+      return 0;
+    }
+  }
+
+  size_t cap = 1 << 16, len = 0;
+  char *buf = malloc(cap);
+  if (!buf)
+    return -1;
+  while (1) {
+    if (len == cap) {
+      char *nb = realloc(buf, cap * 2);
+      if (!nb) {
+        free(buf);
+        return -1;
+      }
+      buf = nb;
+      cap *= 2;
+    }
+    ssize_t r = read(fd, buf + len, cap - len);
+    if (r < 0) {
+      free(buf);
+      return -1;
+    }
+    if (r == 0)
+      break;
+    len += (size_t)r;
+  }
+  in->data = buf;
+  in->len = len;
+  return 0;
+}
+
+static void release_input(Input *in) {
+  if (in->mapped)
+    munmap((void *)in->data, in->len);
+  else
+    free((void *)in->data);
 }
 
-int main() {
-  int n, m;
-  if (scanf("%d %d", &n, &m) != 2)
+// 手写的整数分词器：跳过空白后解析一个可带符号的十进制整数，成功返回 1
+// 相比 scanf 没有格式串解释和 locale 处理，每个字符只做一次比较
+typedef struct {
+  const char *p, *end;
+} Tokenizer;
+
+static int next_int(Tokenizer *tk, ll *out) {
+  const char *p = tk->p, *end = tk->end;
+  while (p < end && (unsigned char)*p <= ' ')
+    p++;
+  int neg = 0;
+  if (p < end && (*p == '-' || *p == '+'))
+    neg = *p++ == '-';
+  if (p >= end || *p < '0' || *p > '9')
     return 0;
-  N = n;
-  head = malloc(sizeof(int) * N);
-  for (int i = 0; i < N; i++)
-    head[i] = -1;
-  ensure_edge_alloc(m);
-  int s, t;
-  // we'll read edges then read s t on next line or last two inputs
+  ll x = 0;
+  while (p < end && *p >= '0' && *p <= '9')
+    x = x * 10 + (*p++ - '0');
+  tk->p = p;
+  *out = neg ? -x : x;
+  return 1;
+}
+
+// 解析文本格式。返回 0 成功；1 输入不完整（与原先一样不输出结果）；-1 数据非法
+static int read_text_graph(const char *data, size_t len, mcmf_graph **out,
+                           int *s, int *t) {
+  Tokenizer tk = {data, data + len};
+  ll n, m;
+  if (!next_int(&tk, &n) || !next_int(&tk, &m))
+    return 1;
+  if (n < 0 || n > INT_MAX || m < 0 || m > INT_MAX / 2) {
+    fprintf(stderr, "invalid graph size: n=%lld m=%lld\n", n, m);
+    return -1;
+  }
+  mcmf_graph *g = mcmf_create((int)n, (int)m);
+  if (!g)
+    return -1;
   // assume next m lines: u v cap cost, then a line: s t
-  for (int i = 0; i < m; i++) {
-    int u, v, c;
-    ll w;
-    scanf("%d %d %d %lld", &u, &v, &c, &w);
-    add_edge(u, v, c, w);
+  for (ll i = 0; i < m; i++) {
+    ll u, v, c, w;
+    if (!next_int(&tk, &u) || !next_int(&tk, &v) || !next_int(&tk, &c) ||
+        !next_int(&tk, &w))
+      break;
+    if (u < 0 || u >= n || v < 0 || v >= n || c < 0 || c > INT_MAX) {
+      fprintf(stderr, "invalid edge %lld: %lld %lld %lld\n", i, u, v, c);
+      mcmf_free(g);
+      return -1;
+    }
+    add_edge(g, (int)u, (int)v, (int)c, w);
   }
-  if (scanf("%d %d", &s, &t) != 2)
-    return 0;
+  ll ss, tt;
+  if (!next_int(&tk, &ss) || !next_int(&tk, &tt)) {
+    mcmf_free(g);
+    return 1;
+  }
+  *out = g;
+  *s = (int)ss;
+  *t = (int)tt;
+  return 0;
+}
+
+// 二进制图格式（小端字节序）：32 字节文件头 + 按列存放的边数组
+//   char magic[4] = "MCMF"; uint32 version = 1; int32 n, s, t; uint32 reserved; int64 m;
+//   int32 u[m]; int32 v[m]; int32 cap[m]; 补齐到 8 字节; int64 cost[m]
+// 各列在映射的文件中已对齐，直接作为 mcmf_add_edges 的参数，不解析也不拷贝；
+// 因此只在小端主机上读取，大端主机上拒绝该格式
+// 生成与转换见 mcmf_binary.py
+#define BINARY_MAGIC "MCMF"
+#define BINARY_VERSION 1
+typedef struct {
+  char magic[4];
+  unsigned int version;
+  int n, s, t;
+  unsigned int reserved;
+  long long m;
+} BinaryHeader;
+_Static_assert(sizeof(BinaryHeader) == 32, "binary header must be 32 bytes");
+
+// 解析二进制格式。返回 0 成功；-1 文件头或长度非法
+static int read_binary_graph(const char *data, size_t len, mcmf_graph **out,
+                             int *s, int *t) {
+#if defined(__BYTE_ORDER__) && __BYTE_ORDER__ != __ORDER_LITTLE_ENDIAN__
+  (void)data, (void)len, (void)out, (void)s, (void)t;
+  fprintf(stderr, "binary graphs are little-endian; not supported on this host\n");
+  return -1;
+#else
+  BinaryHeader h;
+  if (len < sizeof h) {
+    fprintf(stderr, "truncated binary header\n");
+    return -1;
+  }
+  memcpy(&h, data, sizeof h);
+  if (h.version != BINARY_VERSION || h.n < 0 || h.m < 0 || h.m > INT_MAX / 2) {
+    fprintf(stderr, "unsupported binary graph (version %u, n=%d, m=%lld)\n",
+            h.version, h.n, h.m);
+    return -1;
+  }
+  size_t m = (size_t)h.m;
+  size_t cost_at = sizeof h + 12 * m;
+  cost_at += (8 - cost_at % 8) % 8;
+  if (len < cost_at + 8 * m) {
+    fprintf(stderr, "truncated binary graph: %zu bytes, expected %zu\n", len,
+            cost_at + 8 * m);
+    return -1;
+  }
+  const int *u = (const int *)(data + sizeof h);
+  const ll *cost = (const ll *)(data + cost_at);
+  mcmf_graph *g = mcmf_create(h.n, (int)m);
+  if (!g)
+    return -1;
+  if (mcmf_add_edges(g, (int)m, u, u + m, u + 2 * m, cost) != 0) {
+    fprintf(stderr, "invalid edge in binary graph\n");
+    mcmf_free(g);
+    return -1;
+  }
+  *out = g;
+  *s = h.s;
+  *t = h.t;
+  return 0;
+#endif
+}
+
+static double now_ms(void) {
+  struct timespec ts;
+  clock_gettime(CLOCK_MONOTONIC, &ts);
+  return ts.tv_sec * 1e3 + ts.tv_nsec / 1e6;
+}
+
+int main(int argc, char **argv) {
+  int algo = MCMF_SPFA, layout = 0, verbose = 0;
+  const char *path = NULL;
+  for (int i = 1; i < argc; i++) {
+    if (strcmp(argv[i], "-a") == 0 && i + 1 < argc) {
+      const char *name = argv[++i];
+      if (strcmp(name, "spfa") == 0)
+        algo = MCMF_SPFA;
+      else if (strcmp(name, "dijkstra") == 0)
+        algo = MCMF_DIJKSTRA;
+      else if (strcmp(name, "scaling") == 0)
+        algo = MCMF_SCALING;
+      else {
+        fprintf(stderr, "unknown algorithm: %s\n", name);
+        return 2;
+      }
+    } else if (strcmp(argv[i], "-l") == 0 && i + 1 < argc) {
+      const char *name = argv[++i];
+      if (strcmp(name, "csr") == 0)
+        layout = 0;
+      else if (strcmp(name, "list") == 0)
+        layout = MCMF_LIST_LAYOUT;
+      else {
+        fprintf(stderr, "unknown layout: %s\n", name);
+        return 2;
+      }
+    } else if (strcmp(argv[i], "-v") == 0) {
+      verbose = 1; // 在标准错误输出读入与求解耗时、增广次数与缩放阶段数
+    } else if (argv[i][0] != '-' && !path) {
+      path = argv[i];
+    } else {
+      fprintf(stderr, "usage: %s [-a spfa|dijkstra|scaling] [-l csr|list] [-v] [input]\n", argv[0]);
+      return 2;
+    }
+  }
+
+  double start = now_ms();
+  int fd = path ? open(path, O_RDONLY) : STDIN_FILENO;
+  if (fd < 0) {
+    perror(path);
+    return 1;
+  }
+  Input in;
+  int loaded = load_input(fd, &in);
+  if (path)
+    close(fd); // 映射在关闭文件后仍然有效
+  if (loaded != 0) {
+    fprintf(stderr, "failed to read input\n");
+    return 1;
+  }
+
+  mcmf_graph *g = NULL;
+  int s, t, status;
+  if (in.len >= 4 && memcmp(in.data, BINARY_MAGIC, 4) == 0)
+    status = read_binary_graph(in.data, in.len, &g, &s, &t);
+  else
+    status = read_text_graph(in.data, in.len, &g, &s, &t);
+  release_input(&in);
+  if (status != 0)
+    return status < 0 ? 1 : 0;
+  double loaded_at = now_ms();
+
   long long flow = 0, cost = 0;
-  min_cost_max_flow(s, t, &flow, &cost);
+  status = mcmf_solve(g, s, t, algo | layout, &flow, &cost);
+  if (status != MCMF_OK) {
+    if (status == MCMF_EINVAL)
+      fprintf(stderr, "invalid source/sink: s=%d t=%d (n=%d)\n", s, t, g->N);
+    else
+      fprintf(stderr, "solve failed: %s\n",
+              status == MCMF_ENOMEM ? "out of memory" : "graph already solved");
+    mcmf_free(g);
+    return 1;
+  }
   printf("%lld %lld\n", flow, cost);
+  if (verbose)
+    fprintf(stderr, "read %.3f ms, solve %.3f ms, augments %lld, phases %d\n",
+            loaded_at - start, now_ms() - loaded_at, g->augments, g->phases);
+  mcmf_free(g);
   return 0;
 }
+#endif
@@ -0,0 +1,48 @@
+// 最小费用最大流（MCMF）C 接口
+// 编译为共享库：gcc -std=c11 -O2 -shared -fPIC -DMCMF_NO_MAIN Mcmf/mcmf.c -o Mcmf/libmcmf.so
+// 每个图是独立的句柄，互不共享状态，可在同一进程中反复创建、求解、释放
+
+#ifndef MCMF_H
+#define MCMF_H
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+// 求解算法：SPFA 逐条增广、Dijkstra + 势能（原始-对偶）、容量缩放（Δ-scaling + 势能）
+enum { MCMF_SPFA = 0, MCMF_DIJKSTRA = 1, MCMF_SCALING = 2 };
+
+// mcmf_solve 的返回值
+enum { MCMF_OK = 0, MCMF_EINVAL = -1, MCMF_ESOLVED = -2, MCMF_ENOMEM = -3 };
+
+// 与算法按位或：保持链表布局求解，不构建 CSR（仅用于对比测试）
+#define MCMF_LIST_LAYOUT 0x100
+
+typedef struct mcmf_graph mcmf_graph;
+
+// 创建 n 个顶点的空图；m_hint 为预计边数（只影响初始分配，不足时自动扩容）
+// 分配失败返回 NULL
+mcmf_graph *mcmf_create(int n, int m_hint);
+
+// 批量添加 count 条边 u[i]->v[i]（容量 cap[i]，单位费用 cost[i]）
+// 四个数组由调用方持有，函数只读取、不保留指针
+// 成功返回 0；顶点越界、容量为负或分配失败返回 -1，此时图不变
+int mcmf_add_edges(mcmf_graph *g, int count, const int *u, const int *v,
+                   const int *cap, const long long *cost);
+
+// 求 s 到 t 的最小费用最大流，结果写入 *flow、*cost
+// 求解前先把残量图重排为 CSR 布局（之后不能再加边），求解直接修改残量图，每个图只应求解一次
+// MCMF_SCALING 会在图中额外加入 t->s 的回流边，因此不能用于已求解过的图
+// 成功返回 MCMF_OK；s/t 越界或 algo 未知返回 MCMF_EINVAL，
+// MCMF_SCALING 用于已求解过的图返回 MCMF_ESOLVED，加入回流边时分配失败返回 MCMF_ENOMEM
+int mcmf_solve(mcmf_graph *g, int s, int t, int algo, long long *flow,
+               long long *cost);
+
+// 释放图；g 为 NULL 时什么也不做
+void mcmf_free(mcmf_graph *g);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif
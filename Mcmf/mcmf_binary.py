@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+MCMF 二进制图格式的读写、转换与生成
+格式与 mcmf.c 中的 BinaryHeader 一致，所有整数均为小端：
+    32 字节文件头：magic "MCMF"、uint32 version、int32 n、s、t、uint32 保留、int64 m
+    int32 u[m]、int32 v[m]、int32 cap[m]，补齐到 8 字节后 int64 cost[m]
+按列存放，mcmf 映射文件后把各列直接交给 mcmf_add_edges；
+read_binary 返回的 np.memmap 也可直接传给 mcmf_ctypes.Graph.add_edges，全程不拷贝
+
+用法：
+    python3 Mcmf/mcmf_binary.py generate N M OUT [--seed S] [--max-cap C] [--max-cost W] [--text]
+    python3 Mcmf/mcmf_binary.py convert IN OUT    # 文本 -> 二进制；IN 为二进制时反向转换为文本
+"""
+
+import argparse
+import struct
+import sys
+
+import numpy as np
+
+MAGIC = b"MCMF"
+VERSION = 1
+HEADER = struct.Struct("<4sIiiiIq")  # magic, version, n, s, t, reserved, m
+INT32_MIN, INT32_MAX = -2**31, 2**31 - 1
+INT64_MIN, INT64_MAX = -2**63, 2**63 - 1
+
+
+def column_offsets(m):
+    """返回 u、v、cap、cost 四列的起始字节偏移以及文件总长度"""
+    u_at = HEADER.size
+    cost_at = u_at + 12 * m
+    cost_at += -cost_at % 8
+    return u_at, u_at + 4 * m, u_at + 8 * m, cost_at, cost_at + 8 * m
+
+
+def is_binary(path):
+    """文件是否以二进制格式的魔数开头"""
+    with open(path, "rb") as fp:
+        return fp.read(4) == MAGIC
+
+
+def checked_column(name, values, dtype, low, high):
+    """
+    把一列转换为 dtype 的一维数组；元素必须是 [low, high] 内的整数，
+    否则抛出 ValueError，而不是像 astype 那样静默回绕（与 mcmf.c 文本读入的检查一致）
+    """
+    values = np.asarray(values).reshape(-1)
+    if not values.size:
+        return values.astype(dtype)
+    if values.dtype.kind not in "iuO":
+        raise ValueError(f"{name} 需要整数，得到 {values.dtype}")
+    if values.dtype.kind == "O" and not all(isinstance(x, (int, np.integer)) for x in values):
+        raise ValueError(f"{name} 需要整数")
+    lo, hi = int(values.min()), int(values.max())
+    if lo < low or hi > high:
+        raise ValueError(f"{name} 超出范围 [{low}, {high}]：最小 {lo}，最大 {hi}")
+    return values.astype(dtype)
+
+
+def check_graph(n, u, v, cap, cost, s, t):
+    """
+    检查图的各字段都能无损写入二进制格式，返回转换后的 (u, v, cap, cost)
+    u、v 必须在 [0, n) 内，cap 在 [0, INT32_MAX] 内，cost 为 int64；越界抛出 ValueError
+    """
+    if not 0 <= n <= INT32_MAX:
+        raise ValueError(f"n 超出范围 [0, {INT32_MAX}]：{n}")
+    for name, x in (("s", s), ("t", t)):
+        if not INT32_MIN <= x <= INT32_MAX:
+            raise ValueError(f"{name} 超出 int32 范围：{x}")
+    if not len(u) == len(v) == len(cap) == len(cost):
+        raise ValueError("u、v、cap、cost 长度不一致")
+    return (checked_column("u", u, "<i4", 0, n - 1),
+            checked_column("v", v, "<i4", 0, n - 1),
+            checked_column("cap", cap, "<i4", 0, INT32_MAX),
+            checked_column("cost", cost, "<i8", INT64_MIN, INT64_MAX))
+
+
+def write_binary(path, n, u, v, cap, cost, s, t):
+    """
+    把图写成二进制格式（小端）；u、v、cap 按 int32，cost 按 int64 写出
+    任一值超出范围时抛出 ValueError，不写出文件
+    """
+    u, v, cap, cost = check_graph(n, u, v, cap, cost, s, t)
+    m = len(u)
+    u_at, _, _, cost_at, _ = column_offsets(m)
+    with open(path, "wb") as fp:
+        fp.write(HEADER.pack(MAGIC, VERSION, n, s, t, 0, m))
+        for column in (u, v, cap):
+            fp.write(column.tobytes())
+        fp.write(bytes(cost_at - (u_at + 12 * m)))
+        fp.write(cost.tobytes())
+
+
+def read_binary(path):
+    """
+    读取二进制格式，返回 (n, u, v, cap, cost, s, t)
+    四列都是只读的 np.memmap，按需从页缓存读入，不整体加载到内存
+    """
+    with open(path, "rb") as fp:
+        magic, version, n, s, t, _, m = HEADER.unpack(fp.read(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} 不是版本 {VERSION} 的 MCMF 二进制图")
+    if m == 0:
+        empty = np.zeros(0, dtype=np.int32)
+        return n, empty, empty, empty, np.zeros(0, dtype=np.int64), s, t
+    u_at, v_at, cap_at, cost_at, _ = column_offsets(m)
+    u = np.memmap(path, dtype="<i4", mode="r", offset=u_at, shape=(m,))
+    v = np.memmap(path, dtype="<i4", mode="r", offset=v_at, shape=(m,))
+    cap = np.memmap(path, dtype="<i4", mode="r", offset=cap_at, shape=(m,))
+    cost = np.memmap(path, dtype="<i8", mode="r", offset=cost_at, shape=(m,))
+    return n, u, v, cap, cost, s, t
+
+
+def read_text(path):
+    """
+    读取文本格式（n m / m 行 u v cap cost / s t），返回与 read_binary 相同的元组
+    节点编号或容量超出范围时抛出 ValueError
+    """
+    values = np.fromfile(path, dtype=np.int64, sep=" ")
+    if len(values) < 2:
+        raise ValueError(f"{path} 缺少 n m")
+    n, m = int(values[0]), int(values[1])
+    if len(values) < 4 + 4 * m:
+        raise ValueError(f"{path} 不完整：需要 {m} 条边以及 s t")
+    edges = values[2:2 + 4 * m].reshape(m, 4)
+    s, t = (int(x) for x in values[2 + 4 * m:4 + 4 * m])
+    u, v, cap, cost = check_graph(n, edges[:, 0], edges[:, 1], edges[:, 2], edges[:, 3], s, t)
+    return n, u, v, cap, cost, s, t
+
+
+def write_text(path, n, u, v, cap, cost, s, t):
+    """把图写成 mcmf 的文本输入格式"""
+    with open(path, "w") as fp:
+        fp.write(f"{n} {len(u)}\n")
+        if len(u):
+            edges = np.column_stack([np.asarray(c, dtype=np.int64) for c in (u, v, cap, cost)])
+            np.savetxt(fp, edges, fmt="%d")
+        fp.write(f"{s} {t}\n")
+
+
+def generate_graph(n, m, max_cap=100, max_cost=100, seed=None):
+    """
+    向量化生成随机有向图，与 test_performance.generate_random_graph 的分布相同：
+    先放一条 s -> t 的短路径保证连通，再补足不重复、无自环的随机边
+    返回 (n, u, v, cap, cost, s, t)，适合生成 10^6–10^7 条边的大图
+    """
+    rng = np.random.default_rng(seed)
+    s, t = 0, n - 1
+
+    path = np.concatenate(([s], rng.integers(1, max(n - 1, 2), size=min(5, n - 1) - 1), [t]))
+    keys = path[:-1].astype(np.int64) * n + path[1:]
+    keys = keys[path[:-1] != path[1:]]
+    keys = keys[np.sort(np.unique(keys, return_index=True)[1])]
+    path_count = len(keys)
+
+    # 候选边多取一些，去掉自环与重复后截取所需数量（保持随机顺序）
+    max_edges = n * (n - 1)
+    m = min(m, max_edges)
+    while len(keys) < m:
+        need = m - len(keys)
+        cand = rng.integers(0, n, size=(2, need + need // 4 + 16), dtype=np.int64)
+        cand = cand[:, cand[0] != cand[1]]
+        merged = np.concatenate((keys, cand[0] * n + cand[1]))
+        _, first = np.unique(merged, return_index=True)
+        keys = merged[np.sort(first)][:m]
+
+    u = (keys // n).astype(np.int32)
+    v = (keys % n).astype(np.int32)
+    cap = rng.integers(1, max_cap + 1, size=len(keys), dtype=np.int32)
+    cap[:path_count] = rng.integers(max_cap // 2, max_cap + 1, size=path_count, dtype=np.int32)
+    cost = rng.integers(1, max_cost + 1, size=len(keys), dtype=np.int64)
+    return n, u, v, cap, cost, s, t
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MCMF 二进制图格式的生成与转换")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    gen = sub.add_parser("generate", help="生成随机图（默认写成二进制格式）")
+    gen.add_argument("n", type=int)
+    gen.add_argument("m", type=int)
+    gen.add_argument("output")
+    gen.add_argument("--seed", type=int, default=None)
+    gen.add_argument("--max-cap", type=int, default=100)
+    gen.add_argument("--max-cost", type=int, default=100)
+    gen.add_argument("--text", action="store_true", help="写成文本格式")
+
+    conv = sub.add_parser("convert", help="文本与二进制格式互相转换（按输入的魔数判断方向）")
+    conv.add_argument("input")
+    conv.add_argument("output")
+
+    args = parser.parse_args(argv)
+    if args.command == "generate":
+        if args.n < 2:
+            parser.error("n 至少为 2")
+        graph = generate_graph(args.n, args.m, args.max_cap, args.max_cost, args.seed)
+        (write_text if args.text else write_binary)(args.output, *graph)
+    elif is_binary(args.input):
+        write_text(args.output, *read_binary(args.input))
+    else:
+        write_binary(args.output, *read_text(args.input))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+mcmf.c 的 ctypes 绑定
+把求解器编译为共享库 libmcmf.so，在当前 Python 进程内直接调用 C 接口（见 mcmf.h），
+省去每次启动进程、把整张图格式化为文本再解析输出的开销
+
+边数组以 NumPy 数组或任意支持缓冲区协议的对象（array.array、bytes、memoryview 等）传入，
+dtype 已是 int32 / int64 且连续时直接把指针交给 C，不做拷贝
+
+示例：
+    from mcmf_ctypes import Graph
+    with Graph(4) as g:
+        g.add_edges([0, 1, 0, 2], [1, 3, 2, 3], [3, 2, 2, 2], [1, 2, 2, 1])
+        flow, cost = g.solve(0, 3)          # (4, 12)
+"""
+
+import ctypes
+import os
+import subprocess
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SOURCES = [os.path.join(HERE, "mcmf.c"), os.path.join(HERE, "mcmf.h")]
+LIBRARY = os.path.join(HERE, "libmcmf.so")
+ALGORITHMS = {"spfa": 0, "dijkstra": 1, "scaling": 2}
+LAYOUTS = {"csr": 0, "list": 0x100}  # 与 mcmf.h 中的 MCMF_LIST_LAYOUT 一致
+EINVAL, ESOLVED, ENOMEM = -1, -2, -3  # mcmf_solve 的错误码，与 mcmf.h 一致
+
+_lib = None
+
+
+def build_library(force=False):
+    """共享库不存在或比源文件旧时重新编译，返回库文件路径"""
+    if not force and os.path.exists(LIBRARY) and \
+            os.path.getmtime(LIBRARY) >= max(os.path.getmtime(p) for p in SOURCES):
+        return LIBRARY
+    result = subprocess.run(
+        ["gcc", "-std=c11", "-O2", "-shared", "-fPIC", "-DMCMF_NO_MAIN",
+         SOURCES[0], "-o", LIBRARY],
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"编译 libmcmf.so 失败: {result.stderr}")
+    return LIBRARY
+
+
+def load_library():
+    """加载（必要时先编译）共享库并声明函数签名；只加载一次"""
+    global _lib
+    if _lib is None:
+        lib = ctypes.CDLL(build_library())
+        lib.mcmf_create.argtypes = [ctypes.c_int, ctypes.c_int]
+        lib.mcmf_create.restype = ctypes.c_void_p
+        lib.mcmf_add_edges.argtypes = [ctypes.c_void_p, ctypes.c_int] + [ctypes.c_void_p] * 4
+        lib.mcmf_add_edges.restype = ctypes.c_int
+        lib.mcmf_solve.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                   ctypes.POINTER(ctypes.c_longlong),
+                                   ctypes.POINTER(ctypes.c_longlong)]
+        lib.mcmf_solve.restype = ctypes.c_int
+        lib.mcmf_free.argtypes = [ctypes.c_void_p]
+        lib.mcmf_free.restype = None
+        _lib = lib
+    return _lib
+
+
+def _as_array(values, dtype):
+    """
+    转换为指定 dtype 的一维连续数组
+    元素类型已是该 dtype 的连续 NumPy 数组或缓冲区对象（如 array('i')、np.memmap）只建立视图，不拷贝；
+    其他输入（列表、其他整数类型的数组、按 uint8 解释的 bytes 等）逐元素转换并拷贝
+    非整数输入抛出 TypeError，超出 dtype 范围的值抛出 OverflowError，不会被截断
+    """
+    if not isinstance(values, np.ndarray):
+        try:
+            values = np.asarray(memoryview(values))  # 按缓冲区自身的元素格式建立视图
+        except TypeError:
+            values = np.asarray(values)
+    values = values.reshape(-1)
+    if values.size and not np.can_cast(values.dtype, dtype, casting="safe"):
+        if values.dtype.kind == "O":
+            raise OverflowError(f"元素超出 int64 范围或不是整数，无法转换为 {np.dtype(dtype).name}")
+        if values.dtype.kind not in "iu":
+            raise TypeError(f"需要整数数组，得到 {values.dtype}")
+        info = np.iinfo(dtype)
+        if int(values.min()) < info.min or int(values.max()) > info.max:
+            raise OverflowError(f"元素超出 {np.dtype(dtype).name} 范围 [{info.min}, {info.max}]")
+    return np.ascontiguousarray(values, dtype=dtype)
+
+
+class Graph:
+    """
+    共享库中的一张残量图（mcmf_graph 句柄）
+    每个实例独立持有 C 端内存，用完调用 close（或使用 with 语句）释放；
+    ctypes 调用期间会释放 GIL，不同实例可以在多个线程中同时求解
+    """
+
+    def __init__(self, n, m_hint=0):
+        self._lib = load_library()
+        self.n = n
+        self._handle = self._lib.mcmf_create(n, m_hint)
+        if not self._handle:
+            raise MemoryError(f"无法创建 {n} 个顶点的图")
+
+    def add_edges(self, u, v, cap, cost):
+        """
+        批量添加边 u[i] -> v[i]（容量 cap[i]，单位费用 cost[i]）
+        u、v、cap 按 int32，cost 按 int64 传给 C；四个数组长度必须相同，
+        数值超出对应类型范围时抛出 OverflowError
+        """
+        u, v, cap = (_as_array(a, np.int32) for a in (u, v, cap))
+        cost = _as_array(cost, np.int64)
+        count = len(u)
+        if not len(v) == len(cap) == len(cost) == count:
+            raise ValueError("u、v、cap、cost 的长度必须相同")
+        if self._lib.mcmf_add_edges(self._handle, count, u.ctypes.data, v.ctypes.data,
+                                    cap.ctypes.data, cost.ctypes.data) != 0:
+            raise ValueError("边的端点越界或容量为负")
+
+    def solve(self, s, t, algo="spfa", layout="csr"):
+        """
+        求 s 到 t 的最小费用最大流，返回 (flow, cost)；求解会修改残量图，每个图只求解一次
+        layout 为 "csr" 时先把残量图重排为 CSR 布局，"list" 保持链表布局（用于对比）
+        algo 为 "scaling" 时图必须尚未求解过，否则抛出 RuntimeError
+        """
+        if algo not in ALGORITHMS:
+            raise ValueError(f"未知算法: {algo}（可选 {', '.join(ALGORITHMS)}）")
+        if layout not in LAYOUTS:
+            raise ValueError(f"未知布局: {layout}（可选 {', '.join(LAYOUTS)}）")
+        if not (0 <= s < self.n and 0 <= t < self.n):
+            raise ValueError(f"源点或汇点越界: s={s}, t={t}, n={self.n}")
+        flow, cost = ctypes.c_longlong(), ctypes.c_longlong()
+        status = self._lib.mcmf_solve(self._handle, s, t, ALGORITHMS[algo] | LAYOUTS[layout],
+                                      ctypes.byref(flow), ctypes.byref(cost))
+        if status == ESOLVED:
+            raise RuntimeError("容量缩放算法需要在原图上求解，这个图已经求解过")
+        if status == ENOMEM:
+            raise MemoryError("加入容量缩放的回流边时分配内存失败")
+        if status != 0:
+            raise ValueError(f"mcmf_solve 参数无效（错误码 {status}）")
+        return flow.value, cost.value
+
+    def close(self):
+        if self._handle:
+            self._lib.mcmf_free(self._handle)
+            self._handle = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+
+def min_cost_max_flow(n, u, v, cap, cost, s, t, algo="spfa", layout="csr"):
+    """一次性求解：建图、加边、求解并释放，返回 (flow, cost)"""
+    with Graph(n, len(u)) as g:
+        g.add_edges(u, v, cap, cost)
+        return g.solve(s, t, algo, layout)
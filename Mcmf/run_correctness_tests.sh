@@ -14,58 +14,195 @@ N_MAX=200
 AVG_DEG=3    # average degree
 CAP_MAX=10
 COST_MAX=10
+NEG_EVERY=5  # every NEG_EVERY-th test uses negative costs on a DAG (no negative cycles)
+ALGOS="spfa dijkstra scaling"
+LAYOUTS="csr list"
 
 echo "Compiling C binary..."
 gcc -std=c11 -O2 "$ROOT_DIR/Mcmf/mcmf.c" -o "$BINARY"
+echo "Compiling shared library..."
+gcc -std=c11 -O2 -shared -fPIC -DMCMF_NO_MAIN "$ROOT_DIR/Mcmf/mcmf.c" -o "$ROOT_DIR/Mcmf/libmcmf.so"
 echo "Using reference python: $REFPY"
-echo "Running $NUM_TESTS random tests (N in [$N_MIN,$N_MAX])..."
+echo "Running $NUM_TESTS random tests (N in [$N_MIN,$N_MAX], algorithms: $ALGOS, layouts: $LAYOUTS)..."
 
 FAILED=0
+CHECKS=0
 for i in $(seq 1 $NUM_TESTS); do
   # randomize size
   N=$(shuf -i ${N_MIN}-${N_MAX} -n 1)
   M=$(( N * AVG_DEG ))
   INP="$OUTDIR/test_${i}_n${N}_m${M}.in"
-  OUT_C="$OUTDIR/test_${i}_n${N}_m${M}.c.out"
   OUT_P="$OUTDIR/test_${i}_n${N}_m${M}.py.out"
 
+  NEG=$(( i % NEG_EVERY == 0 ? 1 : 0 ))
+
   # generate random graph
   python3 - <<PY > "$INP"
 import random
 N=$N
 M=$M
+NEG=$NEG
 print(N, M)
 edges = set()
 while len(edges) < M:
     u = random.randrange(0, N)
     v = random.randrange(0, N)
     if u==v: continue
+    if NEG: u, v = min(u, v), max(u, v)
     edges.add((u,v))
 for (u,v) in list(edges)[:M]:
     cap = random.randint(1, $CAP_MAX)
-    cost = random.randint(0, $COST_MAX)
+    cost = random.randint(-$COST_MAX if NEG else 0, $COST_MAX)
     print(u, v, cap, cost)
 print(0, N-1)
 PY
 
-  # run C and python reference
-  "$BINARY" < "$INP" > "$OUT_C"
+  # run python reference, then every C algorithm
   python3 "$REFPY" < "$INP" > "$OUT_P"
-
-  read -r fc cc < "$OUT_C" || fc=""; cc="${cc:-}"
   read -r fp cp < "$OUT_P" || fp=""; cp="${cp:-}"
 
-  if [ "$fc" != "$fp" ] || [ "$cc" != "$cp" ]; then
-    echo "[FAIL] test $i N=$N M=$M -> C:($fc,$cc) REF:($fp,$cp)"
+  for ALGO in $ALGOS; do
+    for LAYOUT in $LAYOUTS; do
+      OUT_C="$OUTDIR/test_${i}_n${N}_m${M}.${ALGO}.${LAYOUT}.out"
+      "$BINARY" -a "$ALGO" -l "$LAYOUT" < "$INP" > "$OUT_C"
+      read -r fc cc < "$OUT_C" || fc=""; cc="${cc:-}"
+      CHECKS=$((CHECKS+1))
+
+      if [ "$fc" != "$fp" ] || [ "$cc" != "$cp" ]; then
+        echo "[FAIL] test $i N=$N M=$M $ALGO/$LAYOUT -> C:($fc,$cc) REF:($fp,$cp)"
+        FAILED=$((FAILED+1))
+        # keep failing input for debugging
+        cp "$INP" "$OUTDIR/fail_test_${i}_n${N}_m${M}.in"
+      else
+        echo "[OK]   test $i N=$N M=$M $ALGO/$LAYOUT -> ($fc,$cc)"
+      fi
+    done
+  done
+
+  # binary graph format: convert the same input and let mcmf map it directly
+  BIN="$OUTDIR/test_${i}_n${N}_m${M}.bin"
+  OUT_B="$OUTDIR/test_${i}_n${N}_m${M}.bin.out"
+  python3 "$ROOT_DIR/Mcmf/mcmf_binary.py" convert "$INP" "$BIN"
+  "$BINARY" "$BIN" > "$OUT_B"
+  read -r fb cb < "$OUT_B" || fb=""; cb="${cb:-}"
+  CHECKS=$((CHECKS+1))
+  if [ "$fb" != "$fp" ] || [ "$cb" != "$cp" ]; then
+    echo "[FAIL] test $i N=$N M=$M binary -> C:($fb,$cb) REF:($fp,$cp)"
     FAILED=$((FAILED+1))
-    # keep failing input for debugging
     cp "$INP" "$OUTDIR/fail_test_${i}_n${N}_m${M}.in"
   else
-    echo "[OK]   test $i N=$N M=$M -> ($fc,$cc)"
+    echo "[OK]   test $i N=$N M=$M binary -> ($fb,$cb)"
   fi
 done
 
-echo "Done. Failed tests: $FAILED / $NUM_TESTS"
+# CLI error paths: mcmf must print nothing on stdout, report on stderr and exit nonzero
+echo "Checking CLI error paths..."
+expect_cli_error() {
+  local name="$1" input="$2"; shift 2
+  CHECKS=$((CHECKS+1))
+  local out err
+  err="$OUTDIR/cli_error.err"
+  if out=$(printf "$input" | "$BINARY" "$@" 2> "$err"); then
+    echo "[FAIL] CLI $name: exit status 0, stdout '$out'"
+    FAILED=$((FAILED+1))
+  elif [ -n "$out" ] || [ ! -s "$err" ]; then
+    echo "[FAIL] CLI $name: stdout '$out', stderr '$(cat "$err")'"
+    FAILED=$((FAILED+1))
+  else
+    echo "[OK]   CLI $name -> $(cat "$err")"
+  fi
+}
+for ALGO in $ALGOS; do
+  expect_cli_error "t out of range ($ALGO)" '2 1\n0 1 5 1\n0 5\n' -a "$ALGO"
+  expect_cli_error "negative s ($ALGO)" '2 1\n0 1 5 1\n-1 1\n' -a "$ALGO"
+done
+
+# same inputs through the ctypes binding (one process, edge arrays passed as NumPy buffers)
+echo "Checking shared-library binding..."
+if ! python3 - "$OUTDIR" "$ALGOS" <<'PY'
+import glob, sys
+import numpy as np
+sys.path.insert(0, sys.argv[1] + "/..")
+from mcmf_ctypes import min_cost_max_flow
+failed = total = 0
+for inp in sorted(glob.glob(sys.argv[1] + "/test_*.in")):
+    data = np.loadtxt(inp, dtype=np.int64, max_rows=1)
+    n, m = int(data[0]), int(data[1])
+    edges = np.loadtxt(inp, dtype=np.int64, skiprows=1, max_rows=m, ndmin=2)
+    s, t = np.loadtxt(inp, dtype=np.int64, skiprows=1 + m)
+    expected = tuple(int(x) for x in open(inp[:-3] + ".py.out").read().split())
+    for algo in sys.argv[2].split():
+        total += 1
+        got = min_cost_max_flow(n, edges[:, 0], edges[:, 1], edges[:, 2], edges[:, 3],
+                                int(s), int(t), algo)
+        if got != expected:
+            failed += 1
+            print(f"[FAIL] {inp} {algo} (binding) -> {got} REF:{expected}")
+
+# error paths: each call must raise exactly the expected exception type
+from mcmf_ctypes import Graph
+def expect_error(name, exc, func):
+    global failed, total
+    total += 1
+    try:
+        func()
+    except exc:
+        return
+    except Exception as e:
+        print(f"[FAIL] {name}: raised {type(e).__name__}: {e}")
+    else:
+        print(f"[FAIL] {name}: no {exc.__name__} raised")
+    failed += 1
+def solve_twice(algo, layout):
+    with Graph(2) as g:
+        g.add_edges([0], [1], [3], [1])
+        g.solve(0, 1, "spfa", layout)
+        g.solve(0, 1, algo, layout)
+def add_one(cap):
+    with Graph(2) as g:
+        g.add_edges([0], [1], cap, [1])
+expect_error("t out of range", ValueError, lambda: min_cost_max_flow(2, [0], [1], [1], [1], 0, 2))
+expect_error("scaling after solve (csr)", RuntimeError, lambda: solve_twice("scaling", "csr"))
+expect_error("scaling after solve (list)", RuntimeError, lambda: solve_twice("scaling", "list"))
+expect_error("cap above int32", OverflowError, lambda: add_one([2**32 + 5]))
+expect_error("int64 array above int32", OverflowError, lambda: add_one(np.array([2**31], dtype=np.int64)))
+expect_error("cost above int64", OverflowError, lambda: min_cost_max_flow(2, [0], [1], [1], [2**70], 0, 1))
+expect_error("float caps", TypeError, lambda: add_one([1.5]))
+
+# mcmf_binary: out-of-range values must raise ValueError instead of wrapping
+import os
+from mcmf_binary import read_binary, read_text, write_binary
+bad_txt = os.path.join(sys.argv[1], "binary_range.txt")
+bad_bin = os.path.join(sys.argv[1], "binary_range.bin")
+def read_bad_text(edge):
+    with open(bad_txt, "w") as fp:
+        fp.write(f"2 1\n{edge}\n0 1\n")
+    return read_text(bad_txt)
+expect_error("text cap above int32", ValueError, lambda: read_bad_text(f"0 1 {2**32 + 5} 1"))
+expect_error("text negative cap", ValueError, lambda: read_bad_text("0 1 -1 1"))
+expect_error("text v out of range", ValueError, lambda: read_bad_text("0 2 5 1"))
+expect_error("binary cap above int32", ValueError,
+             lambda: write_binary(bad_bin, 2, [0], [1], [2**32 + 5], [1], 0, 1))
+expect_error("binary u above int32", ValueError,
+             lambda: write_binary(bad_bin, 2, [2**32], [1], [5], [1], 0, 1))
+expect_error("binary cost above int64", ValueError,
+             lambda: write_binary(bad_bin, 2, [0], [1], [5], [2**70], 0, 1))
+expect_error("binary float caps", ValueError,
+             lambda: write_binary(bad_bin, 2, [0], [1], [1.5], [1], 0, 1))
+total += 1
+write_binary(bad_bin, 2, [0], [1], [2**31 - 1], [-2**63], 0, 1)
+got = [int(x[0]) if hasattr(x, "__len__") else x for x in read_binary(bad_bin)]
+if got != [2, 0, 1, 2**31 - 1, -2**63, 0, 1]:
+    failed += 1
+    print(f"[FAIL] binary round trip at range limits -> {got}")
+print(f"Binding checks: {total - failed} / {total} passed")
+sys.exit(1 if failed else 0)
+PY
+then
+  FAILED=$((FAILED+1))
+fi
+
+echo "Done. Failed checks: $FAILED / $CHECKS"
 if [ $FAILED -gt 0 ]; then
   echo "Failing cases saved in $OUTDIR (files starting with fail_)"
 fi
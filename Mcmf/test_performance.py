@@ -12,6 +12,7 @@ import random
 import os
 import sys
 import csv
+import shutil
 from pathlib import Path
 
 # 配置
@@ -99,17 +100,20 @@ def generate_input_string(n, edges, s, t):
     return "\n".join(lines) + "\n"
 
 
-def run_mcmf(input_str, timeout=10):
+def run_mcmf(input_str, timeout=10, algo="spfa"):
     """
     运行 MCMF 程序并测量时间
     
+    Args:
+        algo: 求解算法，"spfa"、"dijkstra" 或 "scaling"（对应 mcmf 的 -a 参数）
+    
     Returns:
         (flow, cost, elapsed_time) 或 None（如果超时或出错）
     """
     try:
         start_time = time.perf_counter()
         result = subprocess.run(
-            [MCMF_EXECUTABLE],
+            [MCMF_EXECUTABLE, "-a", algo],
             input=input_str,
             capture_output=True,
             text=True,
@@ -215,54 +219,109 @@ def test_edge_scaling():
     return results
 
 
+def run_mcmf_verbose(input_str, timeout=10, algo="spfa"):
+    """
+    以 -v 运行 MCMF 程序，除结果外还解析标准错误中的求解耗时、增广次数与缩放阶段数
+    
+    Returns:
+        (flow, cost, elapsed_time, solve_ms, augments, phases) 或 None（如果超时或出错）
+    """
+    try:
+        start_time = time.perf_counter()
+        result = subprocess.run(
+            [MCMF_EXECUTABLE, "-v", "-a", algo],
+            input=input_str,
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+        elapsed = time.perf_counter() - start_time
+        if result.returncode != 0:
+            print(f"运行错误: {result.stderr}")
+            return None
+        flow, cost = (int(x) for x in result.stdout.split()[:2])
+        # 形如 "read 0.1 ms, solve 1.2 ms, augments 12, phases 0"
+        stats = dict(field.split()[:2] for field in result.stderr.strip().split(", "))
+        return flow, cost, elapsed, float(stats["solve"]), int(stats["augments"]), int(stats["phases"])
+    except subprocess.TimeoutExpired:
+        print(f"超时（> {timeout}s）")
+        return None
+    except Exception as e:
+        print(f"运行异常: {e}")
+        return None
+
+
 def test_capacity_impact():
-    """测试 3: 容量分布对增广轮数的影响"""
+    """测试 3: 容量分布对增广轮数的影响，对比逐条增广（SPFA）与容量缩放（scaling）"""
     print("\n" + "=" * 60)
-    print("测试 3: 容量分布影响分析")
+    print("测试 3: 容量分布影响分析（SPFA vs 容量缩放）")
     print("=" * 60)
     
     results = []
-    n, m = 300, 1500
+    graphs = [("稀疏", 300, 1500), ("稠密", 300, 15000)]
     capacity_configs = [
         ("小容量(1-10)", 1, 10),
         ("中容量(10-100)", 10, 100),
         ("大容量(100-1000)", 100, 1000),
         ("混合容量(1-1000)", 1, 1000),
+        ("超大容量(1-10^6)", 1, 10 ** 6),
     ]
-    
-    print(f"{'配置':>15} {'n':>6} {'m':>6} {'flow':>8} {'cost':>10} {'时间(ms)':>10}")
-    print("-" * 65)
-    
-    for config_name, min_cap, max_cap in capacity_configs:
-        for trial in range(3):
-            random.seed(trial * 3000 + min_cap)
-            n_val, edges_base, s, t = generate_random_graph(n, m, max_cap=max_cap)
-            
-            # 重新设置容量
-            edges = []
-            for u, v, _, cost in edges_base:
-                cap = random.randint(min_cap, max_cap)
-                edges.append((u, v, cap, cost))
+    algos = ["spfa", "scaling"]
+    
+    print("时间取 mcmf -v 输出的求解耗时；增广为增广路条数，阶段为容量缩放的 Δ 阶段数（3 次平均）\n")
+    print(f"{'图':>4} {'配置':>15} {'flow':>10} {'SPFA增广':>9} {'SPFA(ms)':>9} "
+          f"{'缩放阶段':>8} {'缩放增广':>8} {'缩放(ms)':>9} {'加速比':>7}")
+    print("-" * 100)
+    
+    for graph_name, n, m in graphs:
+        for config_name, min_cap, max_cap in capacity_configs:
+            totals = {algo: [0.0, 0, 0] for algo in algos}  # 求解时间、增广次数、阶段数
+            flow = "-"
+            for trial in range(3):
+                random.seed(trial * 3000 + min_cap + m)
+                n_val, edges_base, s, t = generate_random_graph(n, m, max_cap=max_cap)
+                
+                # 重新设置容量
+                edges = []
+                for u, v, _, cost in edges_base:
+                    cap = random.randint(min_cap, max_cap)
+                    edges.append((u, v, cap, cost))
+                
+                input_str = generate_input_string(n_val, edges, s, t)
+                
+                answers = {}
+                for algo in algos:
+                    result = run_mcmf_verbose(input_str, timeout=30, algo=algo)
+                    if not result:
+                        break
+                    flow, cost, elapsed, solve_ms, augments, phases = result
+                    answers[algo] = (flow, cost)
+                    totals[algo][0] += solve_ms
+                    totals[algo][1] += augments
+                    totals[algo][2] += phases
+                    results.append({
+                        'test': 'capacity_impact',
+                        'graph': graph_name,
+                        'config': config_name,
+                        'algo': algo,
+                        'n': n,
+                        'm': m,
+                        'trial': trial + 1,
+                        'flow': flow,
+                        'cost': cost,
+                        'time_ms': elapsed * 1000,
+                        'solve_ms': solve_ms,
+                        'augments': augments,
+                        'phases': phases
+                    })
+                if len(set(answers.values())) != 1 or len(answers) != len(algos):
+                    print(f"{graph_name:>4} {config_name:>15} {'FAILED':>10} {answers}")
             
-            input_str = generate_input_string(n_val, edges, s, t)
-            
-            result = run_mcmf(input_str, timeout=30)
-            if result:
-                flow, cost, elapsed = result
-                elapsed_ms = elapsed * 1000
-                results.append({
-                    'test': 'capacity_impact',
-                    'config': config_name,
-                    'n': n,
-                    'm': m,
-                    'trial': trial + 1,
-                    'flow': flow,
-                    'cost': cost,
-                    'time_ms': elapsed_ms
-                })
-                print(f"{config_name:>15} {n:>6} {m:>6} {flow:>8} {cost:>10} {elapsed_ms:>10.2f}")
-            else:
-                print(f"{config_name:>15} {n:>6} {m:>6} {'FAILED':>8}")
+            spfa_ms, spfa_aug, _ = (x / 3 for x in totals["spfa"])
+            scaling_ms, scaling_aug, scaling_phases = (x / 3 for x in totals["scaling"])
+            print(f"{graph_name:>4} {config_name:>15} {flow:>10} {spfa_aug:>9.0f} {spfa_ms:>9.2f} "
+                  f"{scaling_phases:>8.0f} {scaling_aug:>8.0f} {scaling_ms:>9.2f} "
+                  f"{spfa_ms / scaling_ms:>6.2f}x")
     
     return results
 
@@ -311,6 +370,240 @@ def test_sparse_vs_dense():
     return results
 
 
+def test_algorithm_compare():
+    """测试 5: SPFA vs Dijkstra + 势能（primal-dual）"""
+    print("\n" + "=" * 60)
+    print("测试 5: SPFA vs Dijkstra + 势能")
+    print("=" * 60)
+    
+    results = []
+    test_cases = [
+        ("边数缩放", 500, 1000),
+        ("边数缩放", 500, 5000),
+        ("边数缩放", 500, 10000),
+        ("边数缩放", 500, 15000),
+        ("稠密图", 300, 15000),
+        ("顶点数缩放", 2000, 10000),
+    ]
+    algos = ["spfa", "dijkstra"]
+    
+    print(f"{'场景':>10} {'n':>6} {'m':>6} {'flow':>8} {'SPFA(ms)':>10} {'Dijkstra(ms)':>13} {'加速比':>8}")
+    print("-" * 70)
+    
+    for case_name, n, m in test_cases:
+        totals = {algo: 0.0 for algo in algos}
+        for trial in range(3):
+            n_val, edges, s, t = generate_random_graph(n, m, seed=trial * 5000 + m + n)
+            input_str = generate_input_string(n_val, edges, s, t)
+            
+            answers = {}
+            for algo in algos:
+                result = run_mcmf(input_str, timeout=30, algo=algo)
+                if not result:
+                    break
+                flow, cost, elapsed = result
+                answers[algo] = (flow, cost)
+                totals[algo] += elapsed * 1000
+                results.append({
+                    'test': 'algorithm_compare',
+                    'type': case_name,
+                    'algo': algo,
+                    'n': n,
+                    'm': m,
+                    'trial': trial + 1,
+                    'flow': flow,
+                    'cost': cost,
+                    'time_ms': elapsed * 1000
+                })
+            if len(set(answers.values())) != 1 or len(answers) != len(algos):
+                print(f"{case_name:>10} {n:>6} {m:>6} {'FAILED':>8} {answers}")
+        spfa_ms, dijkstra_ms = totals["spfa"] / 3, totals["dijkstra"] / 3
+        flow = answers.get("spfa", ("-",))[0]
+        print(f"{case_name:>10} {n:>6} {m:>6} {flow:>8} {spfa_ms:>10.2f} {dijkstra_ms:>13.2f} "
+              f"{spfa_ms / dijkstra_ms:>7.2f}x")
+    
+    return results
+
+
+def test_binding_overhead():
+    """测试 6: 每次启动进程 vs 进程内调用共享库（ctypes 绑定）"""
+    import numpy as np
+    from mcmf_ctypes import min_cost_max_flow, load_library
+    
+    print("\n" + "=" * 60)
+    print("测试 6: 子进程 + 文本 I/O vs 共享库（ctypes）")
+    print("=" * 60)
+    
+    load_library()  # 编译与加载不计入计时
+    results = []
+    test_cases = [(20, 60), (50, 250), (200, 1000), (1000, 5000), (2000, 10000)]
+    graphs_per_case = 50
+    
+    print(f"{'n':>6} {'m':>6} {'子进程(ms/图)':>14} {'ctypes(ms/图)':>14} {'加速比':>8}")
+    print("-" * 55)
+    
+    for n, m in test_cases:
+        graphs = [generate_random_graph(n, m, seed=6000 + n + i) for i in range(graphs_per_case)]
+        arrays = [(n_val, np.array(edges, dtype=np.int64).T, s, t) for n_val, edges, s, t in graphs]
+        
+        # 子进程：包含格式化输入文本的时间
+        start = time.perf_counter()
+        expected = []
+        for n_val, edges, s, t in graphs:
+            result = run_mcmf(generate_input_string(n_val, edges, s, t), timeout=30)
+            expected.append(result[:2] if result else None)
+        process_ms = (time.perf_counter() - start) * 1000 / graphs_per_case
+        
+        start = time.perf_counter()
+        got = [min_cost_max_flow(n_val, cols[0], cols[1], cols[2], cols[3], s, t)
+               for n_val, cols, s, t in arrays]
+        binding_ms = (time.perf_counter() - start) * 1000 / graphs_per_case
+        
+        if got != expected:
+            print(f"{n:>6} {m:>6} {'FAILED':>14}")
+            continue
+        for method, elapsed_ms in (("process", process_ms), ("ctypes", binding_ms)):
+            results.append({
+                'test': 'binding_overhead',
+                'type': method,
+                'n': n,
+                'm': m,
+                'trial': graphs_per_case,
+                'time_ms': elapsed_ms
+            })
+        print(f"{n:>6} {m:>6} {process_ms:>14.3f} {binding_ms:>14.3f} {process_ms / binding_ms:>7.1f}x")
+    
+    return results
+
+
+def perf_cache_misses(input_str, args):
+    """用 perf stat 统计一次运行的 cache-misses；没有 perf 或无权限时返回 None"""
+    if shutil.which("perf") is None:
+        return None
+    result = subprocess.run(
+        ["perf", "stat", "-x", ",", "-e", "cache-misses", MCMF_EXECUTABLE] + args,
+        input=input_str,
+        capture_output=True,
+        text=True
+    )
+    for line in result.stderr.splitlines():
+        fields = line.split(",")
+        if len(fields) > 2 and fields[2] == "cache-misses" and fields[0].isdigit():
+            return int(fields[0])
+    return None
+
+
+def test_csr_layout():
+    """测试 7: 链表布局 vs CSR 布局（边数缩放与稠密图）"""
+    import numpy as np
+    from mcmf_ctypes import Graph, load_library
+    
+    print("\n" + "=" * 60)
+    print("测试 7: 链表布局 vs CSR 布局")
+    print("=" * 60)
+    
+    load_library()
+    results = []
+    test_cases = [
+        ("边数缩放", 500, 1000),
+        ("边数缩放", 500, 5000),
+        ("边数缩放", 500, 10000),
+        ("边数缩放", 500, 15000),
+        ("稠密图", 300, 15000),
+        ("大稀疏图", 20000, 100000),
+    ]
+    layouts = ["list", "csr"]
+    
+    for algo in ["spfa", "dijkstra"]:
+        print(f"\n算法: {algo}")
+        print(f"{'场景':>10} {'n':>6} {'m':>7} {'链表(ms)':>10} {'CSR(ms)':>10} {'加速比':>8} {'cache-misses 链表/CSR':>24}")
+        print("-" * 85)
+        for case_name, n, m in test_cases:
+            totals = {layout: 0.0 for layout in layouts}
+            for trial in range(3):
+                n_val, edges, s, t = generate_random_graph(n, m, seed=trial * 7000 + m + n)
+                cols = np.array(edges, dtype=np.int64).T
+                answers = set()
+                for layout in layouts:
+                    start = time.perf_counter()
+                    with Graph(n_val, m) as g:
+                        g.add_edges(cols[0], cols[1], cols[2], cols[3])
+                        answers.add(g.solve(s, t, algo, layout))
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                    totals[layout] += elapsed_ms
+                    results.append({
+                        'test': 'csr_layout',
+                        'type': case_name,
+                        'algo': algo,
+                        'layout': layout,
+                        'n': n,
+                        'm': m,
+                        'trial': trial + 1,
+                        'time_ms': elapsed_ms
+                    })
+                if len(answers) != 1:
+                    print(f"{case_name:>10} {n:>6} {m:>7} {'FAILED':>10} {answers}")
+            
+            # cache-misses 只在装有 perf 时统计（取第一组图）
+            n_val, edges, s, t = generate_random_graph(n, m, seed=m + n)
+            input_str = generate_input_string(n_val, edges, s, t)
+            misses = [perf_cache_misses(input_str, ["-a", algo, "-l", layout]) for layout in layouts]
+            miss_text = "-" if None in misses else f"{misses[0]}/{misses[1]}"
+            
+            list_ms, csr_ms = totals["list"] / 3, totals["csr"] / 3
+            print(f"{case_name:>10} {n:>6} {m:>7} {list_ms:>10.2f} {csr_ms:>10.2f} "
+                  f"{list_ms / csr_ms:>7.2f}x {miss_text:>24}")
+    
+    return results
+
+
+def test_input_formats():
+    """测试 8: 文本输入 vs 二进制图格式的读入耗时"""
+    import tempfile
+    from mcmf_binary import generate_graph, write_binary, write_text
+    
+    print("\n" + "=" * 60)
+    print("测试 8: 文本输入 vs 二进制图格式")
+    print("=" * 60)
+    print("s = t，求解部分只有构建 CSR；读入耗时取 mcmf -v 输出的 read 时间，3 次取最小\n")
+    
+    results = []
+    edge_counts = [100000, 1000000, 5000000]
+    
+    print(f"{'n':>8} {'m':>8} {'文本(MB)':>9} {'二进制(MB)':>11} {'文本读入(ms)':>13} {'二进制读入(ms)':>15} {'加速比':>8}")
+    print("-" * 82)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        for m in edge_counts:
+            n = m // 5
+            graph = generate_graph(n, m, seed=m)[:-2] + (0, 0)
+            paths = {"text": os.path.join(tmp, "graph.txt"), "binary": os.path.join(tmp, "graph.bin")}
+            write_text(paths["text"], *graph)
+            write_binary(paths["binary"], *graph)
+            
+            read_ms = {}
+            for fmt, path in paths.items():
+                best = None
+                for _ in range(3):
+                    result = subprocess.run([MCMF_EXECUTABLE, "-v", path], capture_output=True, text=True)
+                    elapsed = float(result.stderr.split()[1])
+                    best = elapsed if best is None else min(best, elapsed)
+                read_ms[fmt] = best
+                results.append({
+                    'test': 'input_format',
+                    'type': fmt,
+                    'n': n,
+                    'm': m,
+                    'trial': 3,
+                    'time_ms': best
+                })
+            sizes = [os.path.getsize(paths[fmt]) / 2**20 for fmt in ("text", "binary")]
+            print(f"{n:>8} {m:>8} {sizes[0]:>9.1f} {sizes[1]:>11.1f} {read_ms['text']:>13.2f} "
+                  f"{read_ms['binary']:>15.2f} {read_ms['text'] / read_ms['binary']:>7.2f}x")
+    
+    return results
+
+
 def save_results(all_results):
     """保存结果到 CSV 文件"""
     if not all_results:
@@ -387,6 +680,10 @@ def main():
         all_results.extend(test_edge_scaling())
         all_results.extend(test_capacity_impact())
         all_results.extend(test_sparse_vs_dense())
+        all_results.extend(test_algorithm_compare())
+        all_results.extend(test_binding_overhead())
+        all_results.extend(test_csr_layout())
+        all_results.extend(test_input_formats())
     except KeyboardInterrupt:
         print("\n\n测试被用户中断")
     
@@ -108,34 +108,43 @@ def plot_edge_scaling(df):
 
 
 def plot_capacity_impact(df):
-    """绘制容量分布影响"""
+    """绘制容量分布影响：逐条增广（SPFA）与容量缩放的求解时间和增广次数"""
     data = df[df['test'] == 'capacity_impact'].copy()
     if data.empty:
         print("没有容量分布数据")
         return
     
-    grouped = data.groupby('config')['time_ms'].agg(['mean', 'std']).reset_index()
-    
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
-    
-    # 图1: 时间对比
-    x_pos = np.arange(len(grouped))
-    ax1.bar(x_pos, grouped['mean'], yerr=grouped['std'], 
-            capsize=5, alpha=0.7, color=['blue', 'green', 'orange', 'red'])
+    # 横轴为 图类型 + 容量配置（保持测试中的顺序），每组内按算法并列
+    data['label'] = data['graph'] + '\n' + data['config']
+    labels = list(dict.fromkeys(data['label']))
+    algos = list(dict.fromkeys(data['algo']))
+    names = {'spfa': 'SPFA 逐条增广', 'scaling': '容量缩放'}
+    
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 5))
+    x_pos = np.arange(len(labels))
+    width = 0.8 / len(algos)
+    for i, algo in enumerate(algos):
+        grouped = data[data['algo'] == algo].groupby('label')[['solve_ms', 'augments']].mean()
+        grouped = grouped.reindex(labels)
+        offset = (i - (len(algos) - 1) / 2) * width
+        ax1.bar(x_pos + offset, grouped['solve_ms'], width, alpha=0.7, label=names.get(algo, algo))
+        ax2.bar(x_pos + offset, grouped['augments'], width, alpha=0.7, label=names.get(algo, algo))
+    
+    # 图1: 求解时间对比
     ax1.set_xticks(x_pos)
-    ax1.set_xticklabels(grouped['config'], rotation=15, ha='right')
-    ax1.set_ylabel('运行时间 (ms)')
-    ax1.set_title('不同容量分布的运行时间')
+    ax1.set_xticklabels(labels, rotation=30, ha='right', fontsize=8)
+    ax1.set_ylabel('求解时间 (ms)')
+    ax1.set_yscale('log')
+    ax1.set_title('不同容量分布的求解时间')
+    ax1.legend()
     ax1.grid(True, alpha=0.3, axis='y')
     
-    # 图2: 流量对比
-    flow_grouped = data.groupby('config')['flow'].agg(['mean', 'std']).reset_index()
-    ax2.bar(x_pos, flow_grouped['mean'], yerr=flow_grouped['std'], 
-            capsize=5, alpha=0.7, color=['blue', 'green', 'orange', 'red'])
+    # 图2: 增广次数对比
     ax2.set_xticks(x_pos)
-    ax2.set_xticklabels(flow_grouped['config'], rotation=15, ha='right')
-    ax2.set_ylabel('最大流量')
-    ax2.set_title('不同容量分布的流量大小')
+    ax2.set_xticklabels(labels, rotation=30, ha='right', fontsize=8)
+    ax2.set_ylabel('增广路条数')
+    ax2.set_title('不同容量分布的增广次数')
+    ax2.legend()
     ax2.grid(True, alpha=0.3, axis='y')
     
     plt.tight_layout()
@@ -0,0 +1,160 @@
+"""
+自适应搜索引擎选择
+根据模式长度、字母表大小和实际观察到的匹配密度，在内置 find、Horspool 与 KMP 之间选择；
+跳跃类引擎一旦退化，就从当前位置起改用保证线性的 KMP 完成剩余扫描
+"""
+
+import sys
+
+from kmp import KMPMatcher, kmp_search_all
+
+# 代价模型（单位：纳秒，CPython 3.11 上实测的量级，只用于比较相对大小）
+KMP_COST_PER_CHAR = 400         # KMP 回退循环处理一个文本字符
+FIND_COST_PER_CALL = 300        # 一次 find 调用的解释器开销
+FIND_COST_PER_CHAR = 6          # C 层比较一个字符
+HORSPOOL_COST_PER_WINDOW = 300  # Horspool 处理一个窗口的解释器开销
+WARMUP = 64                     # 至少观察这么多次调用/窗口后才判断是否退化
+
+HORSPOOL_MIN_LENGTH = 4    # 模式太短时跳跃距离有限，不如 KMP
+HORSPOOL_MIN_ALPHABET = 4  # 字母表太小时坏字符跳跃距离很短
+ALPHABET_SAMPLE = 1024     # 估计文本字母表大小时采样的字符数
+
+# CPython 3.10 起 str / bytes / mmap 的 find 对长模式改用 Crochemore–Perrin 双向算法，最坏也是线性的；
+# 之前的版本对长且低熵的模式（如 'A' * 50 + 'B' + 'A' * 50）最坏 O(nm)，而且这时没有匹配，
+# _find_scan 的匹配密度检测看不到退化
+FIND_IS_LINEAR = sys.version_info >= (3, 10)
+FIND_QUADRATIC_MIN_LENGTH = 100  # 旧版 find 在这个长度以上的低熵模式上改用 KMP
+
+
+def _degraded(skip_cost, covered):
+    """跳跃引擎的累计代价是否已超过 KMP 扫描同样长度文本的代价"""
+    return skip_cost > KMP_COST_PER_CHAR * (covered + WARMUP)
+
+
+def _find_scan(text, pattern, guard):
+    """
+    反复调用 text.find 查找所有（允许重叠的）匹配
+    返回 (positions, resume)：resume 为退化时 KMP 需要接手的位置，扫描完成时为 None
+    匹配密集且模式较长时，每次 find 都要重新比较 m 个字符，总代价可达 O(nm)
+    """
+    m = len(pattern)
+    positions = []
+    calls = 1
+    i = text.find(pattern)
+    while i != -1:
+        positions.append(i)
+        if guard and calls >= WARMUP:
+            cost = FIND_COST_PER_CALL * calls + FIND_COST_PER_CHAR * (i + calls * m)
+            if _degraded(cost, i):
+                return positions, i + 1
+        i = text.find(pattern, i + 1)
+        calls += 1
+    return positions, None
+
+
+def _horspool_scan(text, pattern, guard):
+    """
+    Horspool 算法：比较窗口末字符，失配时按坏字符表跳跃
+    返回值含义同 _find_scan；末字符相同时整窗比较在 C 层完成
+    """
+    n, m = len(text), len(pattern)
+    last = pattern[m - 1]
+    shift = {}
+    for k in range(m - 1):
+        shift[pattern[k]] = m - 1 - k
+
+    positions = []
+    windows = 0
+    compared = 0
+    i = 0
+    while i <= n - m:
+        c = text[i + m - 1]
+        if c == last:
+            compared += m
+            if text[i:i + m] == pattern:
+                positions.append(i)
+        i += shift.get(c, m)
+
+        windows += 1
+        if guard and windows % WARMUP == 0:
+            cost = HORSPOOL_COST_PER_WINDOW * windows + FIND_COST_PER_CHAR * compared
+            if _degraded(cost, i):
+                return positions, i
+    return positions, None
+
+
+def find_search_all(text, pattern):
+    """用内置 find 查找所有匹配（text 需要有 find 方法，如 str、bytes、mmap）"""
+    if not pattern:
+        return [0]
+    return _find_scan(text, pattern, guard=False)[0]
+
+
+def horspool_search_all(text, pattern):
+    """用 Horspool 算法查找所有匹配，适用于任意支持下标与切片的序列"""
+    if not pattern:
+        return [0]
+    return _horspool_scan(text, pattern, guard=False)[0]
+
+
+def _kmp_from(text, pattern, start):
+    """从 start 起用 KMP 扫描剩余文本；缓冲区类数据通过 memoryview 切片，不拷贝"""
+    matcher = KMPMatcher(pattern)
+    matcher.offset = start  # 匹配位置直接按全局偏移报告
+    if isinstance(pattern, (bytes, bytearray)):
+        with memoryview(text) as view:
+            return matcher.feed(view.cast("B")[start:])
+    return matcher.feed(text[start:])
+
+
+def choose_engine(text, pattern):
+    """
+    根据输入特征选择初始引擎，返回 (引擎名, 原因)
+    引擎名为 'find'、'horspool' 或 'kmp'
+    """
+    m = len(pattern)
+    if m == 0:
+        return "kmp", "空模式串"
+    if isinstance(text, str) != isinstance(pattern, str):
+        return "kmp", "text 与 pattern 类型不同"
+    if hasattr(text, "find"):
+        # 对支持 find 的类型，模式长度与字母表大小都不会让 Python 层的 KMP 或 Horspool 胜出：
+        # 10^6 字符的文本上即使是长的低熵模式，find 也只需 1–5 ms，KMP 与 Horspool 要 50–400 ms。
+        # 唯一的退化是匹配密集时每次 find 重新比较 m 个字符，由 _find_scan 的退化检测处理。
+        # 只有旧版 find 不是线性时，才按模式长度与字母表大小改用 KMP
+        if not FIND_IS_LINEAR and m >= FIND_QUADRATIC_MIN_LENGTH:
+            sigma = len(set(pattern))
+            if sigma < HORSPOOL_MIN_ALPHABET:
+                return "kmp", (f"Python < 3.10 的 find 最坏 O(nm)，模式长度 {m}、"
+                               f"字母表大小 {sigma}")
+        return "find", "text 支持内置 find（C 实现，最坏线性）"
+    if m < HORSPOOL_MIN_LENGTH:
+        return "kmp", f"模式长度 {m} < {HORSPOOL_MIN_LENGTH}，跳跃收益有限"
+    sigma = len(set(text[:ALPHABET_SAMPLE]))
+    if sigma < HORSPOOL_MIN_ALPHABET:
+        return "kmp", f"采样字母表大小 {sigma} < {HORSPOOL_MIN_ALPHABET}，坏字符跳跃很短"
+    return "horspool", f"模式长度 {m}，采样字母表大小 {sigma}"
+
+
+def adaptive_search_all(text, pattern, report=None):
+    """
+    自动选择引擎查找所有匹配，结果与 kmp_search_all 完全一致
+    report 若传入字典，会写入 engine（初始引擎）、reason（选择原因）、
+    fallback_at（退化后改用 KMP 的位置，未退化为 None）
+    """
+    engine, reason = choose_engine(text, pattern)
+    resume = None
+
+    if engine == "find":
+        positions, resume = _find_scan(text, pattern, guard=True)
+    elif engine == "horspool":
+        positions, resume = _horspool_scan(text, pattern, guard=True)
+    else:
+        positions = kmp_search_all(text, pattern)
+
+    if resume is not None:
+        positions.extend(_kmp_from(text, pattern, resume))
+
+    if report is not None:
+        report.update(engine=engine, reason=reason, fallback_at=resume)
+    return positions
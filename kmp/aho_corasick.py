@@ -0,0 +1,93 @@
+from collections import deque
+
+
+class AhoCorasick:
+    """
+    Aho–Corasick 多模式自动机
+    把 build_next 的失配链推广到字典树上：fail[v] 指向结点 v 所代表字符串的
+    最长真后缀对应的结点，相当于多个模式共享的 next 数组
+    一次扫描文本即可找到所有模式的所有出现位置
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self.lengths = [len(p) for p in self.patterns]
+
+        goto = [{}]  # goto[v][c]：字典树子结点
+        out = [[]]   # out[v]：恰好在结点 v 结束的模式编号
+        for pid, pattern in enumerate(self.patterns):
+            v = 0
+            for c in pattern:
+                u = goto[v].get(c)
+                if u is None:
+                    u = len(goto)
+                    goto[v][c] = u
+                    goto.append({})
+                    out.append([])
+                v = u
+            out[v].append(pid)
+
+        # 按 BFS 顺序计算失配指针，与 build_next 的回退过程一致：
+        # 沿父结点的失配链回退，直到某个结点有字符 c 的转移
+        fail = [0] * len(goto)
+        link = [0] * len(goto)  # 输出链：失配链上最近的有输出的结点
+        queue = deque(goto[0].values())
+        while queue:
+            v = queue.popleft()
+            for c, u in goto[v].items():
+                f = fail[v]
+                while f and c not in goto[f]:
+                    f = fail[f]
+                fail[u] = goto[f].get(c, 0)
+                link[u] = fail[u] if out[fail[u]] else link[fail[u]]
+                queue.append(u)
+
+        self.goto, self.out, self.fail, self.link = goto, out, fail, link
+        self.empty = out[0]  # 空模式串，与 kmp_search_all 一致只在位置 0 报告
+        self.reset()
+
+    def reset(self):
+        """重置匹配状态，以便扫描新的流"""
+        self.state = 0
+        self.offset = 0
+        self.fed = False
+
+    def feed(self, chunk):
+        """
+        喂入一块文本，返回本块内结束的所有匹配 (pattern_id, 全局起始位置)
+        结果按匹配结束位置排序；同一结束位置上较长的模式在前
+        """
+        goto, out, fail, link, lengths = self.goto, self.out, self.fail, self.link, self.lengths
+        base = self.offset
+        self.offset += len(chunk)
+        first, self.fed = not self.fed, True
+        matches = [(pid, 0) for pid in self.empty] if first else []
+
+        v = self.state
+        for i, c in enumerate(chunk):
+            while v and c not in goto[v]:
+                v = fail[v]
+            v = goto[v].get(c, 0)
+
+            u = v if out[v] else link[v]
+            while u:
+                end = base + i + 1
+                for pid in out[u]:
+                    matches.append((pid, end - lengths[pid]))
+                u = link[u]
+
+        self.state = v
+        return matches
+
+    def search(self, text):
+        """在完整文本中查找所有模式，返回 [(pattern_id, 起始位置), ...]"""
+        self.reset()
+        return self.feed(text)
+
+
+def aho_corasick_search(text, patterns):
+    """
+    一次扫描查找 text 中所有 patterns 的出现位置
+    返回 [(pattern_id, 起始位置), ...]，pattern_id 为模式在 patterns 中的下标
+    """
+    return AhoCorasick(patterns).search(text)
@@ -0,0 +1,672 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+KMP 各搜索引擎性能对比脚本
+在与 test_complexity.py 相同的数据规模上，对比不同实现的运行时间，并校验结果一致
+"""
+
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+import matplotlib.pyplot as plt
+from test_complexity import measure_time, generate_text
+from kmp import kmp_search_all, kmp_search_dfa, kmp_replace_file
+from aho_corasick import aho_corasick_search
+from adaptive import adaptive_search_all, find_search_all, horspool_search_all
+from boyer_moore import boyer_moore_search_all
+from shift_or import shift_or_search_all
+from suffix_array import SuffixIndex
+from vectorized import vectorized_search_all
+from parallel import kmp_search_batch
+from periodic import kmp_search_runs, expand_runs
+from rabin_karp import rabin_karp_search
+
+
+def run_comparison(cases, engines, repeat=3):
+    """
+    在每组输入上运行所有引擎，打印对比表格
+
+    Args:
+        cases: [(x, text, pattern), ...]，x 为横坐标取值（如文本长度）
+        engines: [(名称, 函数), ...]，函数签名与 kmp_search_all 相同
+        repeat: 每个数据点的重复次数
+
+    Returns:
+        {名称: [时间, ...]}
+    """
+    names = [name for name, _ in engines]
+    results = {name: [] for name in names}
+
+    print(f"{'x':>10} " + " ".join(f"{name:>14}" for name in names))
+    print("-" * (11 + 15 * len(names)))
+
+    for x, text, pattern in cases:
+        expected = kmp_search_all(text, pattern)
+        row = []
+        for name, func in engines:
+            # 先校验结果，再计时
+            if func(text, pattern) != expected:
+                raise AssertionError(f"{name} 结果与 kmp_search_all 不一致 (x={x})")
+            elapsed = measure_time(func, text, pattern, repeat=repeat)
+            results[name].append(elapsed)
+            row.append(elapsed)
+        print(f"{x:>10} " + " ".join(f"{t:>14.6f}" for t in row))
+
+    base = results[names[0]]
+    for name in names[1:]:
+        speedup = [b / t for b, t in zip(base, results[name])]
+        print(f"{name} 相对 {names[0]} 的加速比: "
+              f"{min(speedup):.2f}x ~ {max(speedup):.2f}x")
+    print()
+    return results
+
+
+def plot_comparison(xs, panels, xlabel, filename):
+    """
+    绘制各引擎的 时间-规模 曲线
+
+    Args:
+        xs: 横坐标取值
+        panels: [(子图标题, run_comparison 的结果), ...]，每项一个子图
+        xlabel: 横坐标名称
+        filename: 图片文件名
+    """
+    plt.figure(figsize=(6 * len(panels), 5))
+    for k, (title, results) in enumerate(panels):
+        plt.subplot(1, len(panels), k + 1)
+        for name, times in results.items():
+            plt.plot(xs, times, 'o-', label=name)
+        plt.xlabel(xlabel)
+        plt.ylabel('运行时间 (秒)')
+        plt.title(title)
+        plt.legend()
+        plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(filename, dpi=300, bbox_inches='tight')
+    plt.close()
+    print(f"图表已保存: {filename}\n")
+
+
+def test_dfa_vs_loop():
+    """
+    对比 KMP 自动机（一次查表）与原始回退循环
+    使用 test_worst_case 的全 'A' 文本和 test_text_length_scaling 的随机文本
+    """
+    print("=" * 60)
+    print("对比 1: KMP 自动机 vs 回退循环")
+    print("=" * 60)
+
+    engines = [("kmp_search_all", kmp_search_all), ("kmp_search_dfa", kmp_search_dfa)]
+
+    print("最坏情况: 文本全为 'A'，模式为 999 个 'A' + 'B'\n")
+    pattern = 'A' * 999 + 'B'
+    text_lengths = [10000, 20000, 50000, 100000, 200000, 500000]
+    cases = [(n, 'A' * n, pattern) for n in text_lengths]
+    worst = run_comparison(cases, engines)
+
+    print("随机文本: 字母表大小 4，模式长度 100\n")
+    pattern = generate_text(100, alphabet_size=4)
+    cases = [(n, generate_text(n, alphabet_size=4), pattern) for n in text_lengths]
+    rand = run_comparison(cases, engines)
+
+    plot_comparison(text_lengths,
+                    [('自动机 vs 回退循环: 最坏情况（全 A）', worst),
+                     ('自动机 vs 回退循环: 随机文本', rand)],
+                    '文本长度 n', 'kmp_dfa_vs_loop.png')
+
+
+def test_multi_pattern():
+    """
+    对比 Aho–Corasick 单次扫描与"逐个模式调用 kmp_search_all"
+    模式数为 10、1K、100K；模式为长度 8-16 的签名，一半取自文本（保证有命中）
+    """
+    print("=" * 60)
+    print("对比 2: Aho–Corasick vs 逐模式 KMP")
+    print("=" * 60)
+
+    text_length = 20000
+    text = generate_text(text_length, alphabet_size=26)
+    pattern_counts = [10, 1000, 100000]
+    sample = 1000  # 模式过多时 KMP 基线只测前 sample 个，再按比例外推
+
+    print(f"文本长度: {text_length}，字母表大小: 26\n")
+    print(f"{'模式数':>8} {'逐模式KMP(秒)':>16} {'Aho-Corasick(秒)':>18} {'加速比':>8}")
+    print("-" * 54)
+
+    kmp_times, ac_times = [], []
+    for k in pattern_counts:
+        patterns = []
+        for i in range(k):
+            length = random.randint(8, 16)
+            if i % 2 == 0:
+                start = random.randrange(text_length - length)
+                patterns.append(text[start:start + length])
+            else:
+                patterns.append(generate_text(length, alphabet_size=26))
+
+        start = time.perf_counter()
+        expected = [(pid, pos) for pid, p in enumerate(patterns[:sample])
+                    for pos in kmp_search_all(text, p)]
+        kmp_time = (time.perf_counter() - start) * k / min(k, sample)
+
+        ac_time = measure_time(aho_corasick_search, text, patterns, repeat=3)
+        got = [(pid, pos) for pid, pos in aho_corasick_search(text, patterns) if pid < sample]
+        if sorted(got) != sorted(expected):
+            raise AssertionError(f"Aho–Corasick 结果与 kmp_search_all 不一致 (k={k})")
+
+        kmp_times.append(kmp_time)
+        ac_times.append(ac_time)
+        note = " (外推)" if k > sample else ""
+        print(f"{k:>8} {kmp_time:>16.4f} {ac_time:>18.4f} {kmp_time / ac_time:>7.1f}x{note}")
+    print("\n注: Aho–Corasick 时间包含构建自动机的时间\n")
+
+    plt.figure(figsize=(7, 5))
+    plt.loglog(pattern_counts, kmp_times, 'o-', label='逐模式 kmp_search_all')
+    plt.loglog(pattern_counts, ac_times, 's-', label='Aho–Corasick')
+    plt.xlabel('模式数')
+    plt.ylabel('运行时间 (秒)')
+    plt.title('多模式匹配: Aho–Corasick vs 逐模式 KMP')
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    plt.savefig('kmp_multi_pattern.png', dpi=300, bbox_inches='tight')
+    plt.close()
+    print("图表已保存: kmp_multi_pattern.png\n")
+
+
+def test_adaptive_selection():
+    """
+    在 test_complexity.py 的各个场景上对比 KMP、find、Horspool 与自适应前端
+    并打印自适应前端在每个场景下的选择
+    """
+    print("=" * 60)
+    print("对比 3: 自适应引擎选择")
+    print("=" * 60)
+
+    engines = [
+        ("kmp_search_all", kmp_search_all),
+        ("find", find_search_all),
+        ("horspool", horspool_search_all),
+        ("adaptive", adaptive_search_all),
+    ]
+
+    def show_choice(text, pattern):
+        report = {}
+        adaptive_search_all(text, pattern, report)
+        print(f"自适应选择: {report['engine']}（{report['reason']}），"
+              f"退化切换位置: {report['fallback_at']}\n")
+
+    text_lengths = [10000, 50000, 100000, 200000, 500000]
+
+    print("场景 1: 文本长度缩放（随机文本，字母表 4，模式长度 100）\n")
+    pattern = generate_text(100, alphabet_size=4)
+    cases = [(n, generate_text(n, alphabet_size=4), pattern) for n in text_lengths]
+    scaling = run_comparison(cases, engines)
+    show_choice(cases[-1][1], pattern)
+
+    print("场景 2: 模式长度缩放（随机文本 n=100000，字母表 4）\n")
+    text = generate_text(100000, alphabet_size=4)
+    pattern_lengths = [10, 100, 1000, 10000]
+    cases = [(m, text, generate_text(m, alphabet_size=4)) for m in pattern_lengths]
+    run_comparison(cases, engines)
+    show_choice(text, cases[-1][2])
+
+    print("场景 3: 最坏情况（全 'A' 文本，模式 999 个 'A' + 'B'）\n")
+    pattern = 'A' * 999 + 'B'
+    cases = [(n, 'A' * n, pattern) for n in text_lengths]
+    worst = run_comparison(cases, engines)
+    show_choice(cases[-1][1], pattern)
+
+    print("场景 4: 匹配密集（全 'A' 文本，模式 100 个 'A'）\n")
+    pattern = 'A' * 100
+    cases = [(n, 'A' * n, pattern) for n in text_lengths]
+    dense = run_comparison(cases, engines)
+    show_choice(cases[-1][1], pattern)
+
+    print("场景 5: 非字符串序列（token 列表，字母表 26，模式长度 20）\n")
+    pattern = list(generate_text(20, alphabet_size=26))
+    cases = [(n, list(generate_text(n, alphabet_size=26)), pattern) for n in text_lengths]
+    tokens = run_comparison(cases, [e for e in engines if e[0] != "find"])
+    show_choice(cases[-1][1], pattern)
+
+    plot_comparison(text_lengths,
+                    [('随机文本', scaling), ('最坏情况（全 A）', worst),
+                     ('匹配密集', dense), ('token 列表', tokens)],
+                    '文本长度 n', 'kmp_adaptive_selection.png')
+
+
+def test_boyer_moore():
+    """
+    Boyer–Moore 与 KMP 并排对比：test_pattern_length_scaling 的语料（字母表 4），
+    同样规模的大字母表语料（字母表 26），以及 test_worst_case 的全 'A' 语料
+    """
+    print("=" * 60)
+    print("对比 4: Boyer–Moore vs KMP")
+    print("=" * 60)
+
+    engines = [("kmp_search_all", kmp_search_all), ("boyer_moore", boyer_moore_search_all)]
+    pattern_lengths = [10, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+    panels = []
+
+    for alphabet_size in (4, 26):
+        print(f"模式长度缩放: 文本长度 100000，字母表大小 {alphabet_size}\n")
+        text = generate_text(100000, alphabet_size=alphabet_size)
+        cases = [(m, text, generate_text(m, alphabet_size=alphabet_size))
+                 for m in pattern_lengths]
+        panels.append((f'模式长度缩放（字母表 {alphabet_size}）', run_comparison(cases, engines)))
+
+    print("最坏情况: 全 'A' 文本 n=100000，模式为 (m-1) 个 'A' + 'B'\n")
+    cases = [(m, 'A' * 100000, 'A' * (m - 1) + 'B') for m in pattern_lengths]
+    panels.append(('最坏情况（全 A）', run_comparison(cases, engines)))
+
+    plot_comparison(pattern_lengths, panels, '模式长度 m', 'kmp_boyer_moore.png')
+
+
+def test_shift_or():
+    """
+    Shift-Or 与 KMP 对比：test_text_length_scaling（模式长度 64 以内）
+    与 test_pattern_length_scaling（跨过单字 64 位后进入多字）
+    """
+    print("=" * 60)
+    print("对比 5: Shift-Or vs KMP")
+    print("=" * 60)
+
+    engines = [("kmp_search_all", kmp_search_all), ("shift_or", shift_or_search_all)]
+
+    print("文本长度缩放: 模式长度 32，字母表大小 4\n")
+    pattern = generate_text(32, alphabet_size=4)
+    text_lengths = [1000, 2000, 5000, 10000, 20000, 50000, 100000, 200000, 500000]
+    cases = [(n, generate_text(n, alphabet_size=4), pattern) for n in text_lengths]
+    by_text = run_comparison(cases, engines)
+
+    print("模式长度缩放: 文本长度 100000，字母表大小 4\n")
+    text = generate_text(100000, alphabet_size=4)
+    pattern_lengths = [10, 32, 64, 100, 200, 500, 1000, 2000, 5000, 10000]
+    cases = [(m, text, generate_text(m, alphabet_size=4)) for m in pattern_lengths]
+    by_pattern = run_comparison(cases, engines)
+
+    print("匹配密集: 全 'A' 文本，模式长度 32\n")
+    cases = [(n, 'A' * n, 'A' * 32) for n in text_lengths]
+    dense = run_comparison(cases, engines)
+
+    plot_comparison(text_lengths, [('文本长度缩放（m=32）', by_text), ('匹配密集', dense)],
+                    '文本长度 n', 'kmp_shift_or_text.png')
+    plot_comparison(pattern_lengths, [('模式长度缩放（n=100000）', by_pattern)],
+                    '模式长度 m', 'kmp_shift_or_pattern.png')
+
+
+def test_suffix_index():
+    """
+    对比后缀数组索引与"每次查询都调用 kmp_search_all"
+    同一文本上查询 10、100、1K、10K 个长度 8-16 的模式；索引只构建一次，
+    另外测量保存到磁盘后通过 mmap 加载的索引上的查询时间
+    """
+    print("=" * 60)
+    print("对比 6: 后缀数组索引 vs 逐次 KMP")
+    print("=" * 60)
+
+    text_length = 100000
+    text = generate_text(text_length, alphabet_size=4)
+    query_counts = [10, 100, 1000, 10000]
+    sample = 100  # 查询过多时 KMP 基线只测前 sample 个，再按比例外推
+
+    start = time.perf_counter()
+    index = SuffixIndex(text)
+    build_time = time.perf_counter() - start
+    print(f"文本长度: {text_length}，字母表大小: 4，构建索引: {build_time:.4f} 秒\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.sa')
+        index.save(path)
+        start = time.perf_counter()
+        mapped = SuffixIndex.load(path)
+        print(f"索引文件: {os.path.getsize(path)} 字节，mmap 加载: "
+              f"{time.perf_counter() - start:.6f} 秒\n")
+
+        print(f"{'查询数':>8} {'逐次KMP(秒)':>14} {'索引查询(秒)':>14} "
+              f"{'mmap查询(秒)':>14} {'加速比':>8}")
+        print("-" * 64)
+
+        kmp_times, index_times, mapped_times = [], [], []
+        for k in query_counts:
+            patterns = []
+            for i in range(k):
+                length = random.randint(8, 16)
+                if i % 2 == 0:
+                    pos = random.randrange(text_length - length)
+                    patterns.append(text[pos:pos + length])
+                else:
+                    patterns.append(generate_text(length, alphabet_size=4))
+
+            start = time.perf_counter()
+            expected = [kmp_search_all(text, p) for p in patterns[:sample]]
+            kmp_time = (time.perf_counter() - start) * k / min(k, sample)
+
+            timings = []
+            for idx in (index, mapped):
+                start = time.perf_counter()
+                got = [idx.search_all(p) for p in patterns]
+                timings.append(time.perf_counter() - start)
+                if got[:sample] != expected:
+                    raise AssertionError(f"后缀数组索引结果与 kmp_search_all 不一致 (k={k})")
+
+            kmp_times.append(kmp_time)
+            index_times.append(timings[0])
+            mapped_times.append(timings[1])
+            note = " (外推)" if k > sample else ""
+            print(f"{k:>8} {kmp_time:>14.4f} {timings[0]:>14.4f} {timings[1]:>14.4f} "
+                  f"{kmp_time / timings[0]:>7.0f}x{note}")
+        mapped.close()
+
+    print(f"\n注: 加速比不含构建时间；查询数超过 {build_time / (kmp_times[0] / query_counts[0]):.0f} "
+          f"时，构建加查询的总时间即少于逐次 KMP\n")
+
+    plt.figure(figsize=(7, 5))
+    plt.loglog(query_counts, kmp_times, 'o-', label='逐次 kmp_search_all')
+    plt.loglog(query_counts, [build_time + t for t in index_times], 's-', label='构建索引 + 查询')
+    plt.loglog(query_counts, index_times, '^-', label='索引查询')
+    plt.loglog(query_counts, mapped_times, 'v--', label='mmap 加载后查询')
+    plt.xlabel('查询数')
+    plt.ylabel('运行时间 (秒)')
+    plt.title(f'静态文本多次查询（n={text_length}）')
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    plt.savefig('kmp_suffix_index.png', dpi=300, bbox_inches='tight')
+    plt.close()
+    print("图表已保存: kmp_suffix_index.png\n")
+
+
+def test_vectorized():
+    """
+    NumPy 向量化候选过滤与 KMP 对比：字母表 4 与 26 的文本长度缩放、模式长度缩放，
+    以及候选最密集的全 'A' 文本
+    """
+    print("=" * 60)
+    print("对比 7: NumPy 向量化过滤 vs KMP")
+    print("=" * 60)
+
+    engines = [("kmp_search_all", kmp_search_all), ("vectorized", vectorized_search_all)]
+    text_lengths = [1000, 2000, 5000, 10000, 20000, 50000, 100000, 200000, 500000]
+
+    by_text = []
+    for sigma in (4, 26):
+        print(f"文本长度缩放: 模式长度 10，字母表大小 {sigma}\n")
+        pattern = generate_text(10, alphabet_size=sigma)
+        cases = [(n, generate_text(n, alphabet_size=sigma), pattern) for n in text_lengths]
+        by_text.append((f'文本长度缩放（σ={sigma}）', run_comparison(cases, engines)))
+
+    print("匹配密集: 全 'A' 文本，模式长度 32\n")
+    cases = [(n, 'A' * n, 'A' * 32) for n in text_lengths]
+    by_text.append(('匹配密集', run_comparison(cases, engines)))
+
+    print("模式长度缩放: 文本长度 100000，字母表大小 4\n")
+    text = generate_text(100000, alphabet_size=4)
+    pattern_lengths = [10, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+    cases = [(m, text, generate_text(m, alphabet_size=4)) for m in pattern_lengths]
+    by_pattern = run_comparison(cases, engines)
+
+    plot_comparison(text_lengths, by_text, '文本长度 n', 'kmp_vectorized_text.png')
+    plot_comparison(pattern_lengths, [('模式长度缩放（n=100000）', by_pattern)],
+                    '模式长度 m', 'kmp_vectorized_pattern.png')
+
+
+def test_batch():
+    """
+    一个模式匹配大量短文本：模拟日志行（长度 80，约 1% 含模式），
+    对比逐行调用 kmp_search_all 与批量接口（单进程、线程池、进程池）
+    """
+    print("=" * 60)
+    print("对比 8: 批量接口 vs 逐行 KMP")
+    print("=" * 60)
+
+    pattern = 'ERROR'
+    line_counts = [1000, 10000, 100000, 200000]
+    variants = [
+        ("逐行 kmp_search_all", lambda lines: [kmp_search_all(line, pattern) for line in lines]),
+        ("批量（单进程）", lambda lines: kmp_search_batch(lines, pattern, batch_size=len(lines) + 1)),
+        ("批量（线程池）", lambda lines: kmp_search_batch(lines, pattern, threads=True)),
+        ("批量（进程池）", lambda lines: kmp_search_batch(lines, pattern)),
+    ]
+    results = {name: [] for name, _ in variants}
+
+    print(f"模式: {pattern!r}，行长 80，字母表大小 26\n")
+    print(f"{'行数':>8} " + " ".join(f"{name:>18}" for name, _ in variants))
+    print("-" * (9 + 19 * len(variants)))
+    for count in line_counts:
+        lines = [generate_text(80, alphabet_size=26) + (f" {pattern} " if random.random() < 0.01 else "")
+                 for _ in range(count)]
+        expected = [(k, pos) for k, line in enumerate(lines) for pos in kmp_search_all(line, pattern)]
+        for name, func in variants[1:]:
+            if list(zip(*func(lines))) != expected:
+                raise AssertionError(f"{name} 结果与 kmp_search_all 不一致 (行数={count})")
+        for name, func in variants:
+            results[name].append(measure_time(func, lines, repeat=3))
+        print(f"{count:>8} " + " ".join(f"{results[name][-1]:>18.4f}" for name, _ in variants))
+
+    base = results[variants[0][0]]
+    for name, _ in variants[1:]:
+        speedup = [b / t for b, t in zip(base, results[name])]
+        print(f"{name} 相对逐行 KMP 的加速比: {min(speedup):.2f}x ~ {max(speedup):.2f}x")
+    print()
+
+    plot_comparison(line_counts, [('一个模式 × 大量日志行', results)], '行数', 'kmp_batch.png')
+
+
+def replace_in_memory(src, dst, pattern, replacement):
+    """原有做法：整个文件读入内存，收集 kmp_search_all 的位置后切片重建，再整体写出"""
+    with open(src, encoding="utf-8", newline="") as fp:
+        text = fp.read()
+    pieces, done = [], 0
+    for pos in kmp_search_all(text, pattern):
+        if pos >= done:  # 跳过与上一次替换重叠的匹配
+            pieces.append(text[done:pos])
+            pieces.append(replacement)
+            done = pos + len(pattern)
+    pieces.append(text[done:])
+    with open(dst, "w", encoding="utf-8", newline="") as fp:
+        fp.write("".join(pieces))
+
+
+def test_replace():
+    """
+    流式替换与"整体读入 + kmp_search_all + 切片重建"对比运行时间和峰值内存（tracemalloc）
+    文件为 1–16 MB 的随机文本（字母表 4），模式长度 3，约每 64 个字符替换一次
+    """
+    print("=" * 60)
+    print("对比 9: 流式替换 vs 内存中重建")
+    print("=" * 60)
+
+    sizes = [1 << 20, 2 << 20, 4 << 20, 8 << 20, 16 << 20]
+    pattern, replacement = 'ACG', '<acg>'
+    variants = [
+        ("内存中重建", replace_in_memory),
+        ("kmp_replace_file", lambda src, dst, p, r: kmp_replace_file(src, dst, p, r)),
+    ]
+    times = {name: [] for name, _ in variants}
+    peaks = {name: [] for name, _ in variants}
+
+    print(f"{'文件大小':>10} " + " ".join(f"{name + ' 时间':>22} {'峰值内存(MB)':>14}"
+                                       for name, _ in variants))
+    print("-" * (11 + 38 * len(variants)))
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, 'src.txt')
+        for size in sizes:
+            with open(src, 'w', encoding='utf-8') as fp:
+                fp.write(generate_text(size, alphabet_size=4))
+            outputs = []
+            row = []
+            for k, (name, func) in enumerate(variants):
+                dst = os.path.join(tmp, f'dst{k}.txt')
+                elapsed = measure_time(func, src, dst, pattern, replacement, repeat=1)
+                # tracemalloc 会拖慢运行，峰值内存单独再跑一次测量
+                tracemalloc.start()
+                func(src, dst, pattern, replacement)
+                peak = tracemalloc.get_traced_memory()[1] / (1 << 20)
+                tracemalloc.stop()
+                times[name].append(elapsed)
+                peaks[name].append(peak)
+                row.append(f"{elapsed:>22.3f} {peak:>14.1f}")
+                with open(dst, 'rb') as fp:
+                    outputs.append(fp.read())
+            if outputs[0] != outputs[1]:
+                raise AssertionError(f"流式替换结果与内存中重建不一致 (size={size})")
+            print(f"{size >> 20:>8}MB " + " ".join(row))
+    print()
+
+    xs = [size >> 20 for size in sizes]
+    plot_comparison(xs, [('运行时间', times)], '文件大小 (MB)', 'kmp_replace_time.png')
+    plt.figure(figsize=(7, 5))
+    for name, values in peaks.items():
+        plt.plot(xs, values, 'o-', label=name)
+    plt.xlabel('文件大小 (MB)')
+    plt.ylabel('峰值内存 (MB)')
+    plt.title('替换的峰值内存')
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    plt.savefig('kmp_replace_memory.png', dpi=300, bbox_inches='tight')
+    plt.close()
+    print("图表已保存: kmp_replace_memory.png\n")
+
+
+def test_periodic():
+    """
+    周期快速路径与 KMP 对比：匹配最密集的全 'A'、周期为 2 的 'AB' 重复文本、
+    test_worst_case 的最坏情况（没有匹配）以及随机文本（快速路径几乎不触发）
+    """
+    print("=" * 60)
+    print("对比 10: 周期快速路径 vs KMP")
+    print("=" * 60)
+
+    variants = [
+        ("kmp_search_all", kmp_search_all),
+        ("runs", kmp_search_runs),
+        ("runs+展开", lambda text, pattern: list(expand_runs(kmp_search_runs(text, pattern)))),
+    ]
+    scenarios = [
+        ("全 'A'，模式 'A'*32", lambda n: ('A' * n, 'A' * 32)),
+        ("'AB' 重复，模式 'AB'*16", lambda n: ('AB' * (n // 2), 'AB' * 16)),
+        ("最坏情况 'A'*31+'B'", lambda n: ('A' * n, 'A' * 31 + 'B')),
+        ("随机文本（字母表 4）", lambda n: (generate_text(n, alphabet_size=4),
+                                    generate_text(4, alphabet_size=4))),
+    ]
+    text_lengths = [1000, 10000, 100000, 200000, 500000]
+    panels = []
+
+    for title, make in scenarios:
+        print(f"{title}\n")
+        print(f"{'n':>10} {'匹配数':>10} {'段数':>8} " + " ".join(f"{name:>16}" for name, _ in variants))
+        print("-" * (31 + 17 * len(variants)))
+        results = {name: [] for name, _ in variants}
+        for n in text_lengths:
+            text, pattern = make(n)
+            expected = kmp_search_all(text, pattern)
+            runs = kmp_search_runs(text, pattern)
+            if list(expand_runs(runs)) != expected:
+                raise AssertionError(f"周期快速路径结果与 kmp_search_all 不一致 ({title}, n={n})")
+            for name, func in variants:
+                results[name].append(measure_time(func, text, pattern, repeat=3))
+            print(f"{n:>10} {len(expected):>10} {len(runs):>8} " +
+                  " ".join(f"{results[name][-1]:>16.6f}" for name, _ in variants))
+        base = results["kmp_search_all"]
+        for name, _ in variants[1:]:
+            speedup = [b / t for b, t in zip(base, results[name])]
+            print(f"{name} 相对 kmp_search_all 的加速比: {min(speedup):.2f}x ~ {max(speedup):.2f}x")
+        print()
+        panels.append((title, results))
+
+    plot_comparison(text_lengths, panels, '文本长度 n', 'kmp_periodic.png')
+
+
+def test_rabin_karp():
+    """
+    等长 k-mer 集合：Rabin–Karp 向量化哈希扫描 vs 逐模式 KMP vs Aho–Corasick
+    文本为字母表 4 的随机序列（类似 DNA），模式为长度 12 的 k-mer，一半取自文本
+    """
+    print("=" * 60)
+    print("对比 11: Rabin–Karp vs 逐模式 KMP vs Aho–Corasick（等长模式）")
+    print("=" * 60)
+
+    text_length = 200000
+    kmer = 12
+    text = generate_text(text_length, alphabet_size=4)
+    pattern_counts = [10, 1000, 10000, 100000]
+    sample = 100  # 模式过多时 KMP 基线只测前 sample 个，再按比例外推
+
+    print(f"文本长度: {text_length}，字母表大小: 4，模式长度: {kmer}\n")
+    print(f"{'模式数':>8} {'逐模式KMP(秒)':>16} {'Aho-Corasick(秒)':>18} {'Rabin-Karp(秒)':>16} "
+          f"{'相对KMP':>8} {'相对AC':>8}")
+    print("-" * 80)
+
+    kmp_times, ac_times, rk_times = [], [], []
+    for k in pattern_counts:
+        patterns = []
+        for i in range(k):
+            if i % 2 == 0:
+                start = random.randrange(text_length - kmer)
+                patterns.append(text[start:start + kmer])
+            else:
+                patterns.append(generate_text(kmer, alphabet_size=4))
+
+        start = time.perf_counter()
+        expected = [(pid, pos) for pid, p in enumerate(patterns[:sample])
+                    for pos in kmp_search_all(text, p)]
+        kmp_time = (time.perf_counter() - start) * k / min(k, sample)
+
+        ac_time = measure_time(aho_corasick_search, text, patterns, repeat=3)
+        rk_time = measure_time(rabin_karp_search, text, patterns, repeat=3)
+        got = rabin_karp_search(text, patterns)
+        if got != aho_corasick_search(text, patterns) or \
+                sorted(m for m in got if m[0] < sample) != sorted(expected):
+            raise AssertionError(f"Rabin–Karp 结果不一致 (k={k})")
+
+        kmp_times.append(kmp_time)
+        ac_times.append(ac_time)
+        rk_times.append(rk_time)
+        note = " (KMP 外推)" if k > sample else ""
+        print(f"{k:>8} {kmp_time:>16.4f} {ac_time:>18.4f} {rk_time:>16.4f} "
+              f"{kmp_time / rk_time:>7.1f}x {ac_time / rk_time:>7.1f}x{note}")
+    print("\n注: Aho–Corasick 与 Rabin–Karp 的时间都包含预处理模式的时间\n")
+
+    plt.figure(figsize=(7, 5))
+    plt.loglog(pattern_counts, kmp_times, 'o-', label='逐模式 kmp_search_all')
+    plt.loglog(pattern_counts, ac_times, 's-', label='Aho–Corasick')
+    plt.loglog(pattern_counts, rk_times, '^-', label='Rabin–Karp')
+    plt.xlabel('模式数')
+    plt.ylabel('运行时间 (秒)')
+    plt.title('等长多模式匹配')
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    plt.savefig('kmp_rabin_karp.png', dpi=300, bbox_inches='tight')
+    plt.close()
+    print("图表已保存: kmp_rabin_karp.png\n")
+
+
+def main():
+    """运行所有引擎对比"""
+    random.seed(42)  # 设置随机种子以便复现
+
+    test_dfa_vs_loop()
+    test_multi_pattern()
+    test_adaptive_selection()
+    test_boyer_moore()
+    test_shift_or()
+    test_suffix_index()
+    test_vectorized()
+    test_batch()
+    test_replace()
+    test_periodic()
+    test_rabin_karp()
+
+    print("=" * 60)
+    print("所有对比完成！")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+from kmp import build_next
+
+
+def build_bad_char(pattern):
+    """
+    构建坏字符表：每个字符在 pattern 中最后一次出现的位置
+    失配字符 c 出现在 text 中时，模式可以右移 j - last[c]（不在表中视为 -1）
+    """
+    last = {}
+    for i, c in enumerate(pattern):
+        last[c] = i
+    return last
+
+
+def build_good_suffix(pattern):
+    """
+    构建好后缀表：good[j + 1] 为在 pattern[j] 处失配（其后 m-1-j 个字符已匹配）时的右移距离，
+    good[0] 为完全匹配后的右移距离（即模式的最小周期）
+
+    复用前缀函数：对反转的模式 r 运行 build_next，
+    nr[i] = L 表示 pattern 长度为 L 的后缀在右移 i+1-L 处再次出现；
+    L 是 r[0:i+1] 的最长边界，因此每个后缀的最近一次出现恰好在 nr[i] == L 的最小 i 处
+    """
+    m = len(pattern)
+    nr = build_next(pattern[::-1])
+
+    # 情况 2：已匹配的后缀中只有一部分与模式前缀重合，右移 m - b，b 为不超过已匹配长度的最长边界
+    good = [0] * (m + 1)
+    b = nr[m - 1]
+    for j in range(-1, m):
+        k = m - 1 - j  # 已匹配的字符数
+        while b > k:
+            b = nr[b - 1]
+        good[j + 1] = m - b
+
+    # 情况 1：已匹配的后缀完整地出现在模式中更靠左的位置
+    for i in range(m):
+        length = nr[i]
+        if length > 0:
+            j = m - 1 - length
+            good[j + 1] = min(good[j + 1], i + 1 - length)
+
+    # 最后一个字符就失配时没有已匹配的后缀，只能保证右移 1
+    good[m] = 1
+    return good
+
+
+def boyer_moore_search_all(text, pattern, tables=None):
+    """
+    Boyer–Moore 算法查找 text 中所有 pattern 的出现位置，接口与 kmp_search_all 相同
+    从右向左比较，失配时取坏字符规则与好后缀规则中较大的右移距离
+    tables 可传入 (build_bad_char(pattern), build_good_suffix(pattern)) 以复用
+    """
+    if not pattern:
+        return [0]
+
+    n, m = len(text), len(pattern)
+    last, good = tables or (build_bad_char(pattern), build_good_suffix(pattern))
+    positions = []
+    i = 0
+
+    while i <= n - m:
+        j = m - 1
+        while j >= 0 and text[i + j] == pattern[j]:
+            j -= 1
+
+        if j < 0:
+            positions.append(i)
+            i += good[0]
+        else:
+            bad = j - last.get(text[i + j], -1)
+            i += max(bad, good[j + 1])
+
+    return positions
@@ -1,10 +1,45 @@
-def build_next(pattern):
+import mmap
+from array import array
+from collections import OrderedDict, namedtuple
+from time import perf_counter
+
+
+def next_typecode(m):
+    """
+    能容纳长度为 m 的模式的前缀表（取值 0..m-1）的最小 array 类型码：
+    m <= 32768 用 'h'（2 字节），不超过 int32 用 'i'（4 字节），否则用 'q'
+    """
+    if m <= 1 << 15:
+        return "h"
+    if m <= 1 << 31:
+        return "i"
+    return "q"
+
+
+def _new_next(m, typecode):
+    """按 typecode 分配长度为 m、初始值为 0 的前缀表"""
+    if typecode is None:
+        return [0] * m # 创建长m列表初始值为0
+    if typecode == "auto":
+        typecode = next_typecode(m)
+    return array(typecode, [0]) * m
+
+
+def build_next(pattern, typecode=None, stats=None):
     """
     构建 KMP 前缀表（next 数组）
     next[i] 表示 pattern[0:i] 的最长前后缀长度
+    typecode 为 None 时返回 list；否则存入该类型的 array（如 'i'），
+    为 "auto" 时由 next_typecode 按模式长度选择。list 每项至少占 8 字节指针，
+    取值超过 256 时还要额外的 int 对象，array 只占 2 或 4 字节；
+    所有引擎都能直接使用 array 形式的前缀表，需要 NumPy 时可用 np.frombuffer 零拷贝转换
+    stats 可传入 OpStats 统计操作次数（见 OpStats）；为 None 时运行未插桩的循环
     """
+    if stats is not None:
+        return _build_next_counted(pattern, typecode, stats)
+
     m = len(pattern)
-    nxt = [0] * m # 创建长m列表初始值为0
+    nxt = _new_next(m, typecode)
     j = 0
 
     for i in range(1, m):
@@ -17,16 +52,25 @@ def build_next(pattern):
     return nxt
 
 
-def kmp_search_all(text, pattern):
+def kmp_search_all(text, pattern, nxt=None, max_matches=None, stats=None):
     """
     查找 text 中所有 pattern 的出现位置
     返回一个列表 positions，包含所有匹配的起始下标
+    nxt 可传入已构建好的前缀表，避免重复构建
+    max_matches 为最多返回的匹配数，找够后立即停止扫描
+    stats 可传入 OpStats 统计搜索阶段的操作次数；需要构建前缀表时，
+    构建阶段的计数记在 stats.build 中
     """
+    if max_matches is not None and max_matches <= 0:
+        return []
     if not pattern:
         return [0]
+    if stats is not None:
+        return _kmp_search_all_counted(text, pattern, nxt, max_matches, stats)
 
     n, m = len(text), len(pattern)
-    nxt = build_next(pattern)
+    if nxt is None:
+        nxt = build_next(pattern)
     positions = []
     j = 0  # pattern index
 
@@ -40,17 +84,710 @@ def kmp_search_all(text, pattern):
         if j == m:
             # 匹配成功：记录起始位置
             positions.append(i - m + 1)
+            if len(positions) == max_matches:
+                break
             j = nxt[j - 1]  # 继续寻找下一个匹配
 
     return positions
 
-if __name__ == "__main__":
-    text = input("请输入text:")
-    pattern = input("请输入pattern:")
 
-    positions = kmp_search_all(text,pattern)
+class OpStats:
+    """
+    KMP 操作计数，传给 build_next / kmp_search_all 的 stats 参数后由插桩版本的循环累加：
+    comparisons 为字符比较次数，fallbacks 为沿 next 链回退的总步数，
+    max_chain 为处理单个字符时最长的连续回退步数，matches 为匹配次数，seconds 为耗时
+    build 为 kmp_search_all 内部构建前缀表时该阶段的 OpStats（否则为 None）
+
+    未传入 stats 时运行的是原有循环，插桩没有任何额外开销；
+    由于 j 每个字符最多增加 1，总有 fallbacks <= 长度、comparisons <= 3 × 长度
+    """
+
+    def __init__(self):
+        self.comparisons = 0
+        self.fallbacks = 0
+        self.max_chain = 0
+        self.matches = 0
+        self.seconds = 0.0
+        self.build = None
+
+    def as_dict(self):
+        """以字典形式返回计数（含 build 阶段）"""
+        counts = {name: getattr(self, name)
+                  for name in ("comparisons", "fallbacks", "max_chain", "matches", "seconds")}
+        if self.build is not None:
+            counts["build"] = self.build.as_dict()
+        return counts
+
+    def __repr__(self):
+        return (f"OpStats(comparisons={self.comparisons}, fallbacks={self.fallbacks}, "
+                f"max_chain={self.max_chain}, matches={self.matches}, seconds={self.seconds:.6f})")
+
+
+def _build_next_counted(pattern, typecode, stats):
+    """build_next 的插桩版本：比较与回退的顺序与原循环完全一致"""
+    start = perf_counter()
+    m = len(pattern)
+    nxt = _new_next(m, typecode)
+    comparisons = fallbacks = max_chain = 0
+    j = 0
+
+    for i in range(1, m):
+        c = pattern[i]
+        chain = 0
+        while j > 0:
+            comparisons += 1
+            if c == pattern[j]:
+                break
+            j = nxt[j - 1]
+            chain += 1
+        fallbacks += chain
+        if chain > max_chain:
+            max_chain = chain
+        comparisons += 1
+        if c == pattern[j]:
+            j += 1
+        nxt[i] = j
+
+    stats.comparisons += comparisons
+    stats.fallbacks += fallbacks
+    stats.max_chain = max(stats.max_chain, max_chain)
+    stats.seconds += perf_counter() - start
+    return nxt
+
+
+def _kmp_search_all_counted(text, pattern, nxt, max_matches, stats):
+    """kmp_search_all 的插桩版本：比较与回退的顺序与原循环完全一致"""
+    if nxt is None:
+        stats.build = OpStats()
+        nxt = build_next(pattern, stats=stats.build)
+
+    start = perf_counter()
+    m = len(pattern)
+    positions = []
+    comparisons = fallbacks = max_chain = 0
+    j = 0
+
+    for i, c in enumerate(text):
+        chain = 0
+        while j > 0:
+            comparisons += 1
+            if c == pattern[j]:
+                break
+            j = nxt[j - 1]
+            chain += 1
+        fallbacks += chain
+        if chain > max_chain:
+            max_chain = chain
+        comparisons += 1
+        if c == pattern[j]:
+            j += 1
+
+        if j == m:
+            positions.append(i - m + 1)
+            if len(positions) == max_matches:
+                break
+            j = nxt[j - 1]
+
+    stats.comparisons += comparisons
+    stats.fallbacks += fallbacks
+    stats.max_chain = max(stats.max_chain, max_chain)
+    stats.matches += len(positions)
+    stats.seconds += perf_counter() - start
+    return positions
+
+
+def kmp_finditer(text, pattern, nxt=None):
+    """
+    惰性地逐个产出匹配的起始位置，不构建结果列表
+    调用方可以随时停止迭代，扫描也随之停止
+    """
+    if not pattern:
+        yield 0
+        return
+
+    m = len(pattern)
+    if nxt is None:
+        nxt = build_next(pattern)
+    j = 0
+
+    for i, c in enumerate(text):
+        while j > 0 and c != pattern[j]:
+            j = nxt[j - 1]
+
+        if c == pattern[j]:
+            j += 1
+
+        if j == m:
+            yield i - m + 1
+            j = nxt[j - 1]
+
+
+def kmp_count(text, pattern, nxt=None):
+    """
+    统计 pattern 在 text 中的出现次数（允许重叠），只维护一个计数器
+    """
+    if not pattern:
+        return 1
+
+    m = len(pattern)
+    if nxt is None:
+        nxt = build_next(pattern)
+    count = 0
+    j = 0
+
+    for c in text:
+        while j > 0 and c != pattern[j]:
+            j = nxt[j - 1]
+
+        if c == pattern[j]:
+            j += 1
+
+        if j == m:
+            count += 1
+            j = nxt[j - 1]
+
+    return count
+
+
+def kmp_find_first(text, pattern, nxt=None):
+    """
+    返回第一个匹配的起始位置，找到后立即停止；没有匹配时返回 -1（与 str.find 一致）
+    """
+    if not pattern:
+        return 0
+
+    m = len(pattern)
+    if nxt is None:
+        nxt = build_next(pattern)
+    j = 0
+
+    for i, c in enumerate(text):
+        while j > 0 and c != pattern[j]:
+            j = nxt[j - 1]
+
+        if c == pattern[j]:
+            j += 1
+
+        if j == m:
+            return i - m + 1
+
+    return -1
+
+
+class KMPMatcher:
+    """
+    流式 KMP 匹配器：前缀表只构建一次，文本可以分块喂入
+    跨块保留模式串指针 j，因此跨越块边界的匹配同样能被找到
+    返回的位置均为全局偏移（相对整个流的起点），额外内存为 O(m + 块大小)
+    """
+
+    def __init__(self, pattern, nxt=None):
+        self.pattern = pattern
+        self.nxt = build_next(pattern) if nxt is None else nxt
+        self.reset()
+
+    def reset(self):
+        """重置匹配状态，以便扫描新的流"""
+        self.j = 0       # 当前已匹配的模式串长度
+        self.offset = 0  # 已消费的文本字符总数
+        self.fed = False  # 是否已喂入过数据（用于空模式串）
 
-    print()
-    print("匹配总次数：",len(positions))
-    print("每次匹配起始位置：",positions)
+    def feed(self, chunk):
+        """
+        喂入一块文本，返回在本块中结束的所有匹配的全局起始位置
+        """
+        pattern, nxt = self.pattern, self.nxt
+        m = len(pattern)
+        base = self.offset
+        self.offset += len(chunk)
 
+        if not m:
+            # 与 kmp_search_all 一致：空模式串只在位置 0 匹配一次
+            first, self.fed = not self.fed, True
+            return [0] if first else []
+
+        positions = []
+        j = self.j
+        for i, c in enumerate(chunk):
+            while j > 0 and c != pattern[j]:
+                j = nxt[j - 1]
+
+            if c == pattern[j]:
+                j += 1
+
+            if j == m:
+                positions.append(base + i - m + 1)
+                j = nxt[j - 1]
+
+        self.j = j
+        return positions
+
+
+class KMPPattern:
+    """
+    编译后的模式串（类似 re.compile 的返回值）
+    前缀表只构建一次，之后可以在任意多的文本上反复搜索；对象本身无状态，可以共享
+    模式非常长时可传入 typecode="auto"，用紧凑的 array 保存前缀表（见 build_next）
+    """
+
+    def __init__(self, pattern, typecode=None):
+        self.pattern = pattern
+        self.nxt = build_next(pattern, typecode)
+
+    def search_all(self, text, max_matches=None):
+        """查找 text 中所有匹配的起始位置，等价于 kmp_search_all"""
+        return kmp_search_all(text, self.pattern, self.nxt, max_matches)
+
+    def finditer(self, text):
+        """惰性产出匹配位置，等价于 kmp_finditer"""
+        return kmp_finditer(text, self.pattern, self.nxt)
+
+    def count(self, text):
+        """统计匹配次数，等价于 kmp_count"""
+        return kmp_count(text, self.pattern, self.nxt)
+
+    def find_first(self, text):
+        """返回第一个匹配位置或 -1，等价于 kmp_find_first"""
+        return kmp_find_first(text, self.pattern, self.nxt)
+
+    def matcher(self):
+        """创建一个共享前缀表的流式匹配器"""
+        return KMPMatcher(self.pattern, self.nxt)
+
+    def __repr__(self):
+        return f"KMPPattern({self.pattern!r})"
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class PatternCache:
+    """
+    编译结果的 LRU 缓存：命中时直接返回已编译对象，超出容量时淘汰最久未使用的模式
+    maxsize 为 None 表示不限容量，为 0 表示不缓存
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, pattern):
+        """返回 pattern 的编译结果，未命中时编译并放入缓存"""
+        # bytearray 等可变对象不可哈希，统一转为 bytes 作为键
+        key = pattern if isinstance(pattern, str) else bytes(pattern)
+        compiled = self.entries.get(key)
+        if compiled is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return compiled
+
+        self.misses += 1
+        compiled = KMPPattern(key)
+        if self.maxsize != 0:
+            self.entries[key] = compiled
+            self.evict()
+        return compiled
+
+    def evict(self):
+        """淘汰多余的条目，直到不超过 maxsize"""
+        if self.maxsize is None:
+            return
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def resize(self, maxsize):
+        """修改缓存容量，必要时立即淘汰"""
+        self.maxsize = maxsize
+        self.evict()
+
+    def clear(self):
+        """清空缓存与命中统计"""
+        self.entries.clear()
+        self.hits = self.misses = 0
+
+    def info(self):
+        """返回 CacheInfo(hits, misses, maxsize, currsize)"""
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self.entries))
+
+
+_pattern_cache = PatternCache()
+
+
+def compile(pattern):
+    """
+    编译 pattern 并返回可复用的 KMPPattern，结果保存在模块级 LRU 缓存中
+    同一个模式反复编译时只在第一次构建前缀表
+    """
+    return _pattern_cache.get(pattern)
+
+
+def set_cache_size(maxsize):
+    """设置编译缓存的容量（None 不限，0 关闭缓存）"""
+    _pattern_cache.resize(maxsize)
+
+
+def cache_info():
+    """返回编译缓存的命中统计"""
+    return _pattern_cache.info()
+
+
+def purge():
+    """清空编译缓存"""
+    _pattern_cache.clear()
+
+
+def kmp_search_stream(chunks, pattern):
+    """
+    在分块到达的文本流中查找 pattern
+    chunks 可以是生成器、文件分块迭代器或套接字读取结果等任意可迭代对象
+    逐个产出匹配的全局起始位置
+    """
+    if not pattern:
+        yield 0
+        return
+
+    matcher = KMPMatcher(pattern)
+    for chunk in chunks:
+        yield from matcher.feed(chunk)
+
+
+async def kmp_search_async(source, pattern, chunk_size=1 << 16):
+    """
+    异步流式匹配：source 可以是 asyncio.StreamReader（或任何带 read 协程的对象），
+    也可以是异步产出文本块的异步迭代器；逐个产出匹配的全局起始位置
+    跨块保留 KMPMatcher 的 j 与前缀表，数据边到达边匹配，不需要先缓冲整个消息体
+    StreamReader 产出的是 bytes，pattern 需要同为 bytes
+    """
+    if not pattern:
+        yield 0
+        return
+
+    matcher = KMPMatcher(pattern)
+    if hasattr(source, "read"):
+        while True:
+            chunk = await source.read(chunk_size)
+            if not chunk:
+                return
+            for pos in matcher.feed(chunk):
+                yield pos
+    else:
+        async for chunk in source:
+            for pos in matcher.feed(chunk):
+                yield pos
+
+
+def read_chunks(fp, chunk_size=1 << 20):
+    """按固定大小从文件对象中读取分块，直到 EOF"""
+    while True:
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def kmp_search_file(path, pattern, chunk_size=1 << 20, encoding="utf-8"):
+    """
+    以文本模式分块扫描文件，返回所有匹配的起始位置（字符偏移）
+    文件不会被整体读入内存
+    """
+    with open(path, "r", encoding=encoding, newline="") as fp:
+        return list(kmp_search_stream(read_chunks(fp, chunk_size), pattern))
+
+
+def kmp_replace_stream(chunks, pattern, replacement, out, count=-1, buffer_size=1 << 16):
+    """
+    流式替换：把分块到达的文本中 pattern 的所有不重叠出现（从左到右）替换为 replacement，
+    写入可写流 out，结果与 text.replace(pattern, replacement, count) 一致；返回替换次数
+
+    匹配完成后 j 归零而不是回退到 nxt[m-1]，因此匹配互不重叠
+    尚未输出的只有当前部分匹配的 j 个字符，它们恰好等于 pattern[:j]，跨块时无需另存文本；
+    输出先攒在缓冲区，每次向 out 写入不超过 buffer_size 个字符
+    count 为负数时不限替换次数
+    """
+    if not pattern:
+        raise ValueError("kmp_replace_stream 不支持空模式串")
+
+    m = len(pattern)
+    nxt = build_next(pattern)
+    empty = pattern[:0]
+    pending, size = [], 0
+    replaced = 0
+    j = 0
+
+    def emit(piece):
+        nonlocal size
+        pending.append(piece)
+        size += len(piece)
+        if size >= buffer_size:
+            flush(final=False)
+
+    def flush(final):
+        nonlocal pending, size
+        data = empty.join(pending)
+        stop = len(data) if final else len(data) - len(data) % buffer_size
+        for k in range(0, stop, buffer_size):
+            out.write(data[k:k + buffer_size])
+        pending = [data[stop:]] if stop < len(data) else []
+        size = len(data) - stop
+
+    for chunk in chunks:
+        if replaced == count:
+            emit(chunk)
+            continue
+
+        # data 的前 j 个字符是上一块留下的部分匹配 pattern[:j]
+        data = pattern[:j] + chunk
+        done = 0  # data[:done] 已输出
+        for i, c in enumerate(chunk, j):
+            while j > 0 and c != pattern[j]:
+                j = nxt[j - 1]
+
+            if c == pattern[j]:
+                j += 1
+
+            if j == m:
+                emit(data[done:i - m + 1])
+                emit(replacement)
+                done = i + 1
+                j = 0
+                replaced += 1
+                if replaced == count:
+                    break
+
+        if replaced == count:
+            emit(data[done:])
+            j = 0
+        else:
+            emit(data[done:len(data) - j])
+
+    emit(pattern[:j])
+    flush(final=True)
+    return replaced
+
+
+def kmp_replace_file(src, dst, pattern, replacement, count=-1, chunk_size=1 << 20,
+                     encoding="utf-8", buffer_size=1 << 16):
+    """
+    分块读取文件 src，替换后写入 dst，返回替换次数；峰值内存与文件大小无关
+    encoding 为 None 时按二进制处理，pattern 与 replacement 需要是 bytes
+    """
+    mode = {} if encoding is None else {"encoding": encoding, "newline": ""}
+    suffix = "b" if encoding is None else ""
+    with open(src, "r" + suffix, **mode) as fin, open(dst, "w" + suffix, **mode) as fout:
+        return kmp_replace_stream(read_chunks(fin, chunk_size), pattern, replacement, fout,
+                                  count=count, buffer_size=buffer_size)
+
+
+def kmp_search_bytes(data, pattern):
+    """
+    在二进制数据中查找 pattern，返回所有匹配的字节偏移
+    data 可以是 bytes、bytearray、memoryview 或 mmap，通过 memoryview 零拷贝访问
+    """
+    if isinstance(pattern, str):
+        raise TypeError("kmp_search_bytes 需要 bytes 类型的 pattern，请先 encode")
+    pattern = bytes(pattern)
+    if not pattern:
+        return [0]
+
+    view = memoryview(data)
+    try:
+        if view.ndim != 1 or view.itemsize != 1:
+            view = view.cast("B")
+        # 遍历 memoryview 与索引 bytes 得到的都是 int，可直接复用流式匹配器
+        return KMPMatcher(pattern).feed(view)
+    finally:
+        view.release()
+
+
+def kmp_search_mmap(path, pattern):
+    """
+    将文件以只读方式映射到内存后直接扫描，返回所有匹配的字节偏移
+    不读取、不解码文件内容，峰值内存与文件大小无关
+    """
+    with open(path, "rb") as fp:
+        if fp.seek(0, 2) == 0:
+            # 空文件无法映射
+            return kmp_search_bytes(b"", pattern)
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return kmp_search_bytes(mm, pattern)
+
+
+def build_dfa(pattern):
+    """
+    把 next 数组展开为完整的状态转移表（KMP 自动机）
+    列为 pattern 中出现的字符（第 0 列代表其余所有字符），行为状态 0..m
+    表中存放的是"下一状态 * 列数"，扫描时省去一次乘法
+    返回 (table, classes, width)：table 为 array，classes 为 字符->列号 映射
+    """
+    m = len(pattern)
+    nxt = build_next(pattern)
+    classes = {c: k + 1 for k, c in enumerate(sorted(set(pattern)))}
+    width = len(classes) + 1
+    size = (m + 1) * width
+    table = array("i" if size < 2 ** 31 else "q", [0]) * size
+
+    for j in range(m + 1):
+        row = j * width
+        if j > 0:
+            # 失配时的转移与回退状态 nxt[j-1] 完全相同，整行复制
+            back = nxt[j - 1] * width
+            table[row:row + width] = table[back:back + width]
+        if j < m:
+            table[row + classes[pattern[j]]] = row + width  # 状态 j+1
+
+    return table, classes, width
+
+
+def kmp_search_dfa(text, pattern, dfa=None):
+    """
+    使用 KMP 自动机查找所有匹配：每个文本字符只做一次查表，没有回退循环
+    text/pattern 同为 str，或同为 bytes 类数据（此时 text 可以是 mmap）
+    dfa 可传入 build_dfa 的结果以复用
+    """
+    if not pattern:
+        return [0]
+
+    m = len(pattern)
+    table, classes, width = dfa or build_dfa(pattern)
+    if isinstance(pattern, str):
+        return _dfa_scan(text, m, table, classes, width)
+    # 按字节迭代（mmap 直接迭代得到的是长度为 1 的 bytes）；
+    # 视图用完即释放，否则 mmap 在视图被回收之前无法 close
+    with memoryview(text) as mv, mv.cast("B") as view:
+        return _dfa_scan(view, m, table, classes, width)
+
+
+def _dfa_scan(text, m, table, classes, width):
+    """kmp_search_dfa 的扫描循环：逐字符查表，状态到达 m 时记录匹配起点"""
+    get = classes.get
+    accept = m * width
+    positions = []
+    state = 0
+
+    for i, c in enumerate(text):
+        state = table[state + get(c, 0)]
+        if state == accept:
+            positions.append(i - m + 1)
+
+    return positions
+
+
+OUTPUT_BATCH = 1 << 16  # 命令行输出时每次 write 的匹配数
+
+
+def _scan_source(fp, pattern, count_only):
+    """分块扫描已打开的文件对象，返回匹配位置列表，count_only 时只返回匹配数"""
+    if not pattern:
+        return 1 if count_only else [0]
+    matcher = KMPMatcher(pattern)
+    if count_only:
+        return sum(len(matcher.feed(chunk)) for chunk in read_chunks(fp))
+    positions = []
+    for chunk in read_chunks(fp):
+        positions.extend(matcher.feed(chunk))
+    return positions
+
+
+def _scan_path(path, pattern, binary, encoding, count_only):
+    """扫描一个文件，返回 (结果, 错误信息)；供 -j 的工作进程调用，因此定义在模块顶层"""
+    try:
+        if binary:
+            with open(path, "rb") as fp:
+                return _scan_source(fp, pattern, count_only), None
+        with open(path, "r", encoding=encoding, newline="") as fp:
+            return _scan_source(fp, pattern, count_only), None
+    except (OSError, UnicodeDecodeError) as exc:
+        return None, f"{path}: {exc}"
+
+
+def main(argv=None):
+    """
+    grep 风格的命令行入口：python kmp.py [选项] PATTERN [FILE ...]
+    没有 FILE 或 FILE 为 - 时读取标准输入；返回退出码（有匹配 0，无匹配 1，出错 2）
+    只在这里按需导入 argparse / sys，多文件并行时才导入进程池
+    """
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(
+        prog="kmp.py", description="用 KMP 算法在文件或标准输入中查找模式串，输出匹配的起始偏移")
+    parser.add_argument("pattern", nargs="?", help="模式串（使用 -f 时省略）")
+    parser.add_argument("files", nargs="*", help="要扫描的文件，缺省或 - 表示标准输入")
+    parser.add_argument("-f", "--pattern-file", help="从文件读取模式串（去掉末尾一个换行符）")
+    parser.add_argument("-b", "--bytes", action="store_true", help="按字节匹配，输出字节偏移")
+    parser.add_argument("-c", "--count", action="store_true", help="只输出每个输入的匹配数")
+    parser.add_argument("-o", "--offsets-only", action="store_true",
+                        help="只输出偏移，不加文件名前缀")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="并行扫描文件的进程数")
+    parser.add_argument("--encoding", default="utf-8", help="文本模式的编码（默认 utf-8）")
+    args = parser.parse_args(argv)
+
+    files = args.files
+    if args.pattern_file is not None:
+        if args.pattern is not None:
+            files = [args.pattern] + files
+        with open(args.pattern_file, "rb") as fp:
+            pattern = fp.read()
+        if pattern.endswith(b"\n"):
+            pattern = pattern[:-1]
+        if not args.bytes:
+            pattern = pattern.decode(args.encoding)
+    elif args.pattern is None:
+        parser.error("需要 PATTERN 或 -f FILE")
+    else:
+        pattern = args.pattern.encode(args.encoding) if args.bytes else args.pattern
+    files = files or ["-"]
+
+    scan = (pattern, args.bytes, args.encoding, args.count)
+    paths = [path for path in files if path != "-"]
+    if args.jobs > 1 and len(paths) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            futures = {path: executor.submit(_scan_path, path, *scan) for path in paths}
+            results = {path: future.result() for path, future in futures.items()}
+    else:
+        results = {}
+
+    status = 1
+    prefix = len(files) > 1 and not args.offsets_only
+    out = sys.stdout
+    for path in files:
+        if path == "-":
+            if args.bytes:
+                result = _scan_source(sys.stdin.buffer, pattern, args.count)
+            else:
+                # 按 --encoding 解码的独立文本包装，扫描完即关闭（closefd=False，不关闭标准输入本身）
+                with open(sys.stdin.fileno(), "r", encoding=args.encoding, newline="",
+                          closefd=False) as source:
+                    result = _scan_source(source, pattern, args.count)
+            error = None
+        elif path in results:
+            result, error = results[path]
+        else:
+            result, error = _scan_path(path, *scan)
+
+        if error is not None:
+            out.flush()
+            print(f"kmp.py: {error}", file=sys.stderr)
+            status = 2
+            continue
+        if result and status == 1:
+            status = 0
+
+        # 成批拼接后再 write，不为每个匹配单独 print
+        head = f"{path}:" if prefix else ""
+        if args.count:
+            out.write(f"{head}{result}\n")
+        else:
+            sep = "\n" + head
+            for k in range(0, len(result), OUTPUT_BATCH):
+                out.write(head + sep.join(map(str, result[k:k + OUTPUT_BATCH])) + "\n")
+    out.flush()
+    return status
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
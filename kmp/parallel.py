@@ -0,0 +1,211 @@
+"""
+多进程并行 KMP
+把文本切成相互重叠 m-1 个字符的段，交给进程池分别扫描后按顺序合并
+文本放在共享内存（或由各进程各自 mmap 同一文件）中，工作进程不会收到整份文本的拷贝
+大量短文本（如日志行）则按批分发，同一模式只构建一次前缀表
+"""
+
+import mmap
+import os
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from multiprocessing import shared_memory
+
+from kmp import build_next, kmp_search_all, kmp_search_bytes, kmp_search_mmap
+
+
+def split_segments(n, m, parts):
+    """
+    把所有可能的匹配起点 [0, n-m] 均分为 parts 段，返回 [(start, end), ...]
+    每段实际扫描 text[start : end+m-1]，与下一段重叠 m-1 个字符，
+    因此每个匹配恰好落在其起点所在的那一段里，合并时无需再去重
+    """
+    starts = n - m + 1
+    bounds = [starts * k // parts for k in range(parts + 1)]
+    return [(bounds[k], bounds[k + 1]) for k in range(parts) if bounds[k] < bounds[k + 1]]
+
+
+def _scan_shared(name, encoding, width, pattern, nxt, start, end):
+    """
+    工作进程：从共享内存中取出本段文本并扫描
+    encoding 为 None 时共享内存中是原始字节，直接在 memoryview 上扫描而不解码
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        stop = end + len(pattern) - 1
+        with shm.buf[start * width:stop * width] as view:
+            if encoding is None:
+                return [start + pos for pos in kmp_search_all(view, pattern, nxt)]
+            segment = str(view, encoding)
+        return [start + pos for pos in kmp_search_all(segment, pattern, nxt)]
+    finally:
+        shm.close()
+
+
+def _scan_mapped(path, pattern, start, end):
+    """工作进程：自行映射文件，只扫描本段字节"""
+    with open(path, "rb") as fp, mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm)[start:end + len(pattern) - 1] as view:
+            return [start + pos for pos in kmp_search_bytes(view, pattern)]
+
+
+def _run(executor, workers, jobs):
+    """在给定（或临时创建的）进程池上执行所有分段任务，按分段顺序拼接结果"""
+    own = executor is None
+    if own:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [executor.submit(*job) for job in jobs]
+        positions = []
+        for future in futures:
+            positions.extend(future.result())
+        return positions
+    finally:
+        if own:
+            executor.shutdown()
+
+
+def _plan(n, m, workers, min_segment):
+    """确定进程数与分段；数据太小时返回 None，由调用方退化为单进程扫描"""
+    workers = workers or os.cpu_count() or 1
+    parts = min(workers, (n - m + 1) // max(min_segment, 1))
+    if parts <= 1:
+        return None
+    return workers, split_segments(n, m, parts)
+
+
+def kmp_search_parallel(text, pattern, workers=None, min_segment=1 << 18, executor=None):
+    """
+    多进程查找 text 中所有 pattern 的出现位置，结果与 kmp_search_all 完全一致
+    text 可以是 str 或 bytes 类数据（bytes、bytearray、memoryview、mmap 等，按字节扫描）；
+    磁盘上的二进制文件可直接用 kmp_search_mmap_parallel，免去复制到共享内存
+    workers 默认为 CPU 核数；每段至少 min_segment 个起点，否则直接单进程扫描
+    executor 可传入复用的 ProcessPoolExecutor，避免每次调用都创建进程池
+    """
+    if not pattern:
+        return [0]
+    if isinstance(text, str):
+        return _search_shared(text, pattern, workers, min_segment, executor)
+    try:
+        view = memoryview(text)
+    except TypeError:
+        raise TypeError("kmp_search_parallel 需要 str 或 bytes 类数据，"
+                        "其他序列请使用 kmp_search_all") from None
+    with view:
+        if view.ndim != 1 or view.itemsize != 1:
+            with view.cast("B") as flat:
+                return _search_shared(flat, pattern, workers, min_segment, executor)
+        return _search_shared(view, pattern, workers, min_segment, executor)
+
+
+def _search_shared(text, pattern, workers, min_segment, executor):
+    """把 str 或单字节 memoryview 写入共享内存后分段扫描"""
+    n, m = len(text), len(pattern)
+    plan = _plan(n, m, workers, min_segment)
+    if plan is None:
+        return kmp_search_all(text, pattern)
+    workers, segments = plan
+
+    if isinstance(text, str):
+        # 纯 ASCII 文本每字符 1 字节，否则用定长的 UTF-32，保证字符下标可直接换算为字节偏移
+        encoding, width = ("ascii", 1) if text.isascii() else ("utf-32-le", 4)
+    else:
+        encoding, width = None, 1  # 原始字节直接复制，工作进程不解码
+    shm = shared_memory.SharedMemory(create=True, size=max(n * width, 1))
+    try:
+        block = 1 << 20  # 分块编码写入，避免再生成一份完整的编码副本
+        for i in range(0, n, block):
+            piece = text[i:i + block]
+            if encoding is not None:
+                piece = piece.encode(encoding)
+            shm.buf[i * width:i * width + len(piece)] = piece
+
+        nxt = build_next(pattern)
+        jobs = [(_scan_shared, shm.name, encoding, width, pattern, nxt, start, end)
+                for start, end in segments]
+        return _run(executor, workers, jobs)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def kmp_search_mmap_parallel(path, pattern, workers=None, min_segment=1 << 20, executor=None):
+    """
+    多进程扫描二进制文件，返回所有匹配的字节偏移，结果与 kmp_search_mmap 一致
+    每个工作进程各自 mmap 同一文件，共享操作系统页缓存
+    """
+    if isinstance(pattern, str):
+        raise TypeError("kmp_search_mmap_parallel 需要 bytes 类型的 pattern，请先 encode")
+    pattern = bytes(pattern)
+    if not pattern:
+        return [0]
+
+    n, m = os.path.getsize(path), len(pattern)
+    plan = _plan(n, m, workers, min_segment)
+    if plan is None:
+        return kmp_search_mmap(path, pattern)
+    workers, segments = plan
+
+    jobs = [(_scan_mapped, path, pattern, start, end) for start, end in segments]
+    return _run(executor, workers, jobs)
+
+
+def _scan_batch(texts, pattern, nxt, base):
+    """
+    扫描一批文本，返回 (ids, positions)：第 k 个匹配位于第 ids[k] 个文本的 positions[k] 处
+    str / bytes 文本先用 C 层的 in 运算排除不含 pattern 的文本，只对剩下的运行 KMP
+    """
+    ids, positions = array("q"), array("q")
+    for k, text in enumerate(texts, base):
+        if isinstance(text, (str, bytes, bytearray)) and pattern not in text:
+            continue
+        found = kmp_search_all(text, pattern, nxt)
+        ids.extend([k] * len(found))
+        positions.extend(found)
+    return ids, positions
+
+
+def kmp_search_batch(texts, pattern, workers=None, batch_size=1 << 14, executor=None,
+                     threads=False):
+    """
+    用同一个 pattern 查找多个文本，返回 (ids, positions) 两个 array('q')：
+    第 k 个匹配位于 texts[ids[k]] 的 positions[k] 处，按文本顺序、文本内按位置排列，
+    与逐个调用 kmp_search_all 的结果一致
+
+    texts 可以是列表或任意可迭代对象（如文件的行迭代器），按 batch_size 个一批读取；
+    只有一批时直接在当前进程扫描，否则分发到进程池（threads 为 True 时用线程池），
+    同时在途的批次不超过 2 × workers，避免一次读入整个迭代器
+    executor 可传入复用的进程池或线程池
+    """
+    nxt = build_next(pattern)
+    texts = iter(texts)
+    first = list(islice(texts, batch_size))
+    if len(first) < batch_size and executor is None:
+        return _scan_batch(first, pattern, nxt, 0)
+
+    workers = workers or os.cpu_count() or 1
+    own = executor is None
+    if own:
+        executor = (ThreadPoolExecutor if threads else ProcessPoolExecutor)(max_workers=workers)
+    try:
+        ids, positions = array("q"), array("q")
+        pending = deque()
+        batch, base = first, 0
+        while batch:
+            pending.append(executor.submit(_scan_batch, batch, pattern, nxt, base))
+            if len(pending) >= 2 * workers:
+                got_ids, got_positions = pending.popleft().result()
+                ids.extend(got_ids)
+                positions.extend(got_positions)
+            base += len(batch)
+            batch = list(islice(texts, batch_size))
+        for future in pending:
+            got_ids, got_positions = future.result()
+            ids.extend(got_ids)
+            positions.extend(got_positions)
+        return ids, positions
+    finally:
+        if own:
+            executor.shutdown()
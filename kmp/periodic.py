@@ -0,0 +1,103 @@
+"""
+周期感知的快速路径
+模式的最小周期 p = m - next[m-1]：相邻两次重叠匹配的间距不可能小于 p。
+一次匹配之后，只要文本继续保持周期 p，每隔 p 个字符就又有一次匹配，
+因此整段匹配可以记为一个等差数列 (start, step, count)，不必逐个 append
+"""
+
+from collections import namedtuple
+from itertools import islice
+
+from kmp import build_next
+
+Run = namedtuple("Run", ["start", "step", "count"])
+
+
+def pattern_period(pattern, nxt=None):
+    """模式的最小周期 m - next[m-1]；模式没有真边界时周期就是 m"""
+    m = len(pattern)
+    if m == 0:
+        return 1
+    if nxt is None:
+        nxt = build_next(pattern)
+    return m - nxt[m - 1]
+
+
+def periodic_extent(text, start, period, stop):
+    """
+    返回最大的 L（start + L <= stop），使 text[start:start+L] 处处满足 text[x] == text[x - period]
+    先按倍增的长度比较切片，找到失配所在区间后再二分，切片比较都在 C 层完成，
+    总比较量 O(L)，解释器只执行 O(log L) 步
+    """
+    limit = stop - start
+    lo, step = 0, period
+    while lo < limit:
+        hi = min(limit, lo + step)
+        if text[start + lo:start + hi] != text[start + lo - period:start + hi - period]:
+            break
+        lo = hi
+        step *= 2
+    else:
+        return limit
+
+    # text[start:start+lo] 已满足周期，失配位于 [lo, hi) 中
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if text[start + lo:start + mid] == text[start + lo - period:start + mid - period]:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+def kmp_search_runs(text, pattern, nxt=None):
+    """
+    查找 text 中所有 pattern 的出现位置，按等差数列返回 [Run(start, step, count), ...]
+    每个 Run 表示位置 start, start+step, ..., start+(count-1)*step 上的匹配，
+    展开后与 kmp_search_all 完全一致；text 需要支持切片比较（str、bytes、list 等）
+
+    每次匹配后用 periodic_extent 一次性求出文本继续保持周期的长度，
+    整段重叠匹配记为一个 Run，并把扫描跳到该段最后一次匹配之后；
+    此时 j 恰好是 next[m-1] = m - p，与逐个匹配时的状态一致。
+    匹配密集的输入上 append 次数从 O(匹配数) 降到 O(段数)
+    """
+    if not pattern:
+        return [Run(0, 1, 1)]
+
+    m = len(pattern)
+    if nxt is None:
+        nxt = build_next(pattern)
+    period = m - nxt[m - 1]
+    n = len(text)
+    runs = []
+    j = 0
+
+    chars = enumerate(text)
+    for i, c in chars:
+        while j > 0 and c != pattern[j]:
+            j = nxt[j - 1]
+
+        if c == pattern[j]:
+            j += 1
+
+        if j == m:
+            extra = periodic_extent(text, i + 1, period, n) // period
+            runs.append(Run(i - m + 1, period, extra + 1))
+            if extra:
+                # 跳过整段匹配：在 C 层消耗迭代器中的 extra * period 个字符
+                skip = extra * period
+                next(islice(chars, skip, skip), None)
+            j = m - period
+
+    return runs
+
+
+def expand_runs(runs):
+    """惰性展开 kmp_search_runs 的结果，按顺序逐个产出匹配位置"""
+    for start, step, count in runs:
+        yield from range(start, start + step * count, step)
+
+
+def runs_count(runs):
+    """不展开即可得到匹配总数"""
+    return sum(run.count for run in runs)
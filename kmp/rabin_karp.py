@@ -0,0 +1,104 @@
+"""
+Rabin–Karp 多模式匹配（等长模式）
+用 NumPy 一次性算出文本中所有长度为 k 的窗口的多项式哈希（模 2^64，利用 uint64 自然溢出），
+与模式指纹集合做向量化查找，命中的位置再用子串精确确认，哈希碰撞不会产生错误结果
+"""
+
+import numpy as np
+
+BASE = 1000003
+MASK = (1 << 64) - 1
+
+
+def fingerprint(pattern):
+    """模式的多项式哈希：sum(code[t] * BASE^(k-1-t)) mod 2^64，code 为码点或字节值"""
+    h = 0
+    for c in pattern:
+        h = (h * BASE + (ord(c) if isinstance(c, str) else c)) & MASK
+    return h
+
+
+def text_codes(text):
+    """把文本转换成码点数组：纯 ASCII 的 str 与 bytes 类数据用 uint8，其余 str 用 UTF-32"""
+    if isinstance(text, str):
+        if text.isascii():
+            return np.frombuffer(text.encode("ascii"), dtype=np.uint8)
+        return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    return np.frombuffer(text, dtype=np.uint8)
+
+
+def window_hashes(codes, k):
+    """
+    返回 hashes[i] = fingerprint(text[i:i+k])，i = 0..n-k
+    按倍增拼接：长度为 a 与 b 的相邻窗口满足 h(xy) = h(x) * BASE^b + h(y)，
+    先得到长度 1, 2, 4, ... 的窗口哈希，再按 k 的二进制位拼接，只需 O(log k) 次整段向量运算
+    """
+    n = len(codes)
+    if k > n:
+        return np.empty(0, dtype=np.uint64)
+
+    cur = codes.astype(np.uint64)  # 长度为 width 的窗口哈希，共 n - width + 1 个
+    width, power = 1, BASE
+    result, length = None, 0       # 已拼好的长度为 length 的窗口哈希
+    remaining = k
+    while True:
+        if remaining & 1:
+            if result is None:
+                result, length = cur, width
+            else:
+                count = n - length - width + 1
+                result = result[:count] * np.uint64(power) + cur[length:length + count]
+                length += width
+        remaining >>= 1
+        if not remaining:
+            return result
+        cur = cur[:-width] * np.uint64(power) + cur[width:]
+        width *= 2
+        power = power * power & MASK
+
+
+class RabinKarp:
+    """
+    等长多模式的 Rabin–Karp 匹配器：模式指纹只计算一次，可以在多个文本上反复搜索
+    结果格式与 AhoCorasick.search 相同：[(pattern_id, 起始位置), ...]，
+    按起始位置排序，同一位置上按 pattern_id 排序
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        lengths = {len(p) for p in self.patterns}
+        if len(lengths) > 1:
+            raise ValueError("RabinKarp 要求所有模式等长，不等长的模式请使用 AhoCorasick")
+        self.k = lengths.pop() if lengths else 0
+
+        self.ids = {}  # 模式 -> 该模式的所有编号（允许重复模式）
+        for pid, pattern in enumerate(self.patterns):
+            self.ids.setdefault(pattern, []).append(pid)
+        self.fingerprints = np.array(sorted({fingerprint(p) for p in self.ids}), dtype=np.uint64)
+
+    def search(self, text):
+        """在 text 中查找所有模式，返回 [(pattern_id, 起始位置), ...]"""
+        if not self.patterns:
+            return []
+        k, ids = self.k, self.ids
+        if k == 0:
+            return [(pid, 0) for pid in ids[self.patterns[0]]]
+
+        hashes = window_hashes(text_codes(text), k)
+        candidates = np.flatnonzero(np.isin(hashes, self.fingerprints))
+
+        # 精确确认：子串作为字典键查找，哈希碰撞的候选自然落空
+        matches = []
+        for i in candidates.tolist():
+            found = ids.get(text[i:i + k])
+            if found is not None:
+                matches.extend((pid, i) for pid in found)
+        return matches
+
+
+def rabin_karp_search(text, patterns):
+    """
+    一次向量化哈希扫描查找 text 中所有等长 patterns 的出现位置
+    返回 [(pattern_id, 起始位置), ...]，pattern_id 为模式在 patterns 中的下标
+    """
+    return RabinKarp(patterns).search(text)
@@ -153,6 +153,516 @@ EOF
 
 RANDOM_EXIT=$?
 
+echo ""
+echo "运行扩展接口测试..."
+echo ""
+
+# 扩展接口与 kmp_search_all 的结果逐一对比
+python3 << 'EOF'
+import asyncio
+import io
+import mmap
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import numpy as np
+import adaptive
+import kmp
+import vectorized
+from kmp import (kmp_search_all, KMPMatcher, kmp_search_stream,
+                 kmp_search_bytes, kmp_search_mmap, kmp_search_dfa,
+                 kmp_finditer, kmp_count, kmp_find_first, kmp_search_async,
+                 kmp_replace_stream, kmp_replace_file, build_next, KMPPattern, OpStats)
+from aho_corasick import AhoCorasick, aho_corasick_search
+from parallel import kmp_search_parallel, kmp_search_mmap_parallel, kmp_search_batch
+from adaptive import adaptive_search_all, find_search_all, horspool_search_all
+from boyer_moore import boyer_moore_search_all
+from shift_or import shift_or_search_all
+from suffix_array import SuffixIndex
+from vectorized import vectorized_search_all
+from periodic import kmp_search_runs, expand_runs, runs_count
+from rabin_karp import RabinKarp, rabin_karp_search
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+random.seed(2025)
+total = 0
+passed = 0
+
+def check(name, got, expected):
+    """记录一次对比结果"""
+    global total, passed
+    total += 1
+    if got == expected:
+        passed += 1
+    else:
+        print(f"✗ FAIL: {name}")
+        print(f"  Expected: {expected}")
+        print(f"  Got:      {got}")
+
+def random_case(text_len, pattern_len, alphabet='AB'):
+    """生成小字母表上的随机文本和模式（匹配密集，便于覆盖回退路径）"""
+    text = ''.join(random.choices(alphabet, k=text_len))
+    pattern = ''.join(random.choices(alphabet, k=pattern_len))
+    return text, pattern
+
+def split_randomly(text, max_chunk):
+    """把文本切成随机长度的块（可能包含空块）"""
+    chunks = []
+    i = 0
+    while i < len(text):
+        k = random.randint(0, max_chunk)
+        chunks.append(text[i:i + k])
+        i += k
+    return chunks
+
+# 流式匹配：随机分块后结果应与整体匹配一致
+for _ in range(200):
+    text, pattern = random_case(random.randint(0, 300), random.randint(1, 6))
+    expected = kmp_search_all(text, pattern)
+    chunks = split_randomly(text, 7)
+    check("流式匹配", list(kmp_search_stream(chunks, pattern)), expected)
+
+    matcher = KMPMatcher(pattern)
+    got = []
+    for chunk in chunks:
+        got.extend(matcher.feed(chunk))
+    check("KMPMatcher.feed", got, expected)
+
+check("流式空模式", list(kmp_search_stream(['AB', 'C'], '')), [0])
+
+# 惰性迭代 / 计数 / 首个匹配 / 限制匹配数
+for _ in range(200):
+    text, pattern = random_case(random.randint(0, 300), random.randint(0, 5))
+    expected = kmp_search_all(text, pattern)
+    k = random.randint(0, 5)
+    check("kmp_finditer", list(kmp_finditer(text, pattern)), expected)
+    check("kmp_count", [kmp_count(text, pattern)], [len(expected)])
+    check("kmp_find_first", [kmp_find_first(text, pattern)], [text.find(pattern)])
+    check("max_matches", kmp_search_all(text, pattern, max_matches=k), expected[:k])
+
+# 自适应引擎：各种序列类型、强制退化（全 'A'）时结果都与 kmp_search_all 一致
+for _ in range(200):
+    alphabet = random.choice(['AB', 'ABCDEFGH'])
+    text, pattern = random_case(random.randint(0, 3000), random.randint(0, 8), alphabet)
+    if random.random() < 0.3:
+        text, pattern = 'A' * random.randint(0, 3000), 'A' * random.randint(1, 50)
+    expected = kmp_search_all(text, pattern)
+    check("find 引擎", find_search_all(text, pattern), expected)
+    check("Horspool 引擎", horspool_search_all(list(text), list(pattern)), expected)
+    for seq, pat in [(text, pattern), (text.encode(), pattern.encode()),
+                     (list(text), list(pattern)), (memoryview(text.encode()), pattern.encode())]:
+        check(f"自适应引擎({type(seq).__name__})", adaptive_search_all(seq, pat), expected)
+
+# 自适应引擎的选择规则：支持 find 的类型选 find；模拟旧版 Python（find 非线性）时，长的低熵模式改用 KMP
+check("引擎选择(长低熵模式)", adaptive.choose_engine('A' * 1000, 'A' * 50 + 'B' + 'A' * 50)[0], 'find')
+check("引擎选择(token 列表)", adaptive.choose_engine(list('ABCDEFGH' * 10), list('ABCDE'))[0], 'horspool')
+adaptive.FIND_IS_LINEAR = False
+try:
+    for text, pattern, engine in [('A' * 1000, 'A' * 50 + 'B' + 'A' * 50, 'kmp'),
+                                  (b'A' * 1000, b'A' * 50 + b'B' + b'A' * 50, 'kmp'),
+                                  ('ABCDEFGH' * 100, 'ABCDEFGH' * 13, 'find'),
+                                  ('A' * 1000, 'A' * 10 + 'B', 'find')]:
+        report = {}
+        got = adaptive_search_all(text, pattern, report)
+        check(f"引擎选择(旧版 find, m={len(pattern)})", report['engine'], engine)
+        check("引擎选择(旧版 find)结果", got, kmp_search_all(text, pattern))
+finally:
+    adaptive.FIND_IS_LINEAR = True
+
+# Boyer–Moore：包括周期性模式（好后缀表的边界链分支）
+for _ in range(300):
+    text, pattern = random_case(random.randint(0, 300), random.randint(0, 10),
+                                random.choice(['AB', 'ABC', 'ABCDEFGH']))
+    check("Boyer–Moore", boyer_moore_search_all(text, pattern), kmp_search_all(text, pattern))
+for period in ['A', 'AB', 'ABA', 'AAB']:
+    pattern = period * 5
+    text = period * 40
+    check("Boyer–Moore 周期模式", boyer_moore_search_all(text, pattern),
+          kmp_search_all(text, pattern))
+
+# Shift-Or：单字（m <= 64）与多字（m > 64）两种情况
+for _ in range(200):
+    text, pattern = random_case(random.randint(0, 400), random.choice([3, 20, 64, 65, 150]))
+    if random.random() < 0.3:
+        text = pattern * 3 + text
+    expected = kmp_search_all(text, pattern)
+    check("Shift-Or", shift_or_search_all(text, pattern), expected)
+    check("Shift-Or(bytes)", shift_or_search_all(text.encode(), pattern.encode()), expected)
+
+# 后缀数组索引：同一索引上多次查询，内存中与 mmap 加载后的结果都应与 kmp_search_all 一致
+with tempfile.TemporaryDirectory() as tmp:
+    for _ in range(60):
+        text, _ = random_case(random.randint(0, 300), 0, random.choice(['AB', 'ACGT', 'AB中文']))
+        data = text.encode()
+        indexes = [(SuffixIndex(text), text), (SuffixIndex(data), data)]
+        for k, (index, source) in enumerate(indexes[:]):
+            path = os.path.join(tmp, f'index{k}.sa')
+            index.save(path)
+            indexes.append((SuffixIndex.load(path), source))
+        for _ in range(5):
+            start = random.randint(0, len(text))
+            pattern = text[start:start + random.randint(0, 6)]
+            if random.random() < 0.3:
+                pattern = random_case(0, random.randint(1, 6), 'ABC')[1]
+            for index, source in indexes:
+                pat = pattern if isinstance(source, str) else pattern.encode()
+                expected = kmp_search_all(source, pat)
+                check("后缀数组索引", index.search_all(pat), expected)
+                check("后缀数组计数", index.count(pat), kmp_count(source, pat))
+        for index, _ in indexes:
+            index.close()
+
+# NumPy 向量化过滤：ASCII / 非 ASCII str、bytes，以及触发 KMP 回退的匹配密集情况
+for _ in range(200):
+    alphabet = random.choice(['AB', 'ACGT', 'AB中文', 'abcdefghijklmnopqrstuvwxyz'])
+    text, pattern = random_case(random.randint(0, 300), random.randint(1, 8), alphabet)
+    if random.random() < 0.2:
+        text, pattern = 'A' * len(text), 'A' * len(pattern)
+    check("向量化过滤", vectorized_search_all(text, pattern), kmp_search_all(text, pattern))
+    data, pat = text.encode(), pattern.encode()
+    check("向量化过滤(bytes)", vectorized_search_all(data, pat), kmp_search_all(data, pat))
+
+# 向量化过滤的其他输入：mmap 必须走向量化路径（临时禁用 KMP 回退），NumPy 数组上的 str / bytes 模式
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, 'vectorized.bin')
+    fallback = vectorized.kmp_search_all
+    def no_fallback(*args):
+        raise AssertionError("mmap 输入回退到了 kmp_search_all")
+    for _ in range(30):
+        text, pattern = random_case(random.randint(1, 300), random.randint(1, 4),
+                                    'abcdefghijklmnopqrstuvwxyz')
+        with open(path, 'wb') as fp:
+            fp.write(text.encode())
+        with open(path, 'rb') as fp, mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            vectorized.kmp_search_all = no_fallback
+            try:
+                got = vectorized_search_all(mm, pattern.encode())
+            except AssertionError:
+                got = None
+            finally:
+                vectorized.kmp_search_all = fallback
+            check("向量化过滤(mmap)", got, kmp_search_all(text, pattern))
+for _ in range(50):
+    text, pattern = random_case(random.randint(0, 200), random.randint(1, 5), random.choice(['ACGT', 'AB中文']))
+    expected = kmp_search_all(text, pattern)
+    codes = np.array([ord(c) for c in text], dtype=np.uint32)
+    check("向量化过滤(uint32 数组 + str)", vectorized_search_all(codes, pattern), expected)
+    if text.isascii():
+        data = np.frombuffer(text.encode(), dtype=np.uint8)
+        check("向量化过滤(uint8 数组 + str)", vectorized_search_all(data, pattern), expected)
+        check("向量化过滤(uint8 数组 + bytes)", vectorized_search_all(data, pattern.encode()), expected)
+check("向量化过滤(uint8 数组 + 非 ASCII str)",
+      vectorized_search_all(np.frombuffer(b'abc', dtype=np.uint8), '中'), [])
+# 高密度候选回退到 KMP：数组文本 + str 模式也必须得到完整结果
+for n, m in ((5000, 100), (3000, 37)):
+    expected = list(range(n - m + 1))
+    check("向量化过滤(稠密 uint8 数组 + str)",
+          vectorized_search_all(np.frombuffer(b'A' * n, dtype=np.uint8), 'A' * m), expected)
+    check("向量化过滤(稠密 uint32 数组 + str)",
+          vectorized_search_all(np.full(n, ord('A'), dtype=np.uint32), 'A' * m), expected)
+
+# 批量接口：逐个文本调用 kmp_search_all 的结果展开为 (文本编号, 位置)，含空文本、空模式与 token 列表
+with ThreadPoolExecutor(max_workers=2) as threads, ProcessPoolExecutor(max_workers=2) as pool:
+    for _ in range(60):
+        pattern = random_case(0, random.randint(0, 4))[1]
+        texts = [random_case(random.randint(0, 30), 0)[0] for _ in range(random.randint(0, 40))]
+        if random.random() < 0.2:
+            texts = [list(t) for t in texts]
+        expected = [(k, pos) for k, t in enumerate(texts) for pos in kmp_search_all(t, pattern)]
+        for name, kwargs in [("批量接口", {}),
+                             ("批量接口(线程池)", {'batch_size': 7, 'executor': threads}),
+                             ("批量接口(进程池)", {'batch_size': 5, 'executor': pool})]:
+            ids, positions = kmp_search_batch(iter(texts), pattern, **kwargs)
+            check(name, list(zip(ids, positions)), expected)
+
+# 异步流式匹配：异步迭代器（str 块）与 asyncio.StreamReader（bytes，块大小随机）
+async def collect_async(chunks, pattern, chunk_size):
+    async def agen():
+        for chunk in chunks:
+            await asyncio.sleep(0)
+            yield chunk
+
+    reader = asyncio.StreamReader()
+    data = ''.join(chunks).encode()
+    for k in range(0, len(data), 5):
+        reader.feed_data(data[k:k + 5])
+    reader.feed_eof()
+    from_iter = [pos async for pos in kmp_search_async(agen(), pattern)]
+    from_reader = [pos async for pos in kmp_search_async(reader, pattern.encode(), chunk_size)]
+    return from_iter, from_reader
+
+for _ in range(100):
+    text, pattern = random_case(random.randint(0, 300), random.randint(0, 6))
+    expected = kmp_search_all(text, pattern)
+    from_iter, from_reader = asyncio.run(
+        collect_async(split_randomly(text, 9), pattern, random.randint(1, 16)))
+    check("异步流式(迭代器)", from_iter, expected)
+    check("异步流式(StreamReader)", from_reader, expected)
+
+# 流式替换：结果与 str.replace 一致，每次写入不超过 buffer_size，含 count 限制、bytes 与文件接口
+class ChunkSink:
+    """记录每次 write 的可写流"""
+    def __init__(self):
+        self.parts = []
+
+    def write(self, piece):
+        self.parts.append(piece)
+
+with tempfile.TemporaryDirectory() as tmp:
+    for _ in range(200):
+        text, pattern = random_case(random.randint(0, 200), random.randint(1, 4))
+        replacement = random_case(0, random.randint(0, 5), 'ABxy')[1]
+        count = random.choice([-1, -1, 0, 1, 3])
+        expected = text.replace(pattern, replacement, count)
+        buffer_size = random.randint(1, 16)
+
+        sink = ChunkSink()
+        replaced = kmp_replace_stream(split_randomly(text, 9), pattern, replacement, sink,
+                                      count=count, buffer_size=buffer_size)
+        check("流式替换", ''.join(sink.parts), expected)
+        check("流式替换写入大小", all(0 < len(p) <= buffer_size for p in sink.parts), True)
+        check("流式替换次数", replaced, text.count(pattern) if count < 0 else min(count, text.count(pattern)))
+
+        src, dst = os.path.join(tmp, 'src.bin'), os.path.join(tmp, 'dst.bin')
+        with open(src, 'wb') as fp:
+            fp.write(text.encode())
+        kmp_replace_file(src, dst, pattern.encode(), replacement.encode(), count=count,
+                         chunk_size=random.randint(1, 16), encoding=None)
+        with open(dst, 'rb') as fp:
+            check("流式替换(文件)", fp.read(), expected.encode())
+
+# 命令行：偏移、计数、多文件前缀、字节模式、模式文件、标准输入、-j 并行与退出码
+# 进程内重复调用 main 读取标准输入：每次都得到完整结果，标准输入的文件描述符保持可用
+with tempfile.TemporaryFile() as fp:
+    fp.write('ABxAB中AB'.encode())
+    fp.flush()
+    saved_stdin, saved_stdout = sys.stdin, sys.stdout
+    try:
+        sys.stdin = open(fp.fileno(), 'r', closefd=False)
+        outputs = []
+        for _ in range(2):
+            os.lseek(fp.fileno(), 0, os.SEEK_SET)
+            sys.stdout = io.StringIO()
+            status = kmp.main(['AB'])
+            outputs.append((status, sys.stdout.getvalue()))
+        sys.stdin.close()
+    finally:
+        sys.stdin, sys.stdout = saved_stdin, saved_stdout
+    check("命令行进程内重复调用", outputs, [(0, '0\n3\n6\n')] * 2)
+
+def run_cli(*args, stdin=b''):
+    proc = subprocess.run([sys.executable, 'kmp.py', *args], input=stdin, capture_output=True)
+    return proc.returncode, proc.stdout.decode()
+
+with tempfile.TemporaryDirectory() as tmp:
+    paths, texts = [], []
+    pattern = random_case(0, 3)[1]
+    for k in range(3):
+        text, _ = random_case(random.randint(0, 60), 0, 'AB中')
+        path = os.path.join(tmp, f'in{k}.txt')
+        with open(path, 'w', encoding='utf-8', newline='') as fp:
+            fp.write(text)
+        paths.append(path)
+        texts.append(text)
+    pattern_file = os.path.join(tmp, 'pattern.txt')
+    with open(pattern_file, 'w', encoding='utf-8') as fp:
+        fp.write(pattern + '\n')
+
+    found = [kmp_search_all(t, pattern) for t in texts]
+    status = 0 if any(found) else 1
+    check("命令行偏移", run_cli(pattern, paths[0]),
+          (0 if found[0] else 1, ''.join(f'{p}\n' for p in found[0])))
+    lines = ''.join(f'{path}:{p}\n' for path, f in zip(paths, found) for p in f)
+    check("命令行多文件", run_cli(pattern, *paths), (status, lines))
+    check("命令行 -j", run_cli('-j', '2', pattern, *paths), (status, lines))
+    check("命令行模式文件", run_cli('-f', pattern_file, *paths), (status, lines))
+    check("命令行计数", run_cli('-c', pattern, *paths),
+          (status, ''.join(f'{path}:{len(f)}\n' for path, f in zip(paths, found))))
+    check("命令行仅偏移", run_cli('-o', pattern, *paths),
+          (status, ''.join(f'{p}\n' for f in found for p in f)))
+    data = texts[0].encode()
+    expected = kmp_search_all(data, pattern.encode())
+    check("命令行字节模式(标准输入)", run_cli('-b', pattern, stdin=data),
+          (0 if expected else 1, ''.join(f'{p}\n' for p in expected)))
+    check("命令行文件不存在", run_cli(pattern, os.path.join(tmp, 'missing'))[0], 2)
+
+# 紧凑前缀表：各类型码的 array 与 list 取值一致，且可直接交给各引擎使用
+for _ in range(100):
+    text, pattern = random_case(random.randint(0, 300), random.randint(0, 40))
+    expected_next = build_next(pattern)
+    for typecode in ('h', 'i', 'q', 'auto'):
+        check("紧凑前缀表", list(build_next(pattern, typecode)), expected_next)
+    nxt = build_next(pattern, 'auto')
+    expected = kmp_search_all(text, pattern)
+    check("紧凑前缀表搜索", kmp_search_all(text, pattern, nxt), expected)
+    check("紧凑前缀表计数", kmp_count(text, pattern, nxt), len(expected))
+    check("紧凑前缀表 KMPPattern", KMPPattern(pattern, 'auto').search_all(text), expected)
+
+# 操作计数：插桩版本结果与原循环一致，计数满足线性上界（不依赖计时，可用于 CI）
+for _ in range(200):
+    text, pattern = random_case(random.randint(0, 300), random.randint(1, 8), random.choice(['A', 'AB', 'ABC']))
+    stats = OpStats()
+    got = kmp_search_all(text, pattern, stats=stats)
+    check("操作计数结果", got, kmp_search_all(text, pattern))
+    check("操作计数前缀表", build_next(pattern, stats=OpStats()), build_next(pattern))
+    n, m = len(text), len(pattern)
+    check("操作计数上界", (stats.matches == len(got),
+                          stats.comparisons <= 3 * n, stats.fallbacks <= n,
+                          stats.build.comparisons <= 3 * m, stats.build.fallbacks <= m,
+                          stats.max_chain <= stats.fallbacks), (True,) * 6)
+
+stats = OpStats()
+kmp_search_all('A' * 20 + 'B', 'AAAAB', stats=stats)
+check("操作计数示例", (stats.comparisons, stats.fallbacks, stats.max_chain, stats.matches,
+                       stats.build.comparisons, stats.build.fallbacks, stats.build.max_chain),
+      (57, 16, 1, 1, 9, 3, 3))
+
+# 周期快速路径：由周期块拼接出的文本上展开的等差数列与 kmp_search_all 一致，且段数不多于匹配数
+for _ in range(300):
+    block = random_case(0, random.randint(1, 4), random.choice(['A', 'AB', 'ABC']))[1]
+    noise = [random_case(0, 3, 'ABC')[1] for _ in range(3)]
+    text = ''.join(random.choice([block] * 4 + noise) for _ in range(random.randint(0, 40)))
+    if random.random() < 0.7:
+        pattern = (block * 5)[:random.randint(1, 10)]
+    else:
+        pattern = random_case(0, random.randint(0, 5), 'ABC')[1]
+    expected = kmp_search_all(text, pattern)
+    runs = kmp_search_runs(text, pattern)
+    check("周期快速路径", list(expand_runs(runs)), expected)
+    check("周期快速路径计数", (runs_count(runs), len(runs) <= len(expected)), (len(expected), True))
+    check("周期快速路径(bytes)", list(expand_runs(kmp_search_runs(text.encode(), pattern.encode()))),
+          expected)
+
+# Rabin–Karp 等长多模式：结果与逐模式 kmp_search_all 一致，顺序与 Aho–Corasick 相同
+for _ in range(300):
+    alphabet = random.choice(['AB', 'ACGT', 'AB中'])
+    k = random.randint(0, 6)
+    text = random_case(random.randint(0, 100), 0, alphabet)[0]
+    patterns = [random_case(0, k, alphabet)[1] for _ in range(random.randint(0, 8))]
+    if k <= len(text):
+        start = random.randint(0, len(text) - k)
+        patterns.append(text[start:start + k])  # 保证有命中，也可能与已有模式重复
+    expected = sorted((pid, pos) for pid, p in enumerate(patterns) for pos in kmp_search_all(text, p))
+    got = rabin_karp_search(text, patterns)
+    check("Rabin–Karp", sorted(got), expected)
+    if k:
+        check("Rabin–Karp 顺序", got, aho_corasick_search(text, patterns))
+    if alphabet != 'AB中':
+        check("Rabin–Karp(bytes)", sorted(RabinKarp([p.encode() for p in patterns]).search(text.encode())),
+              expected)
+try:
+    RabinKarp(['AB', 'ABC'])
+    raised = False
+except ValueError:
+    raised = True
+check("Rabin–Karp 不等长模式", raised, True)
+
+# 二进制模式：bytes / bytearray / memoryview / mmap 结果应与 str 一致
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, 'data.bin')
+    for _ in range(50):
+        text, pattern = random_case(random.randint(0, 300), random.randint(1, 6))
+        expected = kmp_search_all(text, pattern)
+        data, pat = text.encode(), pattern.encode()
+        check("bytes 模式", kmp_search_bytes(data, pat), expected)
+        check("bytearray 模式", kmp_search_bytes(bytearray(data), pat), expected)
+        check("memoryview 模式", kmp_search_bytes(memoryview(data), pat), expected)
+        with open(path, 'wb') as fp:
+            fp.write(data)
+        check("mmap 模式", kmp_search_mmap(path, pat), expected)
+
+# KMP 自动机：str 与 bytes 两种输入
+for _ in range(200):
+    text, pattern = random_case(random.randint(0, 300), random.randint(1, 6), 'ABC')
+    expected = kmp_search_all(text, pattern)
+    check("KMP 自动机", kmp_search_dfa(text, pattern), expected)
+    check("KMP 自动机(bytes)", kmp_search_dfa(text.encode(), pattern.encode()), expected)
+
+# KMP 自动机扫描 mmap 后不能残留缓冲区导出，否则 mm.close() 会抛出 BufferError
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, 'dfa.bin')
+    with open(path, 'wb') as fp:
+        fp.write(b'ABCABDABCAB')
+    with open(path, 'rb') as fp:
+        mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        got = kmp_search_dfa(mm, b'AB')
+        try:
+            mm.close()
+            closed = True
+        except BufferError:
+            closed = False
+    check("KMP 自动机(mmap)", got, [0, 3, 6, 9])
+    check("KMP 自动机(mmap 可关闭)", closed, True)
+
+# Aho–Corasick：与逐个模式调用 kmp_search_all 的结果集合一致（含重复模式与空模式）
+for _ in range(200):
+    text, _ = random_case(random.randint(0, 200), 0)
+    patterns = [random_case(0, random.randint(0, 5))[1] for _ in range(random.randint(1, 8))]
+    expected = sorted((pid, pos) for pid, p in enumerate(patterns)
+                      for pos in kmp_search_all(text, p))
+    check("Aho–Corasick", sorted(aho_corasick_search(text, patterns)), expected)
+
+    ac = AhoCorasick(patterns)
+    got = []
+    for chunk in split_randomly(text, 7) or [text]:  # 空文本也至少喂入一块
+        got.extend(ac.feed(chunk))
+    check("Aho–Corasick 流式", sorted(got), expected)
+
+# 编译缓存：结果与 kmp_search_all 一致，命中/未命中计数与 LRU 淘汰正确
+kmp.purge()
+kmp.set_cache_size(2)
+for _ in range(100):
+    text, pattern = random_case(random.randint(0, 200), random.randint(1, 6))
+    check("compile().search_all", kmp.compile(pattern).search_all(text),
+          kmp_search_all(text, pattern))
+kmp.purge()
+a = kmp.compile('AB')
+check("缓存命中返回同一对象", [kmp.compile('AB') is a], [True])
+kmp.compile('BA')
+kmp.compile('AB')   # 'AB' 变为最近使用
+kmp.compile('AA')   # 淘汰最久未使用的 'BA'
+check("LRU 淘汰", [kmp.compile('AB') is a, len(kmp._pattern_cache.entries)], [True, 2])
+check("缓存统计", list(kmp.cache_info()), [3, 3, 2, 2])
+kmp.set_cache_size(256)
+kmp.purge()
+
+# 多进程并行：调小 min_segment 强制分段，结果必须与单进程完全一致
+with ProcessPoolExecutor(max_workers=4) as pool, tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, 'data.bin')
+    for _ in range(30):
+        text, pattern = random_case(random.randint(0, 400), random.randint(1, 6), 'AB中')
+        expected = kmp_search_all(text, pattern)
+        check("并行搜索", kmp_search_parallel(text, pattern, workers=4, min_segment=5,
+                                          executor=pool), expected)
+        data, pat = text.encode(), pattern.encode()
+        with open(path, 'wb') as fp:
+            fp.write(data)
+        check("并行 mmap 搜索", kmp_search_mmap_parallel(path, pat, workers=3, min_segment=5,
+                                                     executor=pool), kmp_search_bytes(data, pat))
+        expected = kmp_search_bytes(data, pat)
+        check("并行搜索(bytes)", kmp_search_parallel(data, pat, workers=4, min_segment=5,
+                                                 executor=pool), expected)
+        check("并行搜索(bytearray)", kmp_search_parallel(bytearray(data), pat, workers=3,
+                                                     min_segment=5, executor=pool), expected)
+        if data:
+            with open(path, 'rb') as fp, mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                check("并行搜索(mmap)", kmp_search_parallel(mm, pat, workers=3, min_segment=5,
+                                                        executor=pool), expected)
+    try:
+        kmp_search_parallel(list('ABAB'), 'AB')
+    except TypeError:
+        check("并行搜索拒绝 token 列表", True, True)
+    else:
+        check("并行搜索拒绝 token 列表", False, True)
+
+print(f"扩展接口测试统计: {passed}/{total} 通过")
+exit(0 if passed == total else 1)
+EOF
+
+EXT_EXIT=$?
+
 echo ""
 echo "==================================="
 echo "测试结果汇总"
@@ -165,8 +675,14 @@ else
     echo -e "随机测试: ${RED}存在失败${NC}"
 fi
 
+if [ $EXT_EXIT -eq 0 ]; then
+    echo -e "扩展接口测试: ${GREEN}全部通过${NC}"
+else
+    echo -e "扩展接口测试: ${RED}存在失败${NC}"
+fi
+
 echo ""
-if [ $FAILED_TESTS -eq 0 ] && [ $RANDOM_EXIT -eq 0 ]; then
+if [ $FAILED_TESTS -eq 0 ] && [ $RANDOM_EXIT -eq 0 ] && [ $EXT_EXIT -eq 0 ]; then
     echo -e "${GREEN}所有测试通过！${NC}"
     exit 0
 else
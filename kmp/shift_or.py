@@ -0,0 +1,39 @@
+def build_masks(pattern):
+    """
+    构建位并行匹配的字符掩码：masks[c] 的第 i 位为 1 当且仅当 pattern[i] == c
+    （即 Shift-Or 掩码按位取反；未在 pattern 中出现的字符掩码为 0）
+    """
+    masks = {}
+    for i, c in enumerate(pattern):
+        masks[c] = masks.get(c, 0) | (1 << i)
+    return masks
+
+
+def shift_or_search_all(text, pattern, masks=None):
+    """
+    Shift-Or（Bitap）算法查找 text 中所有 pattern 的出现位置，接口与 kmp_search_all 相同
+    每个文本字符只做移位、或、与三次整数运算，没有依赖数据的回退循环
+
+    采用 Shift-Or 的取反形式（Shift-And）：状态 D 的第 i 位为 1 表示 pattern[0:i+1]
+    与以当前字符结尾的文本相匹配。与 Shift-Or 等价，但状态只保留仍然存活的前缀，
+    在 CPython 中整数更小、也不需要每步再与全 1 掩码相与
+
+    状态是 Python 的任意精度整数（CPython 按 30 位一个 digit 存储），任意长度的模式
+    都走同一段代码，没有单独的单字 / 多字实现；模式越长，每步整数运算的开销越大
+    masks 可传入 build_masks(pattern) 的结果以复用
+    """
+    if not pattern:
+        return [0]
+
+    m = len(pattern)
+    get = (masks or build_masks(pattern)).get
+    high = 1 << (m - 1)
+    positions = []
+    state = 0
+
+    for i, c in enumerate(text):
+        state = ((state << 1) | 1) & get(c, 0)
+        if state & high:
+            positions.append(i - m + 1)
+
+    return positions
@@ -0,0 +1,259 @@
+"""
+后缀数组 + LCP 文本索引
+对同一份静态文本反复查询大量不同模式时，一次构建索引（O(n log n)），
+之后每次查询只需 O(m log n + occ)，不再对 n 个字符重新扫描
+索引可保存到磁盘，之后通过 mmap 直接加载，文本、后缀数组和 LCP 数组都不会被读入内存
+"""
+
+import mmap
+import struct
+from array import array
+
+MAGIC = b"KSA1"
+HEADER = struct.Struct("<4sBxxxQ")  # 魔数、文本类型（0 为 bytes，1 为 str）、文本长度 n
+KIND_BYTES, KIND_STR = 0, 1
+INITIAL_PREFIX = 8  # 构建时第一轮比较的前缀长度
+
+
+def build_suffix_array(text):
+    """
+    倍增法构建后缀数组：sa[i] 为字典序第 i 小的后缀的起始位置
+    第 k 轮按 (前 k 个字符的名次, 后 k 个字符的名次) 排序，用计数排序代替比较排序，
+    每轮 O(n)，最多 log n 轮；所有名次互不相同时提前结束
+    （长度 k 的后缀前缀在文本末尾会变短，较短者字典序更小，与名次 -1 的约定一致）
+    """
+    n = len(text)
+    if n == 0:
+        return array("i")
+
+    # 第一轮直接按前 INITIAL_PREFIX 个字符分组（切片比较在 C 层完成），省去前几轮倍增
+    k = INITIAL_PREFIX
+    grams = [text[i:i + k] for i in range(n)]
+    code = {g: r for r, g in enumerate(sorted(set(grams)))}
+    rank = [code[g] for g in grams]
+    del grams
+    sa = sorted(range(n), key=rank.__getitem__)
+    classes = len(code)
+
+    while classes < n:
+        # 按第二关键字排好的顺序：后半段为空的后缀最小，其余沿用上一轮的 sa
+        second = list(range(n - k, n))
+        second.extend(p - k for p in sa if p >= k)
+
+        # 按第一关键字稳定地计数排序
+        start = [0] * (classes + 1)
+        for r in rank:
+            start[r + 1] += 1
+        for r in range(classes):
+            start[r + 1] += start[r]
+        for p in second:
+            r = rank[p]
+            sa[start[r]] = p
+            start[r] += 1
+
+        # 重新分配名次：两个关键字都相同的后缀名次相同
+        new_rank = [0] * n
+        keys = list(zip(rank, rank[k:] + [-1] * k))
+        classes = 1
+        prev = keys[sa[0]]
+        for p in sa[1:]:
+            key = keys[p]
+            if key != prev:
+                classes += 1
+            new_rank[p] = classes - 1
+            prev = key
+        rank = new_rank
+        k *= 2
+
+    return array("i", sa)
+
+
+def build_lcp(text, sa):
+    """
+    Kasai 算法构建 LCP 数组：lcp[i] 为后缀 sa[i-1] 与 sa[i] 的最长公共前缀长度，lcp[0] = 0
+    按文本位置顺序计算，相邻两次的公共前缀最多减少 1，总时间 O(n)
+    """
+    n = len(sa)
+    lcp = array("i", bytes(4 * n))
+    rank = [0] * n
+    for i, p in enumerate(sa):
+        rank[p] = i
+
+    h = 0
+    for p in range(n):
+        r = rank[p]
+        if r == 0:
+            h = 0
+            continue
+        q = sa[r - 1]
+        while p + h < n and q + h < n and text[p + h] == text[q + h]:
+            h += 1
+        lcp[r] = h
+        if h:
+            h -= 1
+    return lcp
+
+
+class SuffixIndex:
+    """
+    静态文本的后缀数组索引
+    模式 P 的所有出现恰好对应 sa 中连续的一段：以 P 为前缀的后缀在字典序中相邻，
+    两次二分查找确定这一段即可计数；列出位置时只需一次二分，之后沿 LCP 数组向后扩展
+    """
+
+    def __init__(self, text):
+        if isinstance(text, str):
+            self.kind = KIND_STR
+        else:
+            text = bytes(text)
+            self.kind = KIND_BYTES
+        self.text = text
+        self.sa = build_suffix_array(text)
+        self.lcp = build_lcp(text, self.sa)
+        # 查询时比较 buf[base + width*p : ...] 与编码后的模式，切片不超过文本末尾 stop；
+        # 内存中的文本直接切片
+        self._buf, self._base, self._width, self._stop = text, 0, 1, len(text)
+        self._mm = None
+
+    def __len__(self):
+        return len(self.sa)
+
+    def __repr__(self):
+        kind = "str" if self.kind == KIND_STR else "bytes"
+        return f"SuffixIndex(n={len(self)}, kind={kind}, mapped={self._mm is not None})"
+
+    def _key(self, pattern):
+        """把模式转换成与 buf 切片可直接比较的形式"""
+        if self.kind == KIND_STR:
+            if not isinstance(pattern, str):
+                raise TypeError("该索引建立在 str 文本上，pattern 也必须是 str")
+            return pattern if self._width == 1 else pattern.encode("utf-32-be")
+        if isinstance(pattern, str):
+            raise TypeError("该索引建立在 bytes 文本上，需要 bytes 类型的 pattern，请先 encode")
+        return bytes(pattern)
+
+    def _bound(self, key, upper):
+        """
+        二分查找：upper 为 False 时返回第一个前缀 >= key 的后缀在 sa 中的下标，
+        为 True 时返回第一个前缀 > key 的下标；每次比较最多 m 个字符，共 O(m log n)
+        """
+        buf, base, width, stop, sa = self._buf, self._base, self._width, self._stop, self.sa
+        size = len(key)
+        lo, hi = 0, len(sa)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = base + width * sa[mid]
+            prefix = buf[start:min(start + size, stop)]
+            if prefix < key or (upper and prefix == key):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _range(self, key):
+        """返回以 key 为前缀的后缀在 sa 中的区间 [lo, hi)"""
+        lo = self._bound(key, upper=False)
+        if lo == len(self.sa):
+            return lo, lo
+        start = self._base + self._width * self.sa[lo]
+        if self._buf[start:min(start + len(key), self._stop)] != key:
+            return lo, lo
+        # sa[lo] 已匹配；lcp[i] >= m 说明 sa[i] 与 sa[i-1] 前 m 个字符相同，也是匹配
+        m = len(key) // self._width
+        lcp, n = self.lcp, len(self.sa)
+        hi = lo + 1
+        while hi < n and lcp[hi] >= m:
+            hi += 1
+        return lo, hi
+
+    def search_all(self, pattern, ordered=True):
+        """
+        返回 pattern 的所有出现位置（允许重叠），结果与 kmp_search_all 一致
+        ordered 为 False 时按后缀字典序返回、不再排序，总时间 O(m log n + occ)
+        """
+        key = self._key(pattern)
+        if not key:
+            return [0]
+        lo, hi = self._range(key)
+        positions = list(self.sa[lo:hi])
+        if ordered:
+            positions.sort()
+        return positions
+
+    def count(self, pattern):
+        """统计 pattern 的出现次数，两次二分查找，O(m log n)，与结果数量无关"""
+        key = self._key(pattern)
+        if not key:
+            return 1
+        return self._bound(key, upper=True) - self._bound(key, upper=False)
+
+    def longest_repeat(self):
+        """
+        返回文本中最长的重复子串 (起始位置, 长度)，由 LCP 数组的最大值直接给出
+        文本中没有重复字符时返回 (0, 0)
+        """
+        best = max(range(len(self.lcp)), key=self.lcp.__getitem__, default=0)
+        if not self.lcp or self.lcp[best] == 0:
+            return 0, 0
+        return self.sa[best], self.lcp[best]
+
+    def save(self, path):
+        """
+        保存索引：文件头、文本（str 按 UTF-32-BE 定长编码，字节序与码点顺序一致）、
+        对齐到 4 字节后的 sa 与 lcp（本机字节序的 int32）
+        """
+        if self.kind == KIND_STR:
+            payload = self.text.encode("utf-32-be")
+        else:
+            payload = self.text
+        n = len(self.sa)
+        with open(path, "wb") as fp:
+            fp.write(HEADER.pack(MAGIC, self.kind, n))
+            fp.write(payload)
+            fp.write(bytes(-len(payload) % 4))
+            self.sa.tofile(fp)
+            self.lcp.tofile(fp)
+
+    @classmethod
+    def load(cls, path):
+        """
+        通过 mmap 加载 save 保存的索引；sa 与 lcp 是映射内存上的 memoryview，不拷贝，
+        查询时文本也直接在映射上切片比较
+        用完后调用 close（或使用 with 语句）释放映射
+        """
+        with open(path, "rb") as fp:
+            mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, kind, n = HEADER.unpack_from(mm)
+        if magic != MAGIC:
+            mm.close()
+            raise ValueError(f"{path} 不是后缀数组索引文件")
+
+        width = 4 if kind == KIND_STR else 1
+        base = HEADER.size
+        offset = base + width * n
+        offset += -offset % 4
+        view = memoryview(mm)
+
+        index = cls.__new__(cls)
+        index.kind = kind
+        index.text = None  # 文本留在映射中，不整体解码
+        index._mm = mm
+        index._buf, index._base, index._width, index._stop = mm, base, width, base + width * n
+        index.sa = view[offset:offset + 4 * n].cast("i")
+        index.lcp = view[offset + 4 * n:offset + 8 * n].cast("i")
+        view.release()
+        return index
+
+    def close(self):
+        """释放 load 建立的映射；内存中构建的索引无需关闭"""
+        if self._mm is not None:
+            self.sa.release()
+            self.lcp.release()
+            self._mm.close()
+            self._mm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -10,9 +10,10 @@ KMP 算法时间复杂度分析脚本
 import time
 import random
 import string
+import tracemalloc
 import matplotlib.pyplot as plt
 import numpy as np
-from kmp import kmp_search_all, build_next
+from kmp import kmp_search_all, build_next, OpStats
 
 # 配置 matplotlib 支持中文显示
 plt.rcParams['font.sans-serif'] = ['WenQuanYi Zen Hei', 'Noto Sans CJK JP', 'Noto Sans CJK SC', 'SimHei', 'DejaVu Sans']
@@ -390,6 +391,151 @@ def test_build_next_complexity():
     print(f"\n结论: {'build_next 时间复杂度为 O(m) ✓' if correlation > 0.98 else '需要进一步检查'}\n")
 
 
+def measure_peak_memory(func, *args):
+    """
+    用 tracemalloc 测量函数执行期间新分配内存的峰值（字节）
+    """
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_build_next_memory():
+    """
+    测试 build_next 在大 m 下的峰值内存：list 与紧凑 array（typecode="auto"）对比
+    随机模式的前缀表取值很小（小整数对象是共享的），周期模式 'A'*m 的取值可达 m-1，
+    此时 list 还需要为每个值分配一个 int 对象
+    """
+    print("=" * 60)
+    print("测试 6: build_next 峰值内存")
+    print("=" * 60)
+    print("目标: 比较 list 与 array 前缀表的内存占用（每个模式字符的字节数）\n")
+
+    pattern_lengths = [10000, 30000, 100000, 1000000, 10000000]
+    variants = [('list', None), ('array(auto)', 'auto')]
+    kinds = [('随机模式（字母表 4）', lambda m: generate_text(m, alphabet_size=4)),
+             ("周期模式 'A'*m", lambda m: 'A' * m)]
+    per_char = {}
+
+    print(f"{'模式类型':>16} {'模式长度':>10} " +
+          " ".join(f"{name + ' 峰值(MB)':>18} {'字节/字符':>10}" for name, _ in variants))
+    print("-" * (28 + 30 * len(variants)))
+    for kind, make in kinds:
+        for m in pattern_lengths:
+            pattern = make(m)
+            row = []
+            for name, typecode in variants:
+                peak = measure_peak_memory(build_next, pattern, typecode)
+                per_char.setdefault((kind, name), []).append(peak / m)
+                row.append(f"{peak / (1 << 20):>18.2f} {peak / m:>10.2f}")
+            print(f"{kind:>16} {m:>10} " + " ".join(row))
+
+    plt.figure(figsize=(12, 5))
+    for k, (kind, _) in enumerate(kinds):
+        plt.subplot(1, 2, k + 1)
+        for name, _ in variants:
+            plt.semilogx(pattern_lengths, per_char[(kind, name)], 'o-', label=name)
+        plt.xlabel('模式长度 m')
+        plt.ylabel('峰值内存 / m (字节)')
+        plt.title(f'build_next 峰值内存: {kind}')
+        plt.legend()
+        plt.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig('kmp_build_next_memory.png', dpi=300, bbox_inches='tight')
+    plt.close()
+    print(f"\n图表已保存: kmp_build_next_memory.png")
+    print("\n结论: array 前缀表每个字符固定占 2 字节（m <= 32768）或 4 字节，与模式内容无关\n")
+
+
+def test_operation_counts():
+    """
+    用 OpStats 统计精确的操作次数，代替受噪声影响的计时来验证线性复杂度：
+    随机文本与最坏情况下，字符比较次数 / (n+m) 与回退步数 / (n+m) 应有常数上界
+    （比较 <= 3(n+m)，回退 <= n+m），同时记录 build_next 与搜索两个阶段各自的耗时
+    """
+    print("=" * 60)
+    print("测试 7: 操作计数分析")
+    print("=" * 60)
+    print("目标: 用精确计数验证 O(n+m)，不受计时抖动影响\n")
+
+    text_lengths = [1000, 2000, 5000, 10000, 20000, 50000, 100000, 200000, 500000]
+    cases = [
+        ('随机文本', lambda n: (generate_text(n, alphabet_size=4), generate_text(n // 10, alphabet_size=4))),
+        ('最坏情况', lambda n: ('A' * n, 'A' * (n // 10 - 1) + 'B')),
+    ]
+    counts = {}
+    within_bound = True
+
+    print(f"{'场景':>8} {'文本长度':>10} {'比较次数':>12} {'比较/(n+m)':>12} {'回退/(n+m)':>12} "
+          f"{'最长回退链':>10} {'build(秒)':>10} {'搜索(秒)':>10}")
+    print("-" * 96)
+    for name, make in cases:
+        for n in text_lengths:
+            text, pattern = make(n)
+            total = n + len(pattern)
+            stats = OpStats()
+            kmp_search_all(text, pattern, stats=stats)
+            comparisons = stats.comparisons + stats.build.comparisons
+            fallbacks = stats.fallbacks + stats.build.fallbacks
+            within_bound &= comparisons <= 3 * total and fallbacks <= total
+            row = counts.setdefault(name, {'comparisons': [], 'fallbacks': [], 'max_chain': [],
+                                           'build': [], 'search': []})
+            row['comparisons'].append(comparisons / total)
+            row['fallbacks'].append(fallbacks / total)
+            row['max_chain'].append(max(stats.max_chain, stats.build.max_chain))
+            row['build'].append(stats.build.seconds)
+            row['search'].append(stats.seconds)
+            print(f"{name:>8} {n:>10} {comparisons:>12} {comparisons / total:>12.3f} "
+                  f"{fallbacks / total:>12.3f} {row['max_chain'][-1]:>10} "
+                  f"{stats.build.seconds:>10.4f} {stats.seconds:>10.4f}")
+
+    plt.figure(figsize=(18, 5))
+
+    # 子图1: 每个字符的比较次数与回退步数
+    plt.subplot(1, 3, 1)
+    for name, row in counts.items():
+        plt.semilogx(text_lengths, row['comparisons'], 'o-', label=f'{name} 比较/(n+m)')
+        plt.semilogx(text_lengths, row['fallbacks'], 's--', label=f'{name} 回退/(n+m)')
+    plt.axhline(3, color='r', linestyle=':', label='比较次数上界 3')
+    plt.xlabel('文本长度 n (m = n/10)')
+    plt.ylabel('操作次数 / (n+m)')
+    plt.title('精确操作计数（应有常数上界）')
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+
+    # 子图2: 最长回退链
+    plt.subplot(1, 3, 2)
+    for name, row in counts.items():
+        plt.semilogx(text_lengths, row['max_chain'], 'o-', label=name)
+    plt.xlabel('文本长度 n (m = n/10)')
+    plt.ylabel('最长回退链')
+    plt.title('处理单个字符时的最长回退步数')
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+
+    # 子图3: 分阶段耗时
+    plt.subplot(1, 3, 3)
+    for name, row in counts.items():
+        plt.loglog(text_lengths, row['build'], 'o--', label=f'{name} build_next')
+        plt.loglog(text_lengths, row['search'], 's-', label=f'{name} 搜索')
+    plt.xlabel('文本长度 n (m = n/10)')
+    plt.ylabel('运行时间 (秒)')
+    plt.title('分阶段耗时')
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig('kmp_operation_counts.png', dpi=300, bbox_inches='tight')
+    plt.close()
+    print(f"\n图表已保存: kmp_operation_counts.png")
+    print(f"\n结论: {'所有规模下操作次数均满足线性上界 ✓' if within_bound else '操作次数超出线性上界，需要检查'}\n")
+    return within_bound
+
+
 def main():
     """
     主函数：运行所有测试
@@ -406,6 +552,8 @@ def main():
     test_combined_scaling()
     test_worst_case()
     test_build_next_complexity()
+    test_build_next_memory()
+    test_operation_counts()
     
     print("=" * 60)
     print("所有测试完成！")
@@ -416,6 +564,8 @@ def main():
     print("  - kmp_combined_scaling.png        : 组合缩放分析 (n+m)")
     print("  - kmp_worst_case.png              : 最坏情况分析")
     print("  - kmp_build_next_complexity.png   : build_next 复杂度分析")
+    print("  - kmp_build_next_memory.png       : build_next 峰值内存")
+    print("  - kmp_operation_counts.png        : 操作计数与分阶段耗时")
     print("\n总结:")
     print("  KMP 算法的时间复杂度为 O(n + m)，其中:")
     print("  - n 是文本长度")
@@ -0,0 +1,120 @@
+"""
+NumPy 向量化候选过滤
+把文本转换成 uint8 / uint32 数组，先在模式的几个锚点字符（首字符、末字符、最稀有字符）上
+做整段向量化比较得到候选起点，再逐列向量化校验剩余字符；逐字符的工作都在 C 层完成
+候选过于密集（例如全 'A' 文本）时改用 kmp_search_all，保证不会退化为 O(nm)
+"""
+
+import numpy as np
+
+from kmp import kmp_search_all
+
+BLOCK = 1 << 20          # 每块处理的起点数，限制临时布尔数组的内存
+ANCHOR_SAMPLE = 1 << 16  # 估计字符频率时采样的文本长度
+DENSE_FACTOR = 32        # 校验工作量（候选数 × m）超过块长的这么多倍时改用 KMP
+
+
+def to_arrays(text, pattern):
+    """
+    把 text 与 pattern 转换成同一 dtype 的 NumPy 数组
+    纯 ASCII 的 str 与 bytes 类数据（含 memoryview、mmap）用 uint8，视图不拷贝；
+    其余 str 用 UTF-32 编码为 uint32，保证下标与字符位置一一对应
+    text 为 NumPy 数组时，str 模式按同样的规则编码（uint8 数组只接受 ASCII 模式，uint32 数组用 UTF-32），
+    bytes 类模式按字节值比较
+    pattern 含有 text 中不可能出现的字符时返回 None；不支持的类型抛出 TypeError
+    """
+    if isinstance(text, np.ndarray):
+        if isinstance(pattern, str):
+            if text.dtype == np.uint8:
+                if not pattern.isascii():
+                    return None
+                return text, np.frombuffer(pattern.encode("ascii"), dtype=np.uint8)
+            if text.dtype == np.uint32:
+                return text, np.frombuffer(pattern.encode("utf-32-le"), dtype=np.uint32)
+            raise TypeError("str 类型的 pattern 只能用于 uint8 / uint32 数组")
+        if isinstance(pattern, (bytes, bytearray, memoryview)):
+            return text, np.frombuffer(pattern, dtype=np.uint8).astype(text.dtype, copy=False)
+        return text, np.asarray(pattern, dtype=text.dtype)
+    if isinstance(text, str):
+        if not isinstance(pattern, str):
+            raise TypeError("text 为 str 时 pattern 也必须是 str")
+        if text.isascii():
+            if not pattern.isascii():
+                return None
+            return (np.frombuffer(text.encode("ascii"), dtype=np.uint8),
+                    np.frombuffer(pattern.encode("ascii"), dtype=np.uint8))
+        return (np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32),
+                np.frombuffer(pattern.encode("utf-32-le"), dtype=np.uint32))
+    if isinstance(pattern, str):
+        raise TypeError("text 为 bytes 类数据时需要 bytes 类型的 pattern，请先 encode")
+    return np.frombuffer(text, dtype=np.uint8), np.frombuffer(pattern, dtype=np.uint8)
+
+
+def choose_anchors(arr, pat):
+    """
+    选择锚点位置：首字符、末字符，以及中间在文本采样中出现次数最少的字符
+    返回去重后的位置列表，最稀有的排在最前，使第一次比较就过滤掉尽可能多的起点
+    """
+    m = len(pat)
+    sample = arr[:ANCHOR_SAMPLE]
+    values, counts = np.unique(sample, return_counts=True)
+    where = np.minimum(np.searchsorted(values, pat), len(values) - 1)
+    freq = np.where(values[where] == pat, counts[where], 0)
+
+    anchors = [0, m - 1]
+    if m > 2:
+        anchors.append(1 + int(np.argmin(freq[1:m - 1])))
+    anchors = list(dict.fromkeys(anchors))
+    anchors.sort(key=lambda k: freq[k])
+    return anchors
+
+
+def vectorized_search_all(text, pattern, anchors=None):
+    """
+    向量化过滤 + 校验查找 text 中所有 pattern 的出现位置，结果与 kmp_search_all 完全一致
+    text 可以是 str、一维 NumPy 数组或支持缓冲区协议的 bytes 类数据（bytes、memoryview、mmap 等）；
+    其他序列（如 token 列表）直接交给 kmp_search_all
+    anchors 可传入自定义的锚点位置列表
+    """
+    if not pattern:
+        return [0]
+    if not isinstance(text, (str, np.ndarray)):
+        try:
+            memoryview(text).release()
+        except TypeError:
+            return kmp_search_all(text, pattern)
+
+    arrays = to_arrays(text, pattern)
+    if arrays is None:
+        return []
+    arr, pat = arrays
+    n, m = len(arr), len(pat)
+    if m > n:
+        return []
+
+    if anchors is None:
+        anchors = choose_anchors(arr, pat)
+    chosen = set(anchors)
+    rest = [k for k in range(m) if k not in chosen]
+    span = n - m + 1
+    positions = []
+
+    for s in range(0, span, BLOCK):
+        e = min(span, s + BLOCK)
+        k = anchors[0]
+        mask = arr[s + k:e + k] == pat[k]
+        for k in anchors[1:]:
+            np.logical_and(mask, arr[s + k:e + k] == pat[k], out=mask)
+        candidates = np.flatnonzero(mask) + s
+
+        # 逐列校验剩余字符的工作量约为 候选数 × m；过大时 KMP 的线性扫描更划算。
+        # 回退时使用转换后的数组（text 为数组而 pattern 为 str 时原始输入无法直接比较）
+        if len(candidates) * len(rest) > DENSE_FACTOR * (e - s):
+            return kmp_search_all(arr.tolist(), pat.tolist())
+        for k in rest:
+            if not len(candidates):
+                break
+            candidates = candidates[arr[candidates + k] == pat[k]]
+        positions.extend(candidates.tolist())
+
+    return positions